@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict
 from apps.api.supabase_client import get_client
+from apps.api.model_weights import MODELS
 
 router = APIRouter()
 
@@ -17,11 +18,10 @@ class RegisterModel(BaseModel):
 
 @router.get('/ai/models/latest')
 def ai_latest():
-  sb = get_client()
-  data = sb.table('ai_models').select('*').order('created_at', desc=True).limit(1).execute().data
-  if not data:
+  row = MODELS.latest()
+  if row is None:
     raise HTTPException(status_code=404, detail='No model')
-  return data[0]
+  return row
 
 
 @router.post('/ai/models/register')
@@ -33,6 +33,8 @@ def ai_register(payload: RegisterModel):
     'metrics': payload.metrics,
     'notes': payload.notes,
   }).execute().data[0]
+  # Scans pick up the new version without waiting for the registry TTL
+  MODELS.publish(row)
   return row
 
 
@@ -23,6 +23,7 @@ from apps.api.supabase_client import get_client
 from apps.api.execution import simulate_order, apply_trade_updates
 from apps.api.risk_engine import get_limits, suggest_position_size, should_block_order
 from apps.api.trade_execution import TradeExecutor
+from apps.api.yahoo_client import fetch_real_time_quotes
 import requests
 
 # Configure logging
@@ -239,8 +240,29 @@ class AutoExecutor:
 
         return should_execute
 
+    def _prefetch_position_quotes(self, sb, positions: List[Dict]):
+        """Warm the quote cache for all held symbols with one batched request per exchange"""
+        symbol_ids = [p['symbol_id'] for p in positions if p['qty'] > 0]
+        if not symbol_ids:
+            return
+        try:
+            symbol_infos = sb.table("symbols").select("ticker,exchange").in_("id", symbol_ids).execute().data or []
+            by_exchange: Dict[str, List[str]] = {}
+            for info in symbol_infos:
+                by_exchange.setdefault(info['exchange'], []).append(info['ticker'])
+            for exchange, tickers in by_exchange.items():
+                fetch_real_time_quotes(tickers, exchange)
+        except Exception as e:
+            logger.warning(f"Error prefetching position quotes: {e}")
+
     def _get_current_price(self, symbol_id: str, ticker: str, exchange: str) -> float | None:
-        """Get current price for a symbol"""
+        """Get current price for a symbol (cached real-time quote, else latest 1m candle)"""
+        try:
+            price = fetch_real_time_quotes([ticker], exchange).get(ticker)
+            if price:
+                return price
+        except Exception as e:
+            logger.warning(f"Error getting real-time quote for {ticker}: {e}")
         try:
             sb = get_client()
             latest = sb.table("candles").select("close").eq("symbol_id", symbol_id).eq("timeframe", "1m").order("ts", desc=True).limit(1).execute().data
@@ -444,6 +466,7 @@ class AutoExecutor:
             # Get all current positions
             sb = get_client()
             positions = sb.table("positions").select("symbol_id,avg_price,qty").execute().data or []
+            self._prefetch_position_quotes(sb, positions)
 
             profit_exits = 0
             stop_exits = 0
@@ -514,6 +537,7 @@ class AutoExecutor:
             sb = get_client()
             # Get positions with signal info from notes
             positions = sb.table("positions").select("symbol_id,avg_price,qty").execute().data or []
+            self._prefetch_position_quotes(sb, positions)
 
             exits = 0
             for position in positions:
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Dict
+
+
+def load_candle_freshness(sb, timeframe: str, page_size: int = 1000) -> Dict[str, Dict] | None:
+    """Latest ts and row count for every active symbol of `timeframe`, one query per page.
+
+    Returns {symbol_id: {'latest_date': ts, 'count': n}} (symbols without
+    candles are absent), or None if the candle_freshness RPC is unavailable so
+    callers can fall back to per-symbol lookups. Results are ordered by
+    symbol and paged past the PostgREST row cap.
+    """
+    out: Dict[str, Dict] = {}
+    start = 0
+    try:
+        while True:
+            page = (sb.rpc('candle_freshness', {'p_timeframe': timeframe})
+                    .order('symbol_id').range(start, start + page_size - 1).execute().data or [])
+            for row in page:
+                out[row['symbol_id']] = {'latest_date': row['latest_ts'], 'count': int(row['row_count'] or 0)}
+            if len(page) < page_size:
+                return out
+            start += page_size
+    except Exception as e:
+        print(f"⚠️ candle_freshness RPC unavailable, falling back to per-symbol lookups: {e}")
+        return None
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import os
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from apps.api.candle_store import fetch_candle_frame, get_candle_store
+from apps.api.yahoo_client import CANDLE_COLUMNS, candle_rows
+
+# Higher timeframes are derived from stored 5m bars instead of separate Yahoo fetches
+BASE_TIMEFRAME = "5m"
+_MINUTE_NS = 60 * 10**9
+DERIVED_TIMEFRAMES = {"15m": 15 * _MINUTE_NS, "1h": 60 * _MINUTE_NS, "1d": 1440 * _MINUTE_NS}
+# Buckets start at the NSE session open, 09:15 IST (03:45 UTC)
+SESSION_ANCHOR_NS = (3 * 60 + 45) * _MINUTE_NS
+# The session runs 09:15-15:30 IST
+SESSION_LENGTH_NS = 375 * _MINUTE_NS
+BAR_NS = {"1m": _MINUTE_NS, "5m": 5 * _MINUTE_NS, "15m": 15 * _MINUTE_NS, "1h": 60 * _MINUTE_NS, "1d": SESSION_LENGTH_NS}
+# Yahoo keeps about 60 days of 5m history; older gaps are fetched per timeframe
+BASE_HISTORY_DAYS = 60
+
+
+def resample_enabled() -> bool:
+    return os.getenv("CANDLE_RESAMPLE", "1").lower() in ("1", "true", "yes")
+
+
+def bucket_start_ns(ts_ns: np.ndarray, tf: str) -> np.ndarray:
+    """Start (UTC ns) of the session-aligned `tf` bucket holding each timestamp"""
+    freq = DERIVED_TIMEFRAMES[tf]
+    return (ts_ns - SESSION_ANCHOR_NS) // freq * freq + SESSION_ANCHOR_NS
+
+
+def bar_close_ns(ts_ns: np.ndarray, tf: str) -> np.ndarray:
+    """When each `tf` bar starting at ts_ns closes: its length later, or at the session close"""
+    day = DERIVED_TIMEFRAMES["1d"]
+    session_close = (ts_ns - SESSION_ANCHOR_NS) // day * day + SESSION_ANCHOR_NS + SESSION_LENGTH_NS
+    end = ts_ns + BAR_NS[tf]
+    # Bars stamped outside the session (e.g. midnight daily bars) just use their length
+    return np.where(session_close > ts_ns, np.minimum(end, session_close), end)
+
+
+def latest_closed_bar_ns(df: pd.DataFrame, tf: str, now_ns: int | None = None) -> int | None:
+    """Start (UTC ns) of the newest bar in df that has closed by now, or None"""
+    if df is None or df.empty:
+        return None
+    if now_ns is None:
+        now_ns = pd.Timestamp.now(tz="UTC").value
+    ts = _ts_ns(df)
+    closed = ts[bar_close_ns(ts, tf) <= now_ns]
+    return int(closed.max()) if len(closed) else None
+
+
+def _ts_ns(df: pd.DataFrame) -> np.ndarray:
+    return pd.to_datetime(df["ts"], utc=True).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def _valid_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """Sorted, de-duplicated bars with positive prices (Yahoo pads gaps with 0.0)"""
+    if df is None or df.empty:
+        return pd.DataFrame({c: pd.Series(dtype="float64") for c in CANDLE_COLUMNS})
+    out = df[list(CANDLE_COLUMNS)].copy()
+    out["ts"] = pd.to_datetime(out["ts"], utc=True)
+    for c in CANDLE_COLUMNS[1:]:
+        out[c] = pd.to_numeric(out[c], errors="coerce").astype("float64")
+    ok = (out[["open", "high", "low", "close"]] > 0).all(axis=1)
+    out = out[ok].sort_values("ts", kind="stable")
+    return out.drop_duplicates("ts", keep="last").reset_index(drop=True)
+
+
+def resample_candles(df: pd.DataFrame, tf: str, complete_from: int | None = None) -> pd.DataFrame:
+    """Aggregate 5m bars into session-aligned `tf` bars.
+
+    open = first, high = max, low = min, close = last, volume = sum, stamped
+    with the bucket start. complete_from (UTC ns) is where the 5m history in
+    df is loaded from: buckets starting earlier are partial and dropped.
+    Later buckets are kept even if their first 5m bar is missing (illiquid
+    symbols often have no bar at the open).
+    """
+    bars = _valid_bars(df)
+    if bars.empty:
+        return bars
+    ts = _ts_ns(bars)
+    bucket = bucket_start_ns(ts, tf)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(bars)] - 1
+    out = pd.DataFrame({
+        "ts": pd.to_datetime(bucket[starts], utc=True),
+        "open": bars["open"].to_numpy()[starts],
+        "high": np.maximum.reduceat(bars["high"].to_numpy(), starts),
+        "low": np.minimum.reduceat(bars["low"].to_numpy(), starts),
+        "close": bars["close"].to_numpy()[ends],
+        "volume": np.add.reduceat(np.nan_to_num(bars["volume"].to_numpy()), starts),
+    })
+    if complete_from is not None:
+        out = out[bucket[starts] >= complete_from].reset_index(drop=True)
+    return out
+
+
+def plan_derived(stale: Dict[str, object], now_ns: int | None = None) -> Tuple[List[str], int]:
+    """Which higher timeframes to aggregate from 5m bars, and how many days the 5m fetch must cover.
+
+    stale maps each derived timeframe that already has history to its latest
+    stored bar when it needs new data, or to None when it is current. A
+    lagging timeframe is derived only if its whole gap fits in the 5m
+    history Yahoo keeps (BASE_HISTORY_DAYS), and the 5m fetch is sized to
+    cover the largest such gap even when 5m itself is current. Timeframes
+    not in stale, or lagging further, are fetched directly. Returns
+    (timeframes to derive, days of 5m bars to fetch, 0 if none lag).
+    """
+    now = pd.Timestamp(now_ns if now_ns is not None else pd.Timestamp.now(tz="UTC").value, tz="UTC")
+    derived, days = [], 0
+    for tf, latest in stale.items():
+        if tf not in DERIVED_TIMEFRAMES:
+            continue
+        if latest is None:
+            derived.append(tf)
+            continue
+        latest = pd.Timestamp(latest)
+        latest = latest.tz_localize("UTC") if latest.tzinfo is None else latest
+        # Whole days from the latest bar's day, so its (possibly partial) bucket is rebuilt too
+        gap = (now.normalize() - latest.normalize()).days + 1
+        if gap <= BASE_HISTORY_DAYS:
+            derived.append(tf)
+            days = max(days, gap)
+    return derived, days
+
+
+def _stored_before(sb, symbol_id: str, ts_ns: int) -> bool:
+    """Whether any 5m bar is stored before ts_ns"""
+    try:
+        rows = (sb.table("candles").select("ts").eq("symbol_id", symbol_id).eq("timeframe", BASE_TIMEFRAME)
+                .lt("ts", pd.Timestamp(ts_ns, tz="UTC").isoformat()).order("ts", desc=True).limit(1).execute().data)
+        return bool(rows)
+    except Exception as e:
+        print(f"⚠️ Could not check stored {BASE_TIMEFRAME} history for {symbol_id}: {e}")
+        return False
+
+
+def update_derived(sb, symbol_id: str, new_bars: pd.DataFrame, timeframes: Iterable[str] | None = None) -> Dict[str, int]:
+    """Re-aggregate only the higher-timeframe buckets touched by freshly stored 5m bars.
+
+    The 5m bars already stored from the earliest affected bucket onwards are
+    read back (so a bucket's earlier bars count too), merged with new_bars,
+    and the affected buckets are upserted into candles and written through to
+    the local candle cache. If 5m bars are stored before the earliest
+    affected bucket, the history is complete from its start; otherwise it
+    only counts from the first loaded bar and buckets starting before that
+    are left as they are. Returns {timeframe: bars written}.
+    """
+    timeframes = [tf for tf in (timeframes or DERIVED_TIMEFRAMES) if tf in DERIVED_TIMEFRAMES]
+    new = _valid_bars(new_bars)
+    if new.empty or not timeframes:
+        return {}
+    new_ts = _ts_ns(new)
+    since = min(int(bucket_start_ns(new_ts[:1], tf)[0]) for tf in timeframes)
+    stored = fetch_candle_frame(sb, symbol_id, BASE_TIMEFRAME, start=pd.Timestamp(since, tz="UTC"))
+    base = pd.concat([stored, new], ignore_index=True) if not stored.empty else new
+    loaded_from = since if _stored_before(sb, symbol_id, since) else int(_ts_ns(base).min())
+    store = get_candle_store()
+    written: Dict[str, int] = {}
+    for tf in timeframes:
+        bars = resample_candles(base, tf, complete_from=loaded_from)
+        touched = np.unique(bucket_start_ns(new_ts, tf))
+        bars = bars[np.isin(_ts_ns(bars), touched)] if not bars.empty else bars
+        rows = candle_rows(bars, symbol_id, tf)
+        if rows:
+            sb.table("candles").upsert(rows, on_conflict="symbol_id,timeframe,ts").execute()
+            if store is not None:
+                store.append(symbol_id, tf, bars)
+        written[tf] = len(rows)
+    print(f"🧱 Resampled {BASE_TIMEFRAME} -> {written} for {symbol_id}")
+    return written
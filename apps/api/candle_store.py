@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+OHLCV = ("open", "high", "low", "close", "volume")
+CANDLE_DTYPE = np.dtype([("ts", "<i8")] + [(c, "<f8") for c in OHLCV])
+
+# PostgREST caps responses (1000 rows by default), so range reads are paged
+DB_PAGE_SIZE = 1000
+
+
+def _to_ns(value) -> int:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.value)
+
+
+def _iso(ns: int) -> str:
+    return pd.Timestamp(ns, tz="UTC").isoformat()
+
+
+def _records_to_array(data: List[Dict]) -> np.ndarray:
+    """Supabase JSON rows (ts,open,high,low,close,volume) -> structured candle array"""
+    if not data:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    df = pd.DataFrame(data)
+    out = np.empty(len(df), dtype=CANDLE_DTYPE)
+    out["ts"] = pd.to_datetime(df["ts"], utc=True).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    for c in OHLCV:
+        out[c] = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float) if c in df.columns else np.nan
+    return out
+
+
+def _frame_to_array(df: pd.DataFrame) -> np.ndarray:
+    out = np.empty(len(df), dtype=CANDLE_DTYPE)
+    out["ts"] = pd.to_datetime(df["ts"], utc=True).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    for c in OHLCV:
+        out[c] = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float)
+    return out
+
+
+def _array_to_frame(arr: np.ndarray) -> pd.DataFrame:
+    df = pd.DataFrame({c: np.asarray(arr[c], dtype=float) for c in OHLCV})
+    df.insert(0, "ts", pd.to_datetime(np.asarray(arr["ts"], dtype=np.int64), utc=True))
+    return df
+
+
+# Approximate NSE bars per calendar day, used to size concurrent range chunks
+BARS_PER_DAY = {"1m": 375, "5m": 75, "15m": 25, "1h": 7, "1d": 1}
+DAY_NS = 86_400 * 10**9
+
+
+def _candle_query(sb, symbol_id: str, tf: str):
+    return sb.table("candles").select("ts,open,high,low,close,volume").eq("symbol_id", symbol_id).eq("timeframe", tf)
+
+
+def _fetch_chunk(sb, symbol_id: str, tf: str, start_ns: int | None, end_ns: int | None, page_size: int) -> Tuple[List[Dict], int]:
+    """Keyset-paginated read of [start, end): each page continues after the last ts seen"""
+    data: List[Dict] = []
+    requests = 0
+    cursor = None
+    while True:
+        q = _candle_query(sb, symbol_id, tf)
+        if cursor is not None:
+            q = q.gt("ts", cursor)
+        elif start_ns is not None:
+            q = q.gte("ts", _iso(start_ns))
+        if end_ns is not None:
+            q = q.lt("ts", _iso(end_ns))
+        page = q.order("ts").limit(page_size).execute().data or []
+        requests += 1
+        data.extend(page)
+        if len(page) < page_size:
+            return data, requests
+        cursor = page[-1]["ts"]
+
+
+def fetch_candle_range(sb, symbol_id: str, tf: str, start_ns: int | None = None, end_ns: int | None = None,
+                       workers: int | None = None, page_size: int = DB_PAGE_SIZE, stats: Dict | None = None) -> np.ndarray:
+    """Complete candles in [start, end) for one symbol/timeframe as a sorted structured array.
+
+    The window is split into time-range chunks of roughly a few pages each,
+    fetched concurrently (CANDLE_LOADER_WORKERS, default 4) with keyset
+    pagination, then merged and de-duplicated on ts.
+    """
+    t0 = time.perf_counter()
+    workers = workers or int(os.getenv("CANDLE_LOADER_WORKERS", "4"))
+    requests = 0
+    if start_ns is None:
+        # Open-ended window: anchor the chunks on the first stored bar
+        first = _candle_query(sb, symbol_id, tf).order("ts").limit(1).execute().data or []
+        requests += 1
+        if not first:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        start_ns = _to_ns(first[0]["ts"])
+    stop_ns = end_ns if end_ns is not None else _to_ns(pd.Timestamp.now(tz="UTC")) + DAY_NS
+
+    span_ns = max(1, math.ceil(page_size * 5 / BARS_PER_DAY.get(tf, 25))) * DAY_NS
+    if workers <= 1:
+        span_ns = max(1, stop_ns - start_ns)
+    bounds = list(range(start_ns, stop_ns, span_ns)) + [stop_ns]
+    chunks = [(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    # The last chunk stays open-ended so bars newer than "now" are not lost
+    if end_ns is None and chunks:
+        chunks[-1] = (chunks[-1][0], None)
+
+    if len(chunks) <= 1:
+        results = [_fetch_chunk(sb, symbol_id, tf, lo, hi, page_size) for lo, hi in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(lambda c: _fetch_chunk(sb, symbol_id, tf, c[0], c[1], page_size), chunks))
+
+    arr = _records_to_array([row for data, _ in results for row in data])
+    requests += sum(n for _, n in results)
+    if len(arr):
+        arr = arr[np.argsort(arr["ts"], kind="stable")]
+        arr = arr[np.append(arr["ts"][1:] != arr["ts"][:-1], True)]
+    elapsed = time.perf_counter() - t0
+    if stats is not None:
+        stats["db_requests"] = stats.get("db_requests", 0) + requests
+        stats["db_rows"] = stats.get("db_rows", 0) + len(arr)
+    if len(arr) >= page_size:
+        print(f"📥 Loaded {len(arr)} {tf} candles for {symbol_id} in {elapsed:.2f}s "
+              f"({len(arr) / max(elapsed, 1e-9):.0f} rows/s, {len(chunks)} chunks, {requests} requests)")
+    return arr
+
+
+def fetch_candle_frame(sb, symbol_id: str, tf: str, start=None, end=None, workers: int | None = None) -> pd.DataFrame:
+    """DataFrame form of fetch_candle_range for an inclusive [start, end] window"""
+    start_ns = _to_ns(start) if start is not None else None
+    end_ns = _to_ns(end) + 1 if end is not None else None
+    return _array_to_frame(fetch_candle_range(sb, symbol_id, tf, start_ns, end_ns, workers=workers))
+
+
+class CandleStore:
+    """On-disk candle cache partitioned as <root>/<symbol_id>/<timeframe>/<YYYY-MM-DD>.npy.
+
+    Each day file is a sorted structured array (ts ns + float64 OHLCV) read
+    with np.load(mmap_mode='r'). load() is a read-through cache in front of the
+    candles table: the newest cached bar onwards is re-read from Supabase, and
+    older history is back-filled once and then served locally. append() is the
+    write-through side used when fresh Yahoo bars are upserted.
+    """
+
+    def __init__(self, root: str | None = None):
+        self.root = root or os.getenv("CANDLE_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "aitradingapp_candles")
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.stats = {"db_rows": 0, "db_requests": 0, "local_rows": 0}
+
+    # ---- local partitions -------------------------------------------------
+    def _dir(self, symbol_id: str, tf: str) -> str:
+        return os.path.join(self.root, str(symbol_id), tf)
+
+    def _lock(self, symbol_id: str, tf: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((str(symbol_id), tf), threading.Lock())
+
+    def _days(self, symbol_id: str, tf: str) -> List[str]:
+        d = self._dir(symbol_id, tf)
+        if not os.path.isdir(d):
+            return []
+        return sorted(f[:-4] for f in os.listdir(d) if f.endswith(".npy"))
+
+    def _meta(self, symbol_id: str, tf: str) -> Dict:
+        try:
+            with open(os.path.join(self._dir(symbol_id, tf), "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, symbol_id: str, tf: str, meta: Dict) -> None:
+        path = os.path.join(self._dir(symbol_id, tf), "meta.json")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def _write_day(self, symbol_id: str, tf: str, day: str, arr: np.ndarray) -> None:
+        path = os.path.join(self._dir(symbol_id, tf), f"{day}.npy")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp, path)
+
+    def _append_array(self, symbol_id: str, tf: str, arr: np.ndarray) -> int:
+        if len(arr) == 0:
+            return 0
+        os.makedirs(self._dir(symbol_id, tf), exist_ok=True)
+        days = pd.to_datetime(arr["ts"], utc=True).strftime("%Y-%m-%d")
+        for day in np.unique(days):
+            new = arr[days == day]
+            path = os.path.join(self._dir(symbol_id, tf), f"{day}.npy")
+            if os.path.exists(path):
+                old = np.load(path)
+                # Incoming bars replace cached bars with the same ts
+                old = old[~np.isin(old["ts"], new["ts"])]
+                new = np.concatenate([old, new])
+            new = new[np.argsort(new["ts"], kind="stable")]
+            # Keep the last occurrence of duplicated timestamps within the batch
+            keep = np.append(new["ts"][1:] != new["ts"][:-1], True)
+            self._write_day(symbol_id, tf, day, new[keep])
+        return len(arr)
+
+    def append(self, symbol_id: str, tf: str, df: pd.DataFrame) -> int:
+        """Write-through: merge bars (ts + OHLCV frame) into the day partitions"""
+        if df is None or df.empty:
+            return 0
+        with self._lock(symbol_id, tf):
+            return self._append_array(symbol_id, tf, _frame_to_array(df))
+
+    def read_array(self, symbol_id: str, tf: str, start=None, end=None, limit: int | None = None) -> np.ndarray:
+        """Cached bars in [start, end] (or the last `limit`) as one structured array"""
+        days = self._days(symbol_id, tf)
+        if start is not None:
+            first = pd.Timestamp(_to_ns(start), tz="UTC").strftime("%Y-%m-%d")
+            days = [d for d in days if d >= first]
+        if end is not None:
+            last = pd.Timestamp(_to_ns(end), tz="UTC").strftime("%Y-%m-%d")
+            days = [d for d in days if d <= last]
+        parts: List[np.ndarray] = []
+        rows = 0
+        # Walk newest-first so limit-only reads touch as few files as possible
+        for day in reversed(days):
+            part = np.load(os.path.join(self._dir(symbol_id, tf), f"{day}.npy"), mmap_mode="r")
+            if start is not None or end is not None:
+                lo = np.searchsorted(part["ts"], _to_ns(start)) if start is not None else 0
+                hi = np.searchsorted(part["ts"], _to_ns(end), side="right") if end is not None else len(part)
+                part = part[lo:hi]
+            parts.append(part)
+            rows += len(part)
+            if limit is not None and rows >= limit:
+                break
+        if not parts:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        arr = np.concatenate(parts[::-1])
+        if limit is not None:
+            arr = arr[-limit:]
+        self.stats["local_rows"] += len(arr)
+        return arr
+
+    def read(self, symbol_id: str, tf: str, start=None, end=None, limit: int | None = None) -> pd.DataFrame:
+        return _array_to_frame(self.read_array(symbol_id, tf, start, end, limit))
+
+    def earliest_ns(self, symbol_id: str, tf: str) -> int | None:
+        days = self._days(symbol_id, tf)
+        if not days:
+            return None
+        part = np.load(os.path.join(self._dir(symbol_id, tf), f"{days[0]}.npy"), mmap_mode="r")
+        return int(part["ts"][0]) if len(part) else None
+
+    def latest_ns(self, symbol_id: str, tf: str) -> int | None:
+        days = self._days(symbol_id, tf)
+        if not days:
+            return None
+        part = np.load(os.path.join(self._dir(symbol_id, tf), f"{days[-1]}.npy"), mmap_mode="r")
+        return int(part["ts"][-1]) if len(part) else None
+
+    def invalidate(self, symbol_id: str | None = None, tf: str | None = None) -> None:
+        """Drop cached partitions (everything, a symbol, or one symbol/timeframe)"""
+        import shutil
+        if symbol_id is None:
+            path = self.root
+        elif tf is None:
+            path = os.path.join(self.root, str(symbol_id))
+        else:
+            path = self._dir(symbol_id, tf)
+        shutil.rmtree(path, ignore_errors=True)
+
+    # ---- Supabase read-through -------------------------------------------
+    def _db_range(self, sb, symbol_id: str, tf: str, since_ns: int | None, until_ns: int | None,
+                  until_inclusive: bool = True, workers: int | None = None) -> np.ndarray:
+        end_ns = until_ns + 1 if (until_ns is not None and until_inclusive) else until_ns
+        return fetch_candle_range(sb, symbol_id, tf, since_ns, end_ns, workers=workers, stats=self.stats)
+
+    def _db_last(self, sb, symbol_id: str, tf: str, limit: int, before_ns: int | None = None) -> np.ndarray:
+        q = _candle_query(sb, symbol_id, tf)
+        if before_ns is not None:
+            q = q.lt("ts", _iso(before_ns))
+        data = q.order("ts", desc=True).limit(limit).execute().data or []
+        self.stats["db_requests"] += 1
+        self.stats["db_rows"] += len(data)
+        return _records_to_array(list(reversed(data)))
+
+    def load(self, sb, symbol_id: str, tf: str, start=None, end=None, limit: int | None = None) -> pd.DataFrame:
+        """Read-through load of [start, end] (or the last `limit` bars) for one symbol/timeframe"""
+        with self._lock(symbol_id, tf):
+            meta = self._meta(symbol_id, tf)
+            latest = self.latest_ns(symbol_id, tf)
+            start_ns = _to_ns(start) if start is not None else None
+
+            if latest is None:
+                # Cold: pull the requested window and remember where coverage starts
+                if start_ns is None and limit is not None:
+                    arr = self._db_last(sb, symbol_id, tf, limit)
+                    covered = 0 if len(arr) < limit else (int(arr["ts"][0]) if len(arr) else None)
+                else:
+                    arr = self._db_range(sb, symbol_id, tf, start_ns, None)
+                    covered = start_ns if start_ns is not None else 0
+                self._append_array(symbol_id, tf, arr)
+                if covered is not None:
+                    self._write_meta(symbol_id, tf, {"covered_from": covered})
+                    meta = {"covered_from": covered}
+            else:
+                if "covered_from" not in meta:
+                    # Only written through so far: history before the first cached bar is unknown
+                    meta = {"covered_from": self.earliest_ns(symbol_id, tf)}
+                    self._write_meta(symbol_id, tf, meta)
+                # Warm: re-read from the newest cached bar (it may have been revised) onwards
+                self._append_array(symbol_id, tf, self._db_range(sb, symbol_id, tf, latest, None, workers=1))
+
+            covered_from = meta.get("covered_from")
+            if covered_from is not None and covered_from > 0:
+                if start_ns is not None and start_ns < covered_from:
+                    # Back-fill older history once
+                    self._append_array(symbol_id, tf, self._db_range(sb, symbol_id, tf, start_ns, covered_from, until_inclusive=False))
+                    self._write_meta(symbol_id, tf, {"covered_from": start_ns})
+                elif start_ns is None and limit is not None:
+                    have = len(self.read_array(symbol_id, tf, limit=limit))
+                    if have < limit:
+                        older = self._db_last(sb, symbol_id, tf, limit - have, before_ns=covered_from)
+                        self._append_array(symbol_id, tf, older)
+                        new_cover = 0 if len(older) < limit - have else int(older["ts"][0])
+                        self._write_meta(symbol_id, tf, {"covered_from": new_cover})
+
+            return self.read(symbol_id, tf, start, end, limit)
+
+
+_STORE: CandleStore | None = None
+
+
+def get_candle_store() -> CandleStore | None:
+    """Process-wide store when enabled with CANDLE_CACHE=1, else None.
+
+    Off by default: the cache is unbounded and only re-reads bars from its
+    newest cached one onwards, so older backfills or deletions in the
+    candles table are not seen until invalidate() (fine for offline
+    backtests, not for the live scanner).
+    """
+    global _STORE
+    if os.getenv("CANDLE_CACHE", "0").lower() not in ("1", "true", "yes"):
+        return None
+    if _STORE is None:
+        _STORE = CandleStore()
+    return _STORE
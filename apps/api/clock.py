@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+# Time returned instead of the wall clock while pinned (offline benchmarks)
+_PINNED: datetime | None = None
+
+
+def utc_now() -> datetime:
+    """Current UTC time, or the pinned time"""
+    return _PINNED if _PINNED is not None else datetime.now(timezone.utc)
+
+
+def now_ns() -> int:
+    now = utc_now()
+    return int(now.timestamp()) * 10**9 + now.microsecond * 1000
+
+
+def pin(at: datetime | None) -> None:
+    """Freeze utc_now() at `at` (naive times are taken as UTC); None restores the wall clock"""
+    global _PINNED
+    if at is not None:
+        at = at.replace(tzinfo=timezone.utc) if at.tzinfo is None else at.astimezone(timezone.utc)
+    _PINNED = at
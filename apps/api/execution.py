@@ -7,6 +7,7 @@ from datetime import datetime, timezone
 import pandas as pd
 
 from apps.api.supabase_client import get_client
+from apps.api.strategies.indicators import ensure_indicators
 
 
 @dataclass
@@ -49,15 +50,8 @@ def _synthetic_book_and_atr(symbol_id: str, timeframe: str = '1m') -> Tuple[floa
     last = df.iloc[-1]
     close = float(last["close"])
     # ATR proxy from last 14 candles
-    highs = df["high"].astype(float)
-    lows = df["low"].astype(float)
-    closes = df["close"].astype(float)
-    tr = pd.concat([
-        (highs - lows),
-        (highs - closes.shift(1)).abs(),
-        (lows - closes.shift(1)).abs(),
-    ], axis=1).max(axis=1)
-    atr = float(tr.rolling(14).mean().iloc[-1]) if len(tr) >= 14 else float(tr.mean())
+    df = ensure_indicators(df, ["true_range", "atr_sma14"])
+    atr = float(df["atr_sma14"].iloc[-1]) if len(df) >= 14 else float(df["true_range"].mean())
     atr = atr or max(0.005 * close, 0.01)  # fallback
     # Spread as fraction of ATR
     spread = max(0.1 * atr, 0.0005 * close)
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+@lru_cache(maxsize=1 << 16)
+def _parse_ts(value: str):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _key(value):
+    """Comparable form of a column value: ISO timestamps compare as datetimes"""
+    if isinstance(value, str) and len(value) >= 10 and value[4:5] == "-":
+        parsed = _parse_ts(value)
+        if parsed is not None:
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return value
+
+
+class FakeResponse:
+    def __init__(self, data, count: int | None = None):
+        self.data = data
+        self.count = count
+
+
+class _Table:
+    """Rows of one table, optionally partitioned by equality columns (e.g. candles by symbol/timeframe)"""
+
+    def __init__(self, index: Tuple[str, ...] = ()):
+        self.index = index
+        self.parts: Dict[tuple, List[dict]] = {}
+        # on_conflict columns -> {key: row}, built on first upsert
+        self.unique: Dict[Tuple[str, ...], Dict[tuple, dict]] = {}
+
+    def rows(self, eqs: Dict[str, object] | None = None) -> List[dict]:
+        if self.index and eqs is not None and all(c in eqs for c in self.index):
+            return self.parts.get(tuple(eqs[c] for c in self.index), [])
+        return [r for part in self.parts.values() for r in part]
+
+    def add(self, row: dict) -> None:
+        self.parts.setdefault(tuple(row.get(c) for c in self.index), []).append(row)
+        for cols, keys in self.unique.items():
+            keys[tuple(row.get(c) for c in cols)] = row
+
+    def remove(self, row: dict) -> None:
+        part = self.parts.get(tuple(row.get(c) for c in self.index), [])
+        part[:] = [r for r in part if r is not row]
+        for cols, keys in self.unique.items():
+            keys.pop(tuple(row.get(c) for c in cols), None)
+
+    def find(self, cols: Tuple[str, ...], row: dict) -> dict | None:
+        keys = self.unique.get(cols)
+        if keys is None:
+            keys = self.unique[cols] = {tuple(r.get(c) for c in cols): r for r in self.rows()}
+        return keys.get(tuple(row.get(c) for c in cols))
+
+
+class FakeQuery:
+    """Chainable subset of the postgrest query builder, evaluated in memory on execute()"""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.columns: List[str] | None = None
+        self.count: str | None = None
+        self.payload = None
+        self.on_conflict: Tuple[str, ...] = ()
+        self.filters: List[Tuple[str, str, object]] = []
+        self.orders: List[Tuple[str, bool]] = []
+        self.limit_n: int | None = None
+        self.offset = 0
+        self.single_row = False
+
+    # Operations
+    def select(self, columns: str = "*", count: str | None = None) -> "FakeQuery":
+        cols = [c.strip() for c in columns.split(",") if c.strip()]
+        self.columns = None if not cols or "*" in cols else cols
+        self.count = count
+        return self
+
+    def insert(self, rows) -> "FakeQuery":
+        self.op, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: str = "id", **kwargs) -> "FakeQuery":
+        self.op, self.payload = "upsert", rows
+        self.on_conflict = tuple(c.strip() for c in on_conflict.split(","))
+        return self
+
+    def update(self, values: dict) -> "FakeQuery":
+        self.op, self.payload = "update", values
+        return self
+
+    def delete(self) -> "FakeQuery":
+        self.op = "delete"
+        return self
+
+    # Filters
+    def _filter(self, op: str, column: str, value) -> "FakeQuery":
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column: str, value) -> "FakeQuery":
+        return self._filter("eq", column, value)
+
+    def neq(self, column: str, value) -> "FakeQuery":
+        return self._filter("neq", column, value)
+
+    def gt(self, column: str, value) -> "FakeQuery":
+        return self._filter("gt", column, value)
+
+    def gte(self, column: str, value) -> "FakeQuery":
+        return self._filter("gte", column, value)
+
+    def lt(self, column: str, value) -> "FakeQuery":
+        return self._filter("lt", column, value)
+
+    def lte(self, column: str, value) -> "FakeQuery":
+        return self._filter("lte", column, value)
+
+    def in_(self, column: str, values: Iterable) -> "FakeQuery":
+        return self._filter("in", column, set(values))
+
+    def is_(self, column: str, value) -> "FakeQuery":
+        return self._filter("is", column, None if value in (None, "null") else value)
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False, **kwargs) -> "FakeQuery":
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, n: int) -> "FakeQuery":
+        self.limit_n = n
+        return self
+
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self.offset, self.limit_n = start, end - start + 1
+        return self
+
+    def single(self) -> "FakeQuery":
+        self.single_row = True
+        return self
+
+    def maybe_single(self) -> "FakeQuery":
+        return self.single()
+
+    def _matches(self, row: dict) -> bool:
+        for op, col, value in self.filters:
+            have = row.get(col)
+            if op == "eq" and have != value and _key(have) != _key(value):
+                return False
+            if op == "neq" and have == value:
+                return False
+            if op == "in" and have not in value:
+                return False
+            if op == "is" and have is not value:
+                return False
+            if op in ("gt", "gte", "lt", "lte"):
+                if have is None:
+                    return False
+                a, b = _key(have), _key(value)
+                if (op == "gt" and not a > b) or (op == "gte" and not a >= b) \
+                        or (op == "lt" and not a < b) or (op == "lte" and not a <= b):
+                    return False
+        return True
+
+    def _selected(self, tbl: _Table) -> List[dict]:
+        eqs = {col: value for op, col, value in self.filters if op == "eq"}
+        return [r for r in tbl.rows(eqs) if self._matches(r)]
+
+    def _page(self, rows: List[dict]) -> List[dict]:
+        """Ordered rows in the requested range, capped at the server's max_rows"""
+        for col, desc in reversed(self.orders):
+            present = [r for r in rows if r.get(col) is not None]
+            missing = [r for r in rows if r.get(col) is None]
+            # Postgres puts NULLs last ascending and first descending
+            present.sort(key=lambda r: _key(r[col]), reverse=desc)
+            rows = missing + present if desc else present + missing
+        limit = self.limit_n
+        if self.db.max_rows is not None:
+            limit = self.db.max_rows if limit is None else min(limit, self.db.max_rows)
+        if limit is not None or self.offset:
+            rows = rows[self.offset:None if limit is None else self.offset + limit]
+        return rows
+
+    def _project(self, row: dict) -> dict:
+        return dict(row) if self.columns is None else {c: row.get(c) for c in self.columns}
+
+    def execute(self) -> FakeResponse:
+        return self.db._execute(self)
+
+
+class FakeRpc(FakeQuery):
+    """An RPC call; its result rows can be ordered and paged like a select"""
+
+    def __init__(self, db: "FakeSupabase", name: str, params: dict):
+        super().__init__(db, f"rpc/{name}")
+        self.name, self.params = name, params or {}
+
+    def execute(self) -> FakeResponse:
+        return self.db._call(self)
+
+
+class FakeSupabase:
+    """In-memory stand-in for the Supabase client's table()/rpc() API.
+
+    Covers the queries the scanner, execution and risk engine issue
+    (select/insert/upsert/update/delete with eq/in_/gt/gte/lt/lte filters,
+    order, limit, range, single, count='exact') plus the candle_freshness and
+    recent_sentiment RPCs, so scans can run offline. Tables named in `indexes`
+    are partitioned by those columns for fast equality lookups. latency_ms
+    adds a simulated round trip to every request; requests are counted per
+    table like get_client_metrics(). max_rows caps every response like
+    PostgREST's db-max-rows (1000 on Supabase).
+    """
+
+    def __init__(self, indexes: Dict[str, Tuple[str, ...]] | None = None, latency_ms: float = 0.0,
+                 max_rows: int | None = None):
+        self.indexes = {"candles": ("symbol_id", "timeframe"), **(indexes or {})}
+        self.latency_ms = latency_ms
+        self.max_rows = max_rows
+        self.tables: Dict[str, _Table] = {}
+        self.rpcs: Dict[str, Callable[[dict], list]] = {
+            "candle_freshness": self._candle_freshness,
+            "recent_sentiment": self._recent_sentiment,
+        }
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def _table(self, name: str) -> _Table:
+        tbl = self.tables.get(name)
+        if tbl is None:
+            tbl = self.tables[name] = _Table(self.indexes.get(name, ()))
+        return tbl
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict | None = None) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def seed(self, table: str, rows: Iterable[dict]) -> None:
+        """Load rows directly (not counted as requests)"""
+        with self._lock:
+            tbl = self._table(table)
+            for row in rows:
+                tbl.add(dict(row))
+
+    def rows(self, table: str) -> List[dict]:
+        with self._lock:
+            return list(self._table(table).rows())
+
+    def _count(self, name: str) -> None:
+        self.requests[name] = self.requests.get(name, 0) + 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+
+    def _execute(self, q: FakeQuery) -> FakeResponse:
+        with self._lock:
+            self._count(q.table)
+            tbl = self._table(q.table)
+            if q.op in ("insert", "upsert"):
+                rows = q.payload if isinstance(q.payload, list) else [q.payload]
+                out = []
+                for row in rows:
+                    existing = tbl.find(q.on_conflict, row) if q.op == "upsert" else None
+                    if existing is not None:
+                        existing.update(row)
+                        out.append(dict(existing))
+                        continue
+                    row = dict(row)
+                    row.setdefault("id", str(uuid.uuid4()))
+                    if q.op == "insert":
+                        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+                    tbl.add(row)
+                    out.append(dict(row))
+                return FakeResponse(out)
+            rows = q._selected(tbl)
+            if q.op == "update":
+                for row in rows:
+                    tbl.remove(row)
+                    row.update(q.payload)
+                    tbl.add(row)
+                return FakeResponse([dict(r) for r in rows])
+            if q.op == "delete":
+                for row in rows:
+                    tbl.remove(row)
+                return FakeResponse([dict(r) for r in rows])
+            total = len(rows)
+            data = [q._project(r) for r in q._page(rows)]
+            if q.single_row:
+                if len(data) != 1:
+                    raise ValueError(f"single() expected 1 row from {q.table}, got {len(data)}")
+                data = data[0]
+        return FakeResponse(data, total if q.count else None)
+
+    def _call(self, call: FakeRpc) -> FakeResponse:
+        with self._lock:
+            self._count(call.table)
+            fn = self.rpcs.get(call.name)
+            if fn is None:
+                raise RuntimeError(f"function {call.name} does not exist")
+            return FakeResponse(call._page(fn(call.params)))
+
+    def _candle_freshness(self, params: dict) -> list:
+        active = {s["id"] for s in self._table("symbols").rows() if s.get("is_active")}
+        latest: Dict[str, list] = {}
+        for row in self._table("candles").rows():
+            if row.get("timeframe") != params.get("p_timeframe") or row.get("symbol_id") not in active:
+                continue
+            entry = latest.setdefault(row["symbol_id"], [row["ts"], 0])
+            if _key(row["ts"]) > _key(entry[0]):
+                entry[0] = row["ts"]
+            entry[1] += 1
+        return [{"symbol_id": sid, "latest_ts": ts, "row_count": n} for sid, (ts, n) in latest.items()]
+
+    def _recent_sentiment(self, params: dict) -> list:
+        lookback = int(params.get("p_lookback", 3))
+        scores: Dict[str, list] = {}
+        for row in sorted(self._table("sentiment").rows(), key=lambda r: _key(r["ts"]), reverse=True):
+            recent = scores.setdefault(row["symbol_id"], [])
+            if len(recent) < lookback:
+                recent.append(float(row["score"]))
+        symbols = {s["id"]: s for s in self._table("symbols").rows()}
+        return [
+            {"ticker": symbols[sid]["ticker"], "exchange": symbols[sid]["exchange"], "score": sum(v) / len(v)}
+            for sid, v in scores.items() if sid in symbols
+        ]
+
+
+def install_fake_client(sb: FakeSupabase) -> Callable[[], None]:
+    """Point get_client() at `sb` in every loaded apps.api module; returns a function that restores them"""
+    patched = []
+    for name, module in list(sys.modules.items()):
+        if (name.startswith("apps.api.") and name != "apps.api.supabase_client"
+                and callable(getattr(module, "get_client", None))):
+            patched.append((module, module.get_client))
+            module.get_client = lambda: sb
+
+    def restore() -> None:
+        for module, original in patched:
+            module.get_client = original
+    return restore
@@ -44,11 +44,27 @@ from apps.api.ai_endpoints import router as ai_router
 app.include_router(ai_router)
 
 @app.post("/scanner/run", response_model=RunResponse)
-def run_scanner(mode: str, force: bool = False, _=Depends(verify_scanner_token)):
+def run_scanner(mode: str, force: bool = False, pipelined: bool | None = None, panel: bool | None = None,
+                strategies: str | None = None, incremental: bool | None = None,
+                shards: int = 1, shard: int | None = None, parent_run_id: str | None = None,
+                _=Depends(verify_scanner_token)):
     if mode not in {"1m", "5m", "15m", "1d", "1h"}:
         raise HTTPException(status_code=400, detail="Invalid mode")
     from apps.api.scanner import scan_once
-    result = scan_once(mode, force=force)
+    names = [n.strip() for n in strategies.split(",") if n.strip()] if strategies else None
+    options = dict(force=force, pipelined=pipelined, panel=panel, strategies=names, incremental=incremental)
+    try:
+        if shards > 1 and shard is None:
+            # Coordinator: every shard in its own worker process, merged into one run
+            from apps.api.scan_shards import scan_sharded
+            result = scan_sharded(mode, shards, max_symbols=None, **options)
+        elif shards > 1:
+            # One shard of a scan coordinated elsewhere (see /scanner/merge)
+            result = scan_once(mode, shard=shard, shards=shards, parent_run_id=parent_run_id, max_symbols=None, **options)
+        else:
+            result = scan_once(mode, **options)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
         "status": "completed",
         "mode": mode,
@@ -57,6 +73,16 @@ def run_scanner(mode: str, force: bool = False, _=Depends(verify_scanner_token))
         "symbols_scanned": (result.get("symbols_scanned") if isinstance(result, dict) else None),
     }
 
+@app.post("/scanner/merge", response_model=RunResponse)
+def merge_scanner_shards(mode: str, parent_run_id: str, run_ids: str, _=Depends(verify_scanner_token)):
+    """Fold shard runs (comma-separated run ids) into their parent strategy_runs row"""
+    from apps.api.scan_shards import merge_shard_runs
+    from apps.api.supabase_client import get_client
+    ids = [i.strip() for i in run_ids.split(",") if i.strip()]
+    result = merge_shard_runs(get_client(), parent_run_id, ids)
+    return {"status": "completed", "mode": mode, "run_id": result["run_id"],
+            "signals": result["signals"], "symbols_scanned": result["symbols_scanned"]}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
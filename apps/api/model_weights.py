@@ -1,15 +1,100 @@
 from __future__ import annotations
 
-from typing import Dict
+import os
+import threading
+import time
+from typing import Callable, Dict, List
 from apps.api.supabase_client import get_client
 
+# Registered when a scan needs a model id and none exists yet
+DEFAULT_MODEL = {"version": "v0", "params": {"type": "linear-blend"}}
+
+
+class ModelRegistry:
+    """In-process cache of the latest ai_models row.
+
+    The row is served from memory; once older than ttl seconds a one-column
+    query checks whether a newer model id exists and only then reloads the
+    row. publish() (called by /ai/models/register) swaps in a new model
+    immediately. Listeners added with on_change() get the new row whenever
+    the active model id changes.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = float(os.getenv("MODEL_REGISTRY_TTL_S", "300")) if ttl is None else ttl
+        self._row: Dict | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Dict], None]] = []
+
+    def on_change(self, fn: Callable[[Dict], None]) -> None:
+        self._listeners.append(fn)
+
+    def _set(self, row: Dict | None) -> None:
+        changed = row is not None and (self._row is None or row.get("id") != self._row.get("id"))
+        self._row = row
+        self._checked_at = time.monotonic()
+        if changed:
+            print(f"🧠 Active model {row.get('version')} ({row.get('id')})")
+            for fn in list(self._listeners):
+                try:
+                    fn(row)
+                except Exception as e:
+                    print(f"⚠️ Model change listener failed: {e}")
+
+    def _refresh(self, sb) -> None:
+        if self._row is not None:
+            latest = sb.table('ai_models').select('id').order('created_at', desc=True).limit(1).execute().data
+            if latest and latest[0]["id"] == self._row.get("id"):
+                self._checked_at = time.monotonic()
+                return
+        data = sb.table('ai_models').select('*').order('created_at', desc=True).limit(1).execute().data
+        self._set(data[0] if data else None)
+
+    def latest(self, sb=None) -> Dict | None:
+        """Latest ai_models row (None if there is none); at most one version check per ttl"""
+        with self._lock:
+            if self._row is None or time.monotonic() - self._checked_at > self.ttl:
+                try:
+                    self._refresh(sb or get_client())
+                except Exception as e:
+                    # Keep serving the cached row if the check fails
+                    print(f"⚠️ Model registry refresh failed: {e}")
+            return self._row
+
+    def publish(self, row: Dict) -> None:
+        """Make a just-registered model active without a round trip"""
+        with self._lock:
+            self._set(row)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._row = None
+            self._checked_at = 0.0
+
+    def active_model_id(self, sb=None) -> str:
+        """Id of the latest model, registering DEFAULT_MODEL if the table is empty"""
+        row = self.latest(sb)
+        if row is None:
+            sb = sb or get_client()
+            with self._lock:
+                if self._row is None:
+                    self._set(sb.table('ai_models').insert(DEFAULT_MODEL).execute().data[0])
+                row = self._row
+        return row["id"]
+
+    def weights(self, defaults: Dict[str, float] | None = None, sb=None) -> Dict[str, float]:
+        row = self.latest(sb)
+        params = (row or {}).get('params') or {}
+        return params.get('weights') or defaults or {}
+
+
+MODELS = ModelRegistry()
+
 
 def get_latest_strategy_weights(defaults: Dict[str, float] | None = None) -> Dict[str, float]:
-    sb = get_client()
-    model = sb.table('ai_models').select('params').order('created_at', desc=True).limit(1).execute().data
-    if not model:
-        return defaults or {}
-    params = model[0].get('params') or {}
-    return params.get('weights') or defaults or {}
+    return MODELS.weights(defaults)
 
 
+def get_active_model_id(sb=None) -> str:
+    return MODELS.active_model_id(sb)
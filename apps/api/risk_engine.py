@@ -8,6 +8,8 @@ import time
 import pandas as pd
 
 from apps.api.supabase_client import get_client
+from apps.api.candle_store import get_candle_store
+from apps.api.strategies.indicators import ensure_indicators
 
 
 @dataclass
@@ -250,16 +252,16 @@ def apply_trailing_stops(timeframe: str = '1m') -> int:
         if qty == 0:
             continue
         sid = p["symbol_id"]
-        df = sb.table("candles").select("ts,close,high,low").eq("symbol_id", sid).eq("timeframe", timeframe).order("ts", desc=True).limit(100).execute().data
-        df = pd.DataFrame(df or [])
+        store = get_candle_store()
+        if store is not None:
+            df = store.load(sb, sid, timeframe, limit=100)
+        else:
+            df = sb.table("candles").select("ts,close,high,low").eq("symbol_id", sid).eq("timeframe", timeframe).order("ts", desc=True).limit(100).execute().data
+            df = pd.DataFrame(df or [])
         if df.empty:
             continue
-        df = df.sort_values("ts").reset_index(drop=True)
-        atr = float(pd.concat([
-            (df['high'].astype(float) - df['low'].astype(float)),
-            (df['high'].astype(float) - df['close'].astype(float).shift(1)).abs(),
-            (df['low'].astype(float) - df['close'].astype(float).shift(1)).abs(),
-        ], axis=1).max(axis=1).rolling(14).mean().iloc[-1])
+        df = ensure_indicators(df, ["atr_sma14"])
+        atr = float(df["atr_sma14"].iloc[-1])
         last_close = float(df.iloc[-1]['close'])
         entry = float(p["avg_price"]) or last_close
         side = 'LONG' if qty > 0 else 'SHORT'
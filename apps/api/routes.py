@@ -2,8 +2,8 @@ from apps.api.cleanup import cleanup_candle_data, get_cleanup_stats
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Literal
-from apps.api.supabase_client import get_client
-from apps.api.yahoo_client import fetch_yahoo_candles, fetch_real_time_quote
+from apps.api.supabase_client import get_client, get_client_metrics
+from apps.api.yahoo_client import fetch_yahoo_candles, fetch_yahoo_candles_df, candle_rows, fetch_real_time_quote, fetch_real_time_quotes
 from apps.api.execution import simulate_order, apply_trade_updates
 from apps.api.risk_engine import get_limits, suggest_position_size, should_block_order, apply_trailing_stops
 from apps.api.analytics import pnl_summary
@@ -102,19 +102,10 @@ def fetch_and_store_candles(ticker: str, exchange: Literal['NSE','BSE'] = 'NSE',
         print (sym)
         if not sym:
             raise HTTPException(status_code=404, detail="Symbol not found")
-        candles = fetch_yahoo_candles(ticker, exchange, timeframe=tf, lookback_days=lookback_days)
-        if not candles:
+        candles = fetch_yahoo_candles_df(ticker, exchange, timeframe=tf, lookback_days=lookback_days)
+        if candles.empty:
             return {"ingested": 0}
-        rows = [{
-            "symbol_id": sym["id"],
-            "timeframe": tf,
-            "ts": c["ts"],
-            "open": c["open"],
-            "high": c["high"],
-            "low": c["low"],
-            "close": c["close"],
-            "volume": c.get("volume"),
-        } for c in candles]
+        rows = candle_rows(candles, sym["id"], tf)
         sb.table("candles").upsert(rows, on_conflict="symbol_id,timeframe,ts").execute()
         return {"ingested": len(rows)}
     except HTTPException:
@@ -168,27 +159,18 @@ def get_candles(
 
                 if needs_fresh:
                     # Fetch fresh data from Yahoo Finance
-                    fresh_candles = fetch_yahoo_candles(ticker, exchange, tf, lookback_days=2)
+                    fresh_candles = fetch_yahoo_candles_df(ticker, exchange, tf, lookback_days=2)
 
-                    if fresh_candles and len(fresh_candles) > 0:
+                    if not fresh_candles.empty:
                         # Filter out zero-value candles before storing
-                        valid_candles = [c for c in fresh_candles if c.get("open", 0) > 0 and c.get("close", 0) > 0]
+                        valid_candles = fresh_candles[(fresh_candles["open"] > 0) & (fresh_candles["close"] > 0)]
                         zero_candles = len(fresh_candles) - len(valid_candles)
 
                         if zero_candles > 0:
                             print(f"⚠️ Filtered out {zero_candles} zero-value candles from Yahoo data")
 
                         # Store only valid candles in database
-                        rows = [{
-                            "symbol_id": sym["id"],
-                            "timeframe": tf,
-                            "ts": c["ts"],
-                            "open": c["open"],
-                            "high": c["high"],
-                            "low": c["low"],
-                            "close": c["close"],
-                            "volume": c.get("volume"),
-                        } for c in valid_candles]
+                        rows = candle_rows(valid_candles, sym["id"], tf)
 
                         if rows:
                             sb.table("candles").upsert(rows, on_conflict="symbol_id,timeframe,ts").execute()
@@ -423,6 +405,12 @@ def debug_scanner():
     }
 
 
+@router.get("/debug/db-metrics")
+def debug_db_metrics(reset: bool = False):
+    """Per-table Supabase request counts and latency for this process"""
+    return {"tables": get_client_metrics(reset=reset)}
+
+
 # Mock data generation functions removed - requires real database connection
 
 
@@ -1035,6 +1023,24 @@ def get_real_time_price(ticker: str, exchange: Literal['NSE','BSE'] = 'NSE'):
         raise HTTPException(status_code=500, detail=f"Error fetching real-time price: {str(e)}")
 
 
+@router.get("/prices/realtime/batch")
+def get_real_time_prices(tickers: str, exchange: Literal['NSE','BSE'] = 'NSE'):
+    """Get real-time prices for a comma-separated list of tickers in one call"""
+    ticker_list = [t.strip() for t in tickers.split(",") if t.strip()]
+    if not ticker_list:
+        raise HTTPException(status_code=400, detail="No tickers given")
+    quotes = fetch_real_time_quotes(ticker_list, exchange)
+    prices = {}
+    for ticker in ticker_list:
+        if ticker in quotes:
+            prices[ticker] = {"price": quotes[ticker], "source": "yahoo_realtime"}
+            continue
+        fallback_price = get_latest_price_from_candles(ticker, exchange)
+        if fallback_price > 0:
+            prices[ticker] = {"price": fallback_price, "source": "database_candles"}
+    return {"exchange": exchange, "prices": prices}
+
+
 def get_latest_price_from_candles(ticker: str, exchange: Literal['NSE','BSE'] = 'NSE') -> float:
     """Get the most recent price from stored candles as fallback"""
     sb = get_client()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import ast
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from apps.api.supabase_client import get_client
+
+# Counters summed across shard runs into the parent run's metadata
+_SUMMED = ("delta_updates", "full_refreshes", "evaluated", "skipped")
+
+# One long-lived worker process per (shard, shards): a shard always lands in the
+# same process, so its in-process caches (evaluated bars, indicator state,
+# Hull screen, model registry) carry over between runs. Workers are spawned, not
+# forked: the API process is threaded and holds pooled Supabase/Yahoo connections
+# a forked child would share (and locks it could inherit held)
+_POOLS: Dict[Tuple[int, int], ProcessPoolExecutor] = {}
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def _run_shard(mode: str, shard: int, shards: int, parent_run_id: str, kwargs: dict) -> dict:
+    from apps.api.scanner import scan_once
+    return scan_once(mode, shard=shard, shards=shards, parent_run_id=parent_run_id, **kwargs)
+
+
+def _metadata(row: dict) -> dict:
+    meta = row.get("metadata")
+    if isinstance(meta, str):
+        try:
+            meta = ast.literal_eval(meta)
+        except (ValueError, SyntaxError):
+            meta = {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def merge_shard_runs(sb, parent_run_id: str, shard_run_ids: List[str], failed_shards: List[int] | None = None) -> dict:
+    """Fold shard-level strategy_runs rows into the parent run and return the totals"""
+    rows = []
+    if shard_run_ids:
+        rows = sb.table("strategy_runs").select("id,symbols_scanned,signals_generated,metadata").in_("id", shard_run_ids).execute().data or []
+    metas = [_metadata(r) for r in rows]
+    summary = {
+        "shards": max([m.get("shards", 0) for m in metas] + [len(shard_run_ids) + len(failed_shards or [])]),
+        "shard_runs": [r["id"] for r in rows],
+        "failed_shards": sorted(failed_shards or []),
+        "incomplete_runs": [r["id"] for r in rows if r.get("symbols_scanned") is None],
+        **{k: sum(int(m.get(k) or 0) for m in metas) for k in _SUMMED},
+    }
+    symbols_scanned = sum(int(r.get("symbols_scanned") or 0) for r in rows)
+    signals = sum(int(r.get("signals_generated") or 0) for r in rows)
+    sb.table("strategy_runs").update({
+        "symbols_scanned": symbols_scanned,
+        "signals_generated": signals,
+        "completed_at": datetime.now(timezone.utc).isoformat(),
+        "metadata": str(summary),
+    }).eq("id", parent_run_id).execute()
+    print(f"🧩 Merged {len(rows)} shard runs into {parent_run_id}: {symbols_scanned} symbols, {signals} signals")
+    return {"run_id": parent_run_id, "signals": signals, "symbols_scanned": symbols_scanned, **summary}
+
+
+def scan_sharded(mode: str, shards: int, in_process: bool = False, **kwargs) -> dict:
+    """Coordinator: scan every shard (one worker process each) and merge them into one run.
+
+    kwargs go to scan_once for every shard. Workers on other machines can
+    instead call scan_once(shard=i, shards=n, parent_run_id=...) (e.g. via
+    /scanner/run) and the coordinator merges their run ids with merge_shard_runs.
+    in_process=True runs the shards one after another in this process.
+    """
+    if shards < 1:
+        raise ValueError(f"shards must be at least 1, got {shards}")
+    sb = get_client()
+    parent = sb.table("strategy_runs").insert({
+        "mode": mode, "symbols_scanned": None, "signals_generated": None,
+        "metadata": str({"shards": shards, "coordinator": True}),
+    }).execute().data[0]
+    print(f"🧩 Sharded scan {parent['id']}: {shards} shards")
+
+    run_ids, failed = [], []
+    if in_process:
+        for shard in range(shards):
+            try:
+                run_ids.append(_run_shard(mode, shard, shards, parent["id"], kwargs)["run_id"])
+            except Exception as e:
+                print(f"❌ Shard {shard} failed: {e}")
+                failed.append(shard)
+    else:
+        futures = {}
+        for shard in range(shards):
+            pool = _POOLS.get((shard, shards))
+            if pool is None:
+                pool = _POOLS[(shard, shards)] = ProcessPoolExecutor(max_workers=1, mp_context=_MP_CONTEXT)
+            futures[shard] = pool.submit(_run_shard, mode, shard, shards, parent["id"], kwargs)
+        for shard, fut in futures.items():
+            try:
+                run_ids.append(fut.result()["run_id"])
+            except Exception as e:
+                print(f"❌ Shard {shard} failed: {e}")
+                failed.append(shard)
+                # A broken worker is replaced on the next run
+                _POOLS.pop((shard, shards), None)
+    return merge_shard_runs(sb, parent["id"], run_ids, failed)
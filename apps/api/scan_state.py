@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Hashable, Tuple
+
+
+class EvaluatedBars:
+    """Last closed bar evaluated per (symbol, timeframe), with the strategies run on it.
+
+    A symbol is dirty when it has a newer closed bar than the one last
+    evaluated, or when a different strategy set asks for it. Indicator state
+    lives alongside in the streaming IndicatorStore, keyed the same way.
+    """
+
+    def __init__(self):
+        self._last: Dict[Hashable, Tuple[int, tuple]] = {}
+        self._lock = threading.Lock()
+
+    def is_dirty(self, key: Hashable, bar_ns: int | None, strategies: tuple) -> bool:
+        if bar_ns is None:
+            return True
+        with self._lock:
+            last = self._last.get(key)
+        return last is None or bar_ns > last[0] or last[1] != strategies
+
+    def mark(self, key: Hashable, bar_ns: int | None, strategies: tuple) -> None:
+        if bar_ns is None:
+            return
+        with self._lock:
+            self._last[key] = (bar_ns, strategies)
+
+    def forget(self, key: Hashable | None = None) -> None:
+        with self._lock:
+            if key is None:
+                self._last.clear()
+            else:
+                self._last.pop(key, None)
+
+
+_EVALUATED = EvaluatedBars()
+
+
+def get_evaluated_bars() -> EvaluatedBars:
+    return _EVALUATED
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import random
+import time
+from typing import Dict, List, Set
+
+# Decision -> signal action it is linked to (EXIT / PASS link to no signal)
+_DECISION_ACTION = {"ENTER_LONG": "BUY", "ENTER_SHORT": "SELL"}
+
+
+class ScanWriter:
+    """Buffers a scan run's signals and decisions and writes them in batches.
+
+    add() queues one symbol result; once batch_size rows are buffered they are
+    flushed: signals are inserted in chunks, each decision is linked to the
+    id of its symbol's strongest signal in the decision's direction, then the
+    decisions are inserted in chunks. A chunk that still fails after
+    max_retries is kept and retried by close() instead of failing the run;
+    the symbols whose rows still fail then are left in failed_symbols.
+    """
+
+    def __init__(self, sb, model_id: str, batch_size: int | None = None, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_cap: float = 8.0):
+        self.sb = sb
+        self.model_id = model_id
+        self.batch_size = max(1, batch_size if batch_size is not None else int(os.getenv("SCAN_WRITE_BATCH", "200")))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._results: List[dict] = []
+        self._rows = 0
+        self._failed: List[tuple] = []
+        self.failed_symbols: Set[str] = set()
+        self.stats = {"signals": 0, "decisions": 0, "requests": 0, "retries": 0, "failed_rows": 0}
+
+    def add(self, result: dict) -> int:
+        """Queue one symbol result; returns the signals it counts toward the run total"""
+        self._results.append(result)
+        self._rows += len(result["signal_rows"]) + 1
+        if self._rows >= self.batch_size:
+            self.flush()
+        return result["signals_generated"]
+
+    def _insert(self, table: str, rows: List[dict]) -> List[dict] | None:
+        """Insert one chunk with retries; None if it still fails"""
+        attempt = 0
+        while True:
+            self.stats["requests"] += 1
+            try:
+                return self.sb.table(table).insert(rows).execute().data or []
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    print(f"❌ {table} batch of {len(rows)} failed after {attempt + 1} attempts: {e}")
+                    return None
+                self.stats["retries"] += 1
+                time.sleep(random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt))))
+                attempt += 1
+
+    def _write(self, table: str, rows: List[dict], owners: List[str | None]) -> List[dict]:
+        """Insert rows (owners: each row's symbol id) in batch_size chunks; failed chunks are kept for close()"""
+        out: List[dict] = []
+        for i in range(0, len(rows), self.batch_size):
+            chunk = rows[i:i + self.batch_size]
+            data = self._insert(table, chunk)
+            if data is None:
+                self._failed.append((table, chunk, owners[i:i + self.batch_size]))
+                data = []
+            out.extend(data)
+        return out
+
+    def flush(self) -> None:
+        results, self._results, self._rows = self._results, [], 0
+        if not results:
+            return
+        signal_rows = [row for r in results for row in r["signal_rows"]]
+        inserted = self._write("signals", signal_rows, [row.get("symbol_id") for row in signal_rows]) if signal_rows else []
+        self.stats["signals"] += len(inserted)
+        # Strongest inserted signal per (symbol, action) for the decision links
+        best: Dict[tuple, dict] = {}
+        for row in inserted:
+            key = (row.get("symbol_id"), row.get("action"))
+            if row.get("id") and (key not in best or (row.get("confidence") or 0) > (best[key].get("confidence") or 0)):
+                best[key] = row
+        decisions = []
+        for r in results:
+            sid = r["signal_rows"][0]["symbol_id"] if r["signal_rows"] else None
+            link = best.get((sid, _DECISION_ACTION.get(r["decision"]["decision"])))
+            decisions.append({"model_id": self.model_id, "signal_id": link["id"] if link else None, **r["decision"]})
+        self.stats["decisions"] += len(self._write("ai_decisions", decisions, [r.get("symbol_id") for r in results]))
+
+    def close(self) -> Dict[str, int]:
+        """Flush what is buffered, retry failed chunks once more and return write stats"""
+        self.flush()
+        failed, self._failed = self._failed, []
+        for table, chunk, owners in failed:
+            data = self._insert(table, chunk)
+            if data is None:
+                self.stats["failed_rows"] += len(chunk)
+                self.failed_symbols.update(sid for sid in owners if sid is not None)
+            else:
+                self.stats["signals" if table == "signals" else "decisions"] += len(data)
+        return dict(self.stats)
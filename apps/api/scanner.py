@@ -1,84 +1,92 @@
 from __future__ import annotations
 
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime, timezone
 from typing import List
 import pandas as pd
 import gc
+import multiprocessing
+import os
+import time
+import zlib
 
+from apps.api import clock
 from apps.api.supabase_client import get_client
-from apps.api.yahoo_client import fetch_yahoo_candles
-from apps.api.strategies.indicators import add_core_indicators
-from apps.api.strategies.engine import run_strategies, signal_quality_filter
-from apps.api.signal_generator import ScoredSignal, score_signal, ensemble
-from apps.api.model_weights import get_latest_strategy_weights
+from apps.api.candle_freshness import load_candle_freshness
+from apps.api.candle_store import get_candle_store
+from apps.api.candle_resample import (BASE_HISTORY_DAYS, BASE_TIMEFRAME, DERIVED_TIMEFRAMES, latest_closed_bar_ns, resample_enabled,
+                                      update_derived)
+from apps.api.yahoo_client import fetch_yahoo_candles_df, candle_rows
+from apps.api.yahoo_http import get_yahoo_http
+from apps.api.strategies.indicators import ensure_indicators, required_warmup
+from apps.api.strategies.streaming import get_indicator_store
+from apps.api.strategies.panel import annotate_panel, PANEL_COLUMNS
+from apps.api.strategies.hull_screen import (HULL_MIN_SCORE, HULL_SCREEN_BARS, HULL_SCREEN_COLUMNS, get_hull_screen_cache,
+                                             hull_characteristics, hull_score)
+from apps.api.strategies.engine import StrategySpec, run_strategies, select_strategies, signal_quality_filter, strategy_window
+from apps.api.signal_generator import ScoredSignal, ensemble, score_candidates, scoring_panel, SCORING_COLUMNS
+from apps.api.sentiment_cache import get_sentiment_provider
+from apps.api.model_weights import MODELS
+from apps.api.scan_writer import ScanWriter
+from apps.api.scan_state import get_evaluated_bars
+
+
+
+def scan_strategies(mode: str, names: List[str] | None = None) -> List[StrategySpec]:
+    """Strategies to run for `mode`: `names`, else SCANNER_STRATEGIES (comma-separated), else the live ones"""
+    if names is None and os.getenv("SCANNER_STRATEGIES"):
+        names = [n.strip() for n in os.getenv("SCANNER_STRATEGIES", "").split(",") if n.strip()]
+    return select_strategies(names, timeframe=mode)
+
+
+def scan_columns(specs: List[StrategySpec]) -> tuple:
+    """Indicators a scan needs: the strategies' own, the scorer's and the Hull screen's"""
+    cols = [c for spec in specs for c in spec.columns]
+    return tuple(dict.fromkeys(cols + list(SCORING_COLUMNS) + list(HULL_SCREEN_COLUMNS)))
+
+
+def scan_window(specs: List[StrategySpec]) -> int:
+    """Candles to load per symbol: the most any enabled strategy, the scorer or the Hull screen needs"""
+    return max(strategy_window(specs), required_warmup(SCORING_COLUMNS) + 1, HULL_SCREEN_BARS)
+
+
+def _hull_verdict(ticker: str, chars: dict) -> bool:
+    """Suitable if the characteristics meet at least 3 of the 4 Hull criteria"""
+    score = hull_score(chars)
+    detail = (f"score: {score:.2f}, ADX: {chars['avg_adx']:.1f}, Trend%: {chars['trend_consistency']:.1%}, "
+              f"Vol: {chars['volatility_regime']:.3f}, HMA%: {chars['hma_slope_freq']:.1%}")
+    if score >= HULL_MIN_SCORE:
+        print(f"  ✅ {ticker} suitable for Hull ({detail})")
+        return True
+    print(f"  ❌ {ticker} not suitable for Hull ({detail})")
+    return False
 
 
 def check_hull_suitability(df: pd.DataFrame, ticker: str) -> bool:
     """Check if stock meets quantitative criteria for Hull Suite suitability"""
-    from apps.api.strategies.indicators import add_core_indicators
-
-    # Need sufficient historical data
-    if len(df) < 200:  # Need at least 200 candles for reliable characteristics
+    # Need at least 200 candles for reliable characteristics
+    if len(df) < HULL_SCREEN_BARS:
         return False
-
-    # Calculate Hull-specific characteristics
     try:
-        # Add indicators needed for analysis
-        df_analyzed = add_core_indicators(df.copy())
-
-        if len(df_analyzed) < 100 or 'hma55' not in df_analyzed.columns:
-            return False
-
-        # Key characteristics that discriminate profitable vs unprofitable stocks
-        avg_adx = df_analyzed['adx14'].mean()
-        trend_consistency = (df_analyzed['adx14'] > 25).mean()  # % time in trending regime
-        volatility_regime = df_analyzed['bb_width'].mean()
-
-        # HMA slope analysis
-        hma_slopes = []
-        for i in range(2, len(df_analyzed)):
-            slope = df_analyzed['hma55'].iloc[i] - df_analyzed['hma55'].iloc[i-2]
-            hma_slopes.append(slope)
-
-        hma_slope_freq = 0
-        if hma_slopes:
-            slope_changes = sum(1 for i in range(1, len(hma_slopes)) if (hma_slopes[i] * hma_slopes[i-1]) < 0)
-            hma_slope_freq = slope_changes / len(hma_slopes)
-
-        # Hull suitability criteria based on profitable stock patterns
-        criteria_met = 0
-        total_criteria = 4
-
-        # 1. Trending market (ADX > 22) - Hull works in trending conditions
-        if avg_adx > 22:
-            criteria_met += 1
-
-        # 2. Moderate trend consistency (25-60% of time trending)
-        if 0.25 <= trend_consistency <= 0.60:
-            criteria_met += 1
-
-        # 3. Moderate volatility (not too choppy, not too trending)
-        if 0.02 <= volatility_regime <= 0.08:
-            criteria_met += 1
-
-        # 4. Reasonable HMA slope frequency (not too noisy, not too static)
-        if 0.15 <= hma_slope_freq <= 0.45:
-            criteria_met += 1
-
-        # Must meet at least 3 out of 4 criteria
-        suitability_score = criteria_met / total_criteria
-
-        # Debug output for first few stocks
-        if suitability_score >= 0.75:  # Meets 3+ criteria
-            print(f"  ✅ {ticker} suitable for Hull (score: {suitability_score:.2f}, ADX: {avg_adx:.1f}, Trend%: {trend_consistency:.1%}, Vol: {volatility_regime:.3f}, HMA%: {hma_slope_freq:.1%})")
-            return True
-        else:
-            print(f"  ❌ {ticker} not suitable for Hull (score: {suitability_score:.2f}, ADX: {avg_adx:.1f}, Trend%: {trend_consistency:.1%}, Vol: {volatility_regime:.3f}, HMA%: {hma_slope_freq:.1%})")
-            return False
-
+        chars = hull_characteristics(ensure_indicators(df, HULL_SCREEN_COLUMNS))
     except Exception as e:
         print(f"  ⚠️ Error calculating Hull suitability for {ticker}: {e}")
         return False
+    return _hull_verdict(ticker, chars)
+
+
+def screen_hull(frames: dict, tickers: dict, mode: str) -> dict:
+    """Hull suitability for many frames {symbol_id: df}, cached per symbol/timeframe/trading day.
+
+    Returns {symbol_id: bool}; if the screen fails nothing is returned and
+    callers fall back to check_hull_suitability.
+    """
+    try:
+        chars = get_hull_screen_cache().screen(frames, mode)
+    except Exception as e:
+        print(f"  ⚠️ Hull screen failed, checking symbols one by one: {e}")
+        return {}
+    return {sid: _hull_verdict(tickers[sid], chars[sid]) if sid in chars else False for sid in frames}
 
 
 def is_overbought_oversold(df: pd.DataFrame) -> bool:
@@ -123,25 +131,26 @@ def is_overbought_oversold(df: pd.DataFrame) -> bool:
     return False
 
 
-def get_existing_candle_info(symbol_id: str, tf: str) -> dict:
-    """Get information about existing candle data"""
+def get_existing_candle_info(symbol_id: str, tf: str, freshness: dict | None = None) -> dict:
+    """Get information about existing candle data (from the run's freshness map when given)"""
+    if freshness is not None:
+        info = freshness.get(symbol_id)
+        if not info:
+            return {'exists': False, 'latest_date': None}
+        return {'exists': True, 'latest_date': info['latest_date'], 'count': info['count']}
     try:
         sb = get_client()
-        # Get the most recent candle
-        latest_candle = sb.table('candles').select('ts').eq('symbol_id', symbol_id).eq('timeframe', tf).order('ts', desc=True).limit(1).execute().data
+        # Get the most recent candle and the total count in one request
+        resp = sb.table('candles').select('ts', count='exact').eq('symbol_id', symbol_id).eq('timeframe', tf).order('ts', desc=True).limit(1).execute()
+        latest_candle = resp.data
 
         if not latest_candle:
             return {'exists': False, 'latest_date': None}
 
-        latest_date = latest_candle[0]['ts']
-
-        # Get total count
-        all_candles = sb.table('candles').select('ts').eq('symbol_id', symbol_id).eq('timeframe', tf).execute().data
-
         return {
             'exists': True,
-            'latest_date': latest_date,
-            'count': len(all_candles) if all_candles else 0
+            'latest_date': latest_candle[0]['ts'],
+            'count': resp.count or 0
         }
     except Exception as e:
         print(f"❌ Error checking existing candle data: {e}")
@@ -169,7 +178,7 @@ def calculate_candle_delta_days(tf: str, existing_info: dict, max_lookback: int
 
     if isinstance(latest_date, datetime):
         from datetime import datetime, timezone
-        now = datetime.now(timezone.utc)
+        now = clock.utc_now()
 
         # Convert to IST for market hours check
         ist_hour = (now.hour + 5) % 24
@@ -251,16 +260,57 @@ def calculate_candle_delta_days(tf: str, existing_info: dict, max_lookback: int
 
     return 1
 
-def fetch_history_df(symbol_id: str, ticker: str, exchange: str, tf: str, lookback_days: int = 7) -> pd.DataFrame:
+def _load_recent_candles(sb, symbol_id: str, tf: str, limit: int = 300):
+    """Latest `limit` candles, served from the local candle cache when enabled"""
+    store = get_candle_store()
+    if store is not None:
+        try:
+            return store.load(sb, symbol_id, tf, limit=limit)
+        except Exception as e:
+            print(f"⚠️ Candle cache read failed for {symbol_id} {tf}, reading from DB: {e}")
+    return (
+        sb.table("candles").select("ts,open,high,low,close,volume")
+        .eq("symbol_id", symbol_id).eq("timeframe", tf)
+        .order("ts", desc=True).limit(limit).execute().data
+    )
+
+
+def _derive_from_base(tf: str, existing_info: dict, fetch_days: int) -> bool:
+    """Whether `tf` is refreshed by aggregating 5m bars rather than fetched from Yahoo.
+
+    Only timeframes that already have history and gaps 5m data can still
+    cover; first loads and long gaps are fetched directly.
+    """
+    return (resample_enabled() and tf in DERIVED_TIMEFRAMES and existing_info['exists']
+            and fetch_days <= BASE_HISTORY_DAYS)
+
+
+def _refresh_base_and_derived(sb, symbol_id: str, ticker: str, exchange: str, fetch_days: int) -> None:
+    """Fetch recent 5m bars once, store them and re-aggregate the affected 15m/1h/1d buckets"""
+    print(f"📊 Fetching {fetch_days} days of {BASE_TIMEFRAME} data for {ticker} (higher timeframes resampled)")
+    candles = fetch_yahoo_candles_df(ticker, exchange, BASE_TIMEFRAME, lookback_days=fetch_days)
+    if candles.empty:
+        print(f"⚠️ No new {BASE_TIMEFRAME} data available for {ticker}")
+        return
+    rows = candle_rows(candles, symbol_id, BASE_TIMEFRAME)
+    sb.table("candles").upsert(rows, on_conflict="symbol_id,timeframe,ts").execute()
+    print(f"💾 Stored {len(rows)} new {BASE_TIMEFRAME} candles for {ticker}")
+    store = get_candle_store()
+    if store is not None:
+        store.append(symbol_id, BASE_TIMEFRAME, candles)
+    update_derived(sb, symbol_id, candles)
+
+
+def fetch_history_df(symbol_id: str, ticker: str, exchange: str, tf: str, lookback_days: int = 7, freshness: dict | None = None,
+                     limit: int = 300) -> pd.DataFrame:
     sb = get_client()
 
     # Check existing data and calculate delta needed
-    existing_info = get_existing_candle_info(symbol_id, tf)
+    existing_info = get_existing_candle_info(symbol_id, tf, freshness)
     delta_days = calculate_candle_delta_days(tf, existing_info, lookback_days)
 
     # Always fetch some recent data during market hours for intraday timeframes
-    from datetime import datetime, timezone
-    now = datetime.now(timezone.utc)
+    now = clock.utc_now()
 
     # Convert to IST for market hours check
     ist_hour = (now.hour + 5) % 24
@@ -284,50 +334,41 @@ def fetch_history_df(symbol_id: str, ticker: str, exchange: str, tf: str, lookba
     if (tf in ['1m', '5m', '15m'] and is_market_hours) or delta_days > 0:
         # Fetch data from Yahoo
         fetch_days = max(delta_days, 1) if (tf in ['1m', '5m', '15m'] and is_market_hours) else delta_days
+        if _derive_from_base(tf, existing_info, fetch_days):
+            # One 5m fetch keeps 15m/1h/1d current; this timeframe's bars are aggregated from it
+            _refresh_base_and_derived(sb, symbol_id, ticker, exchange, fetch_days)
+            return _history_frame(_load_recent_candles(sb, symbol_id, tf, limit))
         print(f"📊 Fetching {fetch_days} days of {tf} data for {ticker}")
-        candles = fetch_yahoo_candles(ticker, exchange, tf, lookback_days=fetch_days)
+        candles = fetch_yahoo_candles_df(ticker, exchange, tf, lookback_days=fetch_days)
 
-        if not candles:
+        if candles.empty:
             print(f"⚠️ No new {tf} data available for {ticker}")
             # Fetch existing data from DB - reduced limit for memory
-            data = (
-                sb.table("candles").select("ts,open,high,low,close,volume")
-                .eq("symbol_id", symbol_id).eq("timeframe", tf)
-                .order("ts", desc=True).limit(300).execute().data
-            )
+            data = _load_recent_candles(sb, symbol_id, tf, limit)
         else:
-            rows = [{
-                "symbol_id": symbol_id,
-                "timeframe": tf,
-                "ts": c["ts"],
-                "open": c["open"],
-                "high": c["high"],
-                "low": c["low"],
-                "close": c["close"],
-                "volume": c.get("volume"),
-            } for c in candles]
+            rows = candle_rows(candles, symbol_id, tf)
 
             # Insert only new candles (upsert handles duplicates)
             if rows:
                 sb.table("candles").upsert(rows, on_conflict="symbol_id,timeframe,ts").execute()
                 print(f"💾 Stored {len(rows)} new {tf} candles for {ticker}")
+                # Write-through to the local candle cache
+                store = get_candle_store()
+                if store is not None:
+                    store.append(symbol_id, tf, candles)
 
             # Fetch all data (including newly inserted) - reduced limit for memory
-            data = (
-                sb.table("candles").select("ts,open,high,low,close,volume")
-                .eq("symbol_id", symbol_id).eq("timeframe", tf)
-                .order("ts", desc=True).limit(300).execute().data
-            )
+            data = _load_recent_candles(sb, symbol_id, tf, limit)
     else:
         # Data is up to date, just use existing data - reduced limit for memory
         print(f"📊 Data is current for {ticker} {tf}")
-        data = (
-            sb.table("candles").select("ts,open,high,low,close,volume")
-            .eq("symbol_id", symbol_id).eq("timeframe", tf)
-            .order("ts", desc=True).limit(300).execute().data
-        )
+        data = _load_recent_candles(sb, symbol_id, tf, limit)
 
-    df = pd.DataFrame(data)
+    return _history_frame(data)
+
+
+def _history_frame(data) -> pd.DataFrame:
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
     if df.empty:
         return df
     df["ts"] = pd.to_datetime(df["ts"], utc=True)
@@ -336,68 +377,142 @@ def fetch_history_df(symbol_id: str, ticker: str, exchange: str, tf: str, lookba
     return df
 
 
-def scan_once(mode: str, force: bool = False, max_symbols: int = 200) -> dict:
-    sb = get_client()
-    # Record run
-    print(f"Mode {mode} - Memory optimized (max {max_symbols} symbols)")
-    run = sb.table("strategy_runs").insert({"mode": mode, "symbols_scanned": None, "signals_generated": None}).execute().data[0]
-    run_id = run["id"]
-    symbols = sb.table("symbols").select("id,ticker,exchange").eq("is_active", True).order("ticker").limit(max_symbols).execute().data
-    total_signals = 0
-    delta_updates = 0
-    full_refreshes = 0
-    for i, s in enumerate(symbols):
-        sid = s["id"]; ticker = s["ticker"]; exch = s["exchange"]
-        print(f"🔍 Scanning {ticker}... ({i+1}/{len(symbols)})")
-        df = fetch_history_df(sid, ticker, exch, tf=mode)
-
-        # Track if this was a delta update or full refresh
-        existing_info = get_existing_candle_info(sid, mode)
-        if existing_info['exists']:
-            delta_updates += 1
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+_CPU_CONTEXT = None
+
+
+def _cpu_context():
+    """Start method for evaluation workers: forkserver (spawn where unavailable), never a fork of the scan process.
+
+    Workers start at the first submit, while I/O threads may hold the stdout,
+    rate-limiter or connection-pool locks a forked child would inherit. The
+    fork server preloads this module, so starting a worker stays cheap.
+    """
+    global _CPU_CONTEXT
+    if _CPU_CONTEXT is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(["apps.api.scanner"])
         else:
-            full_refreshes += 1
-        if df.empty or len(df) < 60:
-            continue
-        df = add_core_indicators(df)
-
-
-        # Dynamic Hull Suite suitability check based on quantitative characteristics
-        is_hull_suitable = check_hull_suitability(df, ticker)
-        if not is_hull_suitable:
-            continue  # Skip stocks that don't meet Hull suitability criteria
-
-        raw_signals = run_strategies(df)
-        if not raw_signals and force:
-            # deterministic forced signal for testing
-            last = df.iloc[-1]
-            prev = df.iloc[-2]
-            entry = float(last["close"]) 
-            atr = float(pd.concat([
-                (df['high'].astype(float) - df['low'].astype(float)),
-                (df['high'].astype(float) - df['close'].astype(float).shift(1)).abs(),
-                (df['low'].astype(float) - df['close'].astype(float).shift(1)).abs(),
-            ], axis=1).max(axis=1).rolling(14).mean().iloc[-1] or (entry*0.01))
-            stop = float(min(prev["low"], entry - 1.0 * atr))
-            target = float(entry + 2.0 * (entry - stop))
-            from apps.api.strategies.engine import Signal as StratSignal
-            raw_signals = [StratSignal("BUY", entry, stop, target, 0.6, "forced_test", {"reason": "force=true"})]
-        if not raw_signals:
-            continue
-        last_ts = df.iloc[-1]["ts"]
-        rows = []
-        scored: List[ScoredSignal] = []
+            ctx = multiprocessing.get_context("spawn")
+        _CPU_CONTEXT = ctx
+    return _CPU_CONTEXT
+
+
+def _fetch_symbol(s: dict, mode: str, freshness: dict | None = None, limit: int = 300) -> dict:
+    """I/O stage: refresh and load the candle window for one symbol"""
+    t0 = time.perf_counter()
+    df = fetch_history_df(s["id"], s["ticker"], s["exchange"], tf=mode, freshness=freshness, limit=limit)
+    # Track if this was a delta update or full refresh
+    existing_info = get_existing_candle_info(s["id"], mode, freshness)
+    return {"symbol": s, "df": df, "existed": existing_info['exists'], "seconds": time.perf_counter() - t0}
+
+
+def _symbol_signals(ticker: str, mode: str, df: pd.DataFrame, force: bool, strategies: tuple | None = None,
+                    hull_suitable: bool | None = None) -> list:
+    """Hull screen and strategies for one annotated frame: the raw (unscored) signals"""
+    # Dynamic Hull Suite suitability check based on quantitative characteristics (screened upstream if given)
+    is_hull_suitable = check_hull_suitability(df, ticker) if hull_suitable is None else hull_suitable
+    if not is_hull_suitable:
+        return []  # Skip stocks that don't meet Hull suitability criteria
+
+    raw_signals = run_strategies(df, strategies, timeframe=mode)
+    if not raw_signals and force:
+        # deterministic forced signal for testing
+        last = df.iloc[-1]
+        prev = df.iloc[-2]
+        entry = float(last["close"]) 
+        atr = float(ensure_indicators(df, ["atr_sma14"])["atr_sma14"].iloc[-1] or (entry*0.01))
+        stop = float(min(prev["low"], entry - 1.0 * atr))
+        target = float(entry + 2.0 * (entry - stop))
+        from apps.api.strategies.engine import Signal as StratSignal
+        raw_signals = [StratSignal("BUY", entry, stop, target, 0.6, "forced_test", {"reason": "force=true"})]
+    return raw_signals
+
+
+def _score_symbols(items: list) -> list:
+    """Score the raw signals of many symbols in one pass.
+
+    items are (df, raw_signals, sentiment bias or None); each signal is scored
+    on the last bar of its frame. Returns one [(confidence, rationale)] list per item.
+    """
+    frames = [df for df, _, _ in items]
+    rows, bars, actions, base, bias = [], [], [], [], []
+    for r, (df, raw_signals, s_bias) in enumerate(items):
+        s_bias = float("nan") if s_bias is None else s_bias
         for sig in raw_signals:
-            conf, rationale = score_signal(df, sig.action, sig.confidence, context={"ticker": ticker, "exchange": exch})
-            scored.append(ScoredSignal(
-                action=sig.action,
-                entry=sig.entry,
-                stop=sig.stop,
-                target=sig.target,
-                confidence=conf,
-                strategy=sig.strategy,
-                rationale={"rationale": sig.rationale, "scoring": rationale},
-            ))
+            rows.append(r); bars.append(len(df) - 1)
+            actions.append(sig.action); base.append(sig.confidence); bias.append(s_bias)
+    scores = score_candidates(scoring_panel(frames), rows, bars, actions, base, bias)
+    out, k = [], 0
+    for _, raw_signals, _ in items:
+        out.append([(float(scores.confidence[k + j]), scores.rationale(k + j, sig.confidence))
+                    for j, sig in enumerate(raw_signals)])
+        k += len(raw_signals)
+    return out
+
+
+def _evaluate_symbol(sid: str, ticker: str, exch: str, mode: str, df: pd.DataFrame, force: bool, weights: dict,
+                     strategies: tuple | None = None, sentiment: float | None = None,
+                     hull_suitable: bool | None = None) -> dict | None:
+    """CPU stage: Hull screen, strategies, scoring and ensemble for one annotated frame.
+
+    Pure function of its arguments (no DB access) so it can run in a worker process.
+    Returns the rows/decision for the writer, or None when the symbol produced nothing.
+    """
+    t0 = time.perf_counter()
+    raw_signals = _symbol_signals(ticker, mode, df, force, strategies, hull_suitable)
+    if not raw_signals:
+        return None
+    scored_pairs = _score_symbols([(df, raw_signals, sentiment)])[0]
+    return _symbol_result(sid, ticker, mode, df, raw_signals, scored_pairs, weights, t0)
+
+
+def _symbol_result(sid: str, ticker: str, mode: str, df: pd.DataFrame, raw_signals: list, scored_pairs: list,
+                   weights: dict, t0: float) -> dict:
+    """Signal rows and ensemble decision for one symbol's scored signals"""
+    rows = []
+    scored: List[ScoredSignal] = []
+    for sig, (conf, rationale) in zip(raw_signals, scored_pairs):
+        scored.append(ScoredSignal(
+            action=sig.action,
+            entry=sig.entry,
+            stop=sig.stop,
+            target=sig.target,
+            confidence=conf,
+            strategy=sig.strategy,
+            rationale={"rationale": sig.rationale, "scoring": rationale},
+        ))
+        rows.append({
+            "symbol_id": sid,
+            "timeframe": mode,
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "strategy": sig.strategy,
+            "action": sig.action,
+            "entry": sig.entry,
+            "stop": sig.stop,
+            "target": sig.target,
+            "confidence": conf,
+            "rationale": {"rationale": sig.rationale, "scoring": rationale},
+        })
+    # Apply stricter confidence threshold for signals (same as execution and backtest)
+    quality_signals = []
+    for sig in raw_signals:
+        # Apply the same filter used in backtest
+        if signal_quality_filter(sig, df) and sig.confidence >= 0.75:
+            quality_signals.append(sig)
+
+    signal_rows = []
+    if quality_signals:
+        # Convert to database format
+        rows = []
+        for sig in quality_signals:
             rows.append({
                 "symbol_id": sid,
                 "timeframe": mode,
@@ -407,78 +522,319 @@ def scan_once(mode: str, force: bool = False, max_symbols: int = 200) -> dict:
                 "entry": sig.entry,
                 "stop": sig.stop,
                 "target": sig.target,
-                "confidence": conf,
-                "rationale": {"rationale": sig.rationale, "scoring": rationale},
+                "confidence": sig.confidence,
+                "rationale": str({"rationale": sig.rationale, "quality_filtered": True}),  # Convert to string to avoid JSON serialization issues
             })
-        # Apply stricter confidence threshold for signals (same as execution and backtest)
-        quality_signals = []
-        for sig in raw_signals:
-            # Apply the same filter used in backtest
-            if signal_quality_filter(sig, df) and sig.confidence >= 0.75:
-                quality_signals.append(sig)
-
-        if quality_signals:
-            # Convert to database format
-            rows = []
-            for sig in quality_signals:
-                rows.append({
-                    "symbol_id": sid,
-                    "timeframe": mode,
-                    "ts": datetime.now(timezone.utc).isoformat(),
-                    "strategy": sig.strategy,
-                    "action": sig.action,
-                    "entry": sig.entry,
-                    "stop": sig.stop,
-                    "target": sig.target,
-                    "confidence": sig.confidence,
-                    "rationale": str({"rationale": sig.rationale, "quality_filtered": True}),  # Convert to string to avoid JSON serialization issues
-                })
-
-            if rows:
-                sb.table("signals").insert(rows).execute()
-        # Ensemble decision using latest model weights
-        weights = get_latest_strategy_weights(defaults={"trend_follow":1,"mean_reversion":1,"momentum":1})
-        ens = ensemble(scored, strategy_weights=weights)
-        # Map decision to DB enum
-        raw_decision = ens.get("decision")
-        if raw_decision in ("BUY", "ENTER_LONG"):
-            decision_val = "ENTER_LONG"
-        elif raw_decision in ("SELL", "ENTER_SHORT"):
-            decision_val = "ENTER_SHORT"
-        elif raw_decision in ("EXIT", "EXIT_LONG", "EXIT_SHORT"):
-            decision_val = "EXIT"
-        else:
-            decision_val = "PASS"
-        try:
-            model = sb.table("ai_models").insert({"version":"v0", "params": {"type": "linear-blend"}}).execute().data[0]
-        except Exception:
-            model = sb.table("ai_models").select("id").order("created_at", desc=True).limit(1).execute().data[0]
-        sb.table("ai_decisions").insert({
-            "model_id": model["id"],
+        signal_rows = rows
+    # Ensemble decision using latest model weights
+    ens = ensemble(scored, strategy_weights=weights)
+    # Map decision to DB enum
+    raw_decision = ens.get("decision")
+    if raw_decision in ("BUY", "ENTER_LONG"):
+        decision_val = "ENTER_LONG"
+    elif raw_decision in ("SELL", "ENTER_SHORT"):
+        decision_val = "ENTER_SHORT"
+    elif raw_decision in ("EXIT", "EXIT_LONG", "EXIT_SHORT"):
+        decision_val = "EXIT"
+    else:
+        decision_val = "PASS"
+    return {
+        "symbol_id": sid,
+        "ticker": ticker,
+        "signal_rows": signal_rows,
+        "signals_generated": len(rows),
+        "decision": {
             "weights": str(ens["weights"]),  # Convert to string to avoid JSON serialization issues
             "decision": decision_val,
             "rationale": str({"mode": mode, "symbol": ticker}),  # Convert to string
-        }).execute()
-        total_signals += len(rows)
+        },
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+def shard_of(symbol_id: str, shards: int) -> int:
+    """Deterministic shard (0..shards-1) of a symbol: stable across processes and machines"""
+    return zlib.crc32(str(symbol_id).encode()) % shards
 
-        # Memory cleanup after each symbol
-        del df, raw_signals, scored, ens, weights
-        gc.collect()
-    sb.table("strategy_runs").update({"symbols_scanned": len(symbols or []), "signals_generated": total_signals, "completed_at": datetime.now(timezone.utc).isoformat(), "metadata": str({"delta_updates": delta_updates, "full_refreshes": full_refreshes})}).eq("id", run_id).execute()
+
+def load_active_symbols(sb, page_size: int = 1000) -> list:
+    """Every active symbol ordered by ticker (paged past the PostgREST row cap)"""
+    out, start = [], 0
+    while True:
+        page = (sb.table("symbols").select("id,ticker,exchange").eq("is_active", True)
+                .order("ticker").range(start, start + page_size - 1).execute().data or [])
+        out.extend(page)
+        if len(page) < page_size:
+            return out
+        start += page_size
+
+
+def scan_once(mode: str, force: bool = False, max_symbols: int | None = 200, pipelined: bool | None = None,
+              io_workers: int | None = None, cpu_workers: int | None = None, panel: bool | None = None,
+              strategies: List[str] | None = None, incremental: bool | None = None,
+              shard: int | None = None, shards: int = 1, parent_run_id: str | None = None) -> dict:
+    """Scan active symbols for `mode` and record signals/decisions.
+
+    pipelined=True overlaps the stages: candle fetches and DB reads run in a
+    thread pool (io_workers), strategy evaluation in a process pool
+    (cpu_workers, 0 = inline) and results stream to a single writer. Defaults
+    come from SCANNER_PIPELINED / SCANNER_IO_WORKERS / SCANNER_CPU_WORKERS.
+
+    panel=True fetches the whole universe first (io_workers threads) and
+    computes indicators for every symbol in one panel pass before evaluating
+    them; default from SCANNER_PANEL.
+
+    strategies picks registered strategies by name (default SCANNER_STRATEGIES,
+    else the live ones); only the candle window and indicators they, the
+    scorer and the Hull screen need are loaded and computed.
+
+    SCANNER_SENTIMENT=1 adds each symbol's recent sentiment to the signal
+    scores; off by default, so confidences match the unbiased scoring.
+
+    incremental=True (default SCANNER_INCREMENTAL, on) skips indicators and
+    strategies for symbols with no closed bar newer than the one evaluated
+    by the previous run for this timeframe and strategy set; force=True
+    evaluates every symbol.
+
+    shard/shards scans one deterministic partition of all active symbols
+    (see shard_of; max_symbols then caps the shard) and records a shard-level
+    run linked to parent_run_id; scan_shards merges shard runs into the parent.
+    """
+    sharded = shard is not None and shards > 1
+    if sharded and not 0 <= shard < shards:
+        raise ValueError(f"shard must be in 0..{shards - 1}, got {shard}")
+    if pipelined is None:
+        pipelined = os.getenv("SCANNER_PIPELINED", "0").lower() in ("1", "true", "yes")
+    if panel is None:
+        panel = os.getenv("SCANNER_PANEL", "0").lower() in ("1", "true", "yes")
+    if incremental is None:
+        incremental = os.getenv("SCANNER_INCREMENTAL", "1").lower() in ("1", "true", "yes")
+    incremental = incremental and not force
+    io_workers = max(1, io_workers if io_workers is not None else _env_int("SCANNER_IO_WORKERS", 8))
+    cpu_workers = max(0, cpu_workers if cpu_workers is not None else _env_int("SCANNER_CPU_WORKERS", min(4, os.cpu_count() or 1)))
+
+    sb = get_client()
+    # Record run
+    print(f"Mode {mode} - Memory optimized (max {max_symbols} symbols)")
+    shard_info = {"shard": shard, "shards": shards, "parent_run_id": parent_run_id} if sharded else {}
+    run = sb.table("strategy_runs").insert({"mode": mode, "symbols_scanned": None, "signals_generated": None,
+                                            **({"metadata": str(shard_info)} if sharded else {})}).execute().data[0]
+    run_id = run["id"]
+    if sharded:
+        symbols = [s for s in load_active_symbols(sb) if shard_of(s["id"], shards) == shard]
+        symbols = symbols[:max_symbols] if max_symbols else symbols
+        print(f"🧩 Shard {shard + 1}/{shards}: {len(symbols)} symbols")
+    elif max_symbols:
+        symbols = sb.table("symbols").select("id,ticker,exchange").eq("is_active", True).order("ticker").limit(max_symbols).execute().data
+    else:
+        symbols = load_active_symbols(sb)
+    # Active model and ensemble weights come from the in-process registry (no per-run reads within its TTL)
+    model_id = MODELS.active_model_id(sb)
+    weights = MODELS.weights(defaults={"trend_follow":1,"mean_reversion":1,"momentum":1}, sb=sb)
+    # Sentiment is opt-in (SCANNER_SENTIMENT=1): prefetched in bulk and cached across runs for SENTIMENT_TTL_S
+    use_sentiment = os.getenv("SCANNER_SENTIMENT", "0").lower() in ("1", "true", "yes")
+    sentiment = get_sentiment_provider(sb) if use_sentiment else None
+
+    def bias(s: dict) -> float:
+        # Off: a zero bias, as the scanner has always scored (confidences unchanged)
+        return sentiment.bias(s["ticker"], s["exchange"]) if sentiment is not None else 0.0
+    # Latest ts / row count for every active symbol in one round trip (None -> per-symbol lookups)
+    freshness = load_candle_freshness(sb, mode)
+    specs = scan_strategies(mode, strategies)
+    names = tuple(spec.name for spec in specs)
+    columns = scan_columns(specs)
+    window = scan_window(specs)
+    min_bars = max(strategy_window(specs), 1)
+    print(f"🧠 Strategies {list(names)}: {window} candles, {len(columns)} indicators per symbol")
+    total_signals = 0
+    # Signals and decisions are buffered and inserted in batches (SCAN_WRITE_BATCH rows)
+    writer = ScanWriter(sb, model_id)
+    delta_updates = 0
+    full_refreshes = 0
+    evaluated = 0
+    skipped = 0
+    evaluated_bars = get_evaluated_bars()
+    # Closed bar each prepared symbol is being evaluated on, marked evaluated only once that succeeds
+    claimed = {}
+    timings = {"fetch_s": 0.0, "indicators_s": 0.0, "evaluate_s": 0.0, "write_s": 0.0}
+    wall_start = time.perf_counter()
+    http_start = get_yahoo_http().stats()
+
+    def prepare(fetched: dict, annotate: bool = True) -> pd.DataFrame | None:
+        nonlocal delta_updates, full_refreshes, evaluated, skipped
+        timings["fetch_s"] += fetched["seconds"]
+        if fetched["existed"]:
+            delta_updates += 1
+        else:
+            full_refreshes += 1
+        df = fetched["df"]
+        if df.empty or len(df) < min_bars:
+            return None
+        # Dirty set: only symbols with a new closed bar since their last evaluation go on
+        key = (fetched["symbol"]["id"], mode)
+        bar = latest_closed_bar_ns(df, mode, clock.now_ns())
+        if incremental and not evaluated_bars.is_dirty(key, bar, names):
+            skipped += 1
+            return None
+        claimed[fetched["symbol"]["id"]] = bar
+        evaluated += 1
+        if not annotate:
+            return df
+        t0 = time.perf_counter()
+        # Incremental indicators: only candles newer than the last scan are computed
+        df = get_indicator_store().annotate((fetched["symbol"]["id"], mode), df)
+        # Anything the strategies read beyond the streamed core set (e.g. hma55)
+        df = ensure_indicators(df, columns)
+        timings["indicators_s"] += time.perf_counter() - t0
+        return df
+
+    def done(sid: str) -> None:
+        # Evaluated and queued for writing: skip this bar from now on
+        evaluated_bars.mark((sid, mode), claimed.pop(sid, None), names)
+
+    def write(result: dict | None) -> None:
+        nonlocal total_signals
+        if result is None:
+            return
+        timings["evaluate_s"] += result["seconds"]
+        t0 = time.perf_counter()
+        total_signals += writer.add(result)
+        timings["write_s"] += time.perf_counter() - t0
+
+    try:
+        if panel:
+            print(f"🧮 Panel scan: indicators for {len(symbols or [])} symbols in one pass")
+            frames = {}
+            with ThreadPoolExecutor(max_workers=io_workers) as io_pool:
+                fetches = [io_pool.submit(_fetch_symbol, s, mode, freshness, window) for s in symbols]
+                for fut in as_completed(fetches):
+                    try:
+                        fetched = fut.result()
+                    except Exception as e:
+                        print(f"❌ Error fetching symbol: {e}")
+                        continue
+                    df = prepare(fetched, annotate=False)
+                    if df is not None:
+                        frames[fetched["symbol"]["id"]] = df
+            t0 = time.perf_counter()
+            annotated = annotate_panel(frames, columns=[c for c in columns if c in PANEL_COLUMNS])
+            extra = [c for c in columns if c not in PANEL_COLUMNS]
+            if extra:
+                annotated = {k: ensure_indicators(df, extra) for k, df in annotated.items()}
+            timings["indicators_s"] += time.perf_counter() - t0
+            # Hull screen for the whole universe, strategies per symbol, then every candidate scored in one batch
+            t0 = time.perf_counter()
+            suitable = screen_hull(annotated, {s["id"]: s["ticker"] for s in symbols}, mode)
+            candidates = []
+            for i, s in enumerate(symbols):
+                df = annotated.get(s["id"])
+                if df is None:
+                    continue
+                print(f"🔍 Scanning {s['ticker']}... ({i+1}/{len(symbols)})")
+                raw_signals = _symbol_signals(s["ticker"], mode, df, force, names, suitable.get(s["id"]))
+                if raw_signals:
+                    candidates.append((s, df, raw_signals))
+            scored = _score_symbols([(df, sigs, bias(s)) for s, df, sigs in candidates]) if candidates else []
+            timings["evaluate_s"] += time.perf_counter() - t0
+            for (s, df, raw_signals), pairs in zip(candidates, scored):
+                result = _symbol_result(s["id"], s["ticker"], mode, df, raw_signals, pairs, weights, time.perf_counter())
+                write(result)
+            for sid in annotated:
+                done(sid)
+            del frames, annotated
+            gc.collect()
+        elif not pipelined:
+            for i, s in enumerate(symbols):
+                sid = s["id"]; ticker = s["ticker"]; exch = s["exchange"]
+                print(f"🔍 Scanning {ticker}... ({i+1}/{len(symbols)})")
+                df = prepare(_fetch_symbol(s, mode, freshness, window))
+                if df is None:
+                    continue
+                suitable = screen_hull({sid: df}, {sid: ticker}, mode).get(sid)
+                write(_evaluate_symbol(sid, ticker, exch, mode, df, force, weights, names, bias(s), suitable))
+                done(sid)
+
+                # Memory cleanup after each symbol
+                del df
+                gc.collect()
+        else:
+            print(f"⚡ Pipelined scan: {io_workers} I/O workers, {cpu_workers} CPU workers")
+            # Workers come from a clean fork server, not from this threaded process (see _cpu_context)
+            cpu_pool = ProcessPoolExecutor(max_workers=cpu_workers, mp_context=_cpu_context()) if cpu_workers > 0 else None
+            try:
+                with ThreadPoolExecutor(max_workers=io_workers) as io_pool:
+                    fetches = [io_pool.submit(_fetch_symbol, s, mode, freshness, window) for s in symbols]
+                    pending = {}
+
+                    def drain(block: bool) -> None:
+                        # Single writer: results are persisted here, on the calling thread only
+                        finished, _ = wait(list(pending), timeout=None if block else 0, return_when=ALL_COMPLETED if block else FIRST_COMPLETED)
+                        for fut in finished:
+                            sid = pending.pop(fut)
+                            try:
+                                write(fut.result())
+                            except Exception as e:
+                                print(f"❌ Error evaluating symbol: {e}")
+                                continue
+                            done(sid)
+
+                    for i, fut in enumerate(as_completed(fetches)):
+                        try:
+                            fetched = fut.result()
+                        except Exception as e:
+                            print(f"❌ Error fetching symbol: {e}")
+                            continue
+                        s = fetched["symbol"]
+                        print(f"🔍 Scanning {s['ticker']}... ({i+1}/{len(symbols)})")
+                        df = prepare(fetched)
+                        if df is not None:
+                            # Screened here so the per-day cache lives in this process
+                            suitable = screen_hull({s["id"]: df}, {s["id"]: s["ticker"]}, mode).get(s["id"])
+                            args = (s["id"], s["ticker"], s["exchange"], mode, df, force, weights, names, bias(s), suitable)
+                            if cpu_pool is not None:
+                                pending[cpu_pool.submit(_evaluate_symbol, *args)] = s["id"]
+                            else:
+                                write(_evaluate_symbol(*args))
+                                done(s["id"])
+                        if pending:
+                            drain(block=False)
+                    if pending:
+                        drain(block=True)
+            finally:
+                if cpu_pool is not None:
+                    cpu_pool.shutdown()
+    finally:
+        # Whatever is buffered is written even if a stage fails
+        t0 = time.perf_counter()
+        writes = writer.close()
+        timings["write_s"] += time.perf_counter() - t0
+        # Symbols whose rows could not be written are evaluated again next scan
+        for sid in writer.failed_symbols:
+            evaluated_bars.forget((sid, mode))
+    timings = {k: round(v, 3) for k, v in timings.items()}
+    timings["wall_s"] = round(time.perf_counter() - wall_start, 3)
+    http = {k: round(v - http_start[k], 3) for k, v in get_yahoo_http().stats().items()}
+    sb.table("strategy_runs").update({"symbols_scanned": len(symbols or []), "signals_generated": total_signals, "completed_at": datetime.now(timezone.utc).isoformat(), "metadata": str({**shard_info, "delta_updates": delta_updates, "full_refreshes": full_refreshes, "pipelined": pipelined, "panel": panel, "strategies": list(names), "window": window, "io_workers": io_workers, "cpu_workers": cpu_workers, "evaluated": evaluated, "skipped": skipped, "timings": timings, "yahoo_http": http, "writes": writes})}).eq("id", run_id).execute()
 
     print("\n📋 SCAN SUMMARY:")
     print(f"  Total symbols processed: {len(symbols or [])}")
     print(f"  Delta updates: {delta_updates}")
     print(f"  Full refreshes: {full_refreshes}")
     print(f"  Total signals generated: {total_signals}")
+    print(f"  Evaluated: {evaluated}, skipped (no new closed bar): {skipped}")
     print(f"  Efficiency: {delta_updates/(delta_updates+full_refreshes)*100:.1f}% delta updates")
+    print(f"  Stage timings: {timings}")
+    print(f"  Yahoo HTTP: {http}")
+    print(f"  Writes: {writes}")
 
     return {
         "run_id": run_id,
         "signals": total_signals,
         "symbols_scanned": len(symbols or []),
         "delta_updates": delta_updates,
-        "full_refreshes": full_refreshes
+        "full_refreshes": full_refreshes,
+        "evaluated": evaluated,
+        "skipped": skipped,
+        "timings": timings,
+        **shard_info,
     }
-
-
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Tuple
+
+
+class SentimentProvider:
+    """Recent sentiment bias per (ticker, exchange), served from memory.
+
+    Scores are prefetched in bulk (see load_sentiment) so bias() is a dict
+    lookup: scoring never touches the network. Symbols without sentiment get 0.0.
+    """
+
+    def __init__(self, scores: Dict[Tuple[str, str], float] | None = None, loaded_at: float | None = None):
+        self.scores = dict(scores or {})
+        self.loaded_at = time.monotonic() if loaded_at is None else loaded_at
+
+    def bias(self, ticker: str, exchange: str) -> float:
+        return self.scores.get((ticker, exchange), 0.0)
+
+    def age(self) -> float:
+        """Seconds since the scores were loaded"""
+        return time.monotonic() - self.loaded_at
+
+
+def _load_from_table(sb, lookback: int, days: int, page_size: int = 1000) -> Dict[Tuple[str, str], float]:
+    # Fallback: recent rows of the sentiment table, newest first, paged
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    latest: Dict[str, list] = {}
+    start = 0
+    while True:
+        rows = (
+            sb.table('sentiment').select('symbol_id,score')
+            .gte('ts', since).order('ts', desc=True)
+            .range(start, start + page_size - 1).execute().data or []
+        )
+        for row in rows:
+            scores = latest.setdefault(row['symbol_id'], [])
+            if len(scores) < lookback:
+                scores.append(float(row['score']))
+        if len(rows) < page_size:
+            break
+        start += page_size
+    if not latest:
+        return {}
+    symbols = sb.table('symbols').select('id,ticker,exchange').in_('id', list(latest)).execute().data or []
+    return {
+        (s['ticker'], s['exchange']): sum(latest[s['id']]) / len(latest[s['id']])
+        for s in symbols
+    }
+
+
+def load_sentiment(sb, lookback: int = 3, days: int = 30) -> SentimentProvider:
+    """Mean of the latest `lookback` sentiment scores for every symbol in one round trip.
+
+    Uses the recent_sentiment RPC; if it is unavailable, reads the last
+    `days` of the sentiment table instead. Errors give an empty provider
+    (no bias) rather than failing the caller.
+    """
+    try:
+        try:
+            data = sb.rpc('recent_sentiment', {'p_lookback': lookback}).execute().data or []
+            scores = {(row['ticker'], row['exchange']): float(row['score']) for row in data}
+        except Exception as e:
+            print(f"⚠️ recent_sentiment RPC unavailable, reading the sentiment table: {e}")
+            scores = _load_from_table(sb, lookback, days)
+    except Exception as e:
+        print(f"⚠️ Sentiment prefetch failed, scoring without sentiment: {e}")
+        scores = {}
+    print(f"💬 Prefetched sentiment for {len(scores)} symbols")
+    return SentimentProvider(scores)
+
+
+_PROVIDER: SentimentProvider | None = None
+_PROVIDER_LOCK = threading.Lock()
+
+
+def get_sentiment_provider(sb, ttl: float | None = None) -> SentimentProvider:
+    """Process-wide provider, reloaded in bulk once older than ttl seconds (SENTIMENT_TTL_S, default 900)"""
+    global _PROVIDER
+    if ttl is None:
+        ttl = float(os.getenv("SENTIMENT_TTL_S", "900"))
+    with _PROVIDER_LOCK:
+        if _PROVIDER is None or _PROVIDER.age() > ttl:
+            _PROVIDER = load_sentiment(sb)
+        return _PROVIDER
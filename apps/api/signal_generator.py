@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List
-import math
+from typing import Dict, List, Sequence
+import numpy as np
 import pandas as pd
 
 
+# Indicator columns read by the scoring features
+SCORING_COLUMNS = ("rsi14", "macd_hist", "adx14", "vwap", "atr14", "bb_width")
+
+
 @dataclass
 class ScoredSignal:
     action: str
@@ -17,140 +21,187 @@ class ScoredSignal:
     rationale: Dict
 
 
-def _sigmoid(x: float) -> float:
-    try:
-        return 1.0 / (1.0 + math.exp(-x))
-    except OverflowError:
-        return 0.0 if x < 0 else 1.0
-
-
-def _feature_contributions(df: pd.DataFrame) -> Dict[str, float]:
-    last = df.iloc[-1]
-    feats: Dict[str, float] = {}
-    # Normalize some indicators to ~[-1,1]
+# Feature order of CandidateScores.features; contributions add the two boosts
+FEATURES = ("rsi_bias", "macd_momentum", "trend_strength", "vwap_premium_atr", "bb_regime", "volume_z")
+CONTRIBUTIONS = FEATURES + ("rsi_extreme", "sentiment")
+# Per-bar inputs stacked by scoring_panel
+PANEL_FIELDS = ("close", "volume") + SCORING_COLUMNS
+
+# Feature weights by (range BUY, range SELL, trend BUY, trend SELL). Hull Suite is
+# trend-following: in trends MACD alignment, ADX and volume confirmation count
+# more and RSI/volatility less; ranges slightly penalize weak trends.
+_WEIGHTS = np.array([
+    [0.6, -0.5, 0.3, -0.3],    # rsi_bias
+    [0.5, -0.6, 0.9, -0.9],    # macd_momentum
+    [-0.3, -0.3, 0.8, 0.8],    # trend_strength
+    [0.25, 0.25, 0.4, 0.4],    # vwap_premium_atr
+    [0.4, 0.4, 0.2, 0.2],      # bb_regime
+    [0.3, 0.3, 0.6, 0.6],      # volume_z
+])
+
+
+def scoring_panel(frames: Sequence[pd.DataFrame]) -> Dict[str, np.ndarray]:
+    """Scoring inputs of several frames as (len(frames), longest frame) arrays.
+
+    Row r holds frames[r] left-aligned (bar i is frames[r].iloc[i]) and NaN
+    padded; columns a frame lacks are NaN.
+    """
+    width = max((len(df) for df in frames), default=0)
+    stacked = np.full((len(PANEL_FIELDS), len(frames), width), np.nan)
+    for r, df in enumerate(frames):
+        block = df.reindex(columns=PANEL_FIELDS)
+        try:
+            values = block.to_numpy(dtype=float)
+        except (TypeError, ValueError):
+            values = block.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        stacked[:, r, :len(df)] = values.T
+    return dict(zip(PANEL_FIELDS, stacked))
+
+
+def _candidate_features(panel: Dict[str, np.ndarray], rows: np.ndarray, bars: np.ndarray) -> np.ndarray:
+    """(N, len(FEATURES)) features of each (row, bar), normalized to ~[-1, 1]"""
+    def at(name: str) -> np.ndarray:
+        return panel[name][rows, bars]
+
+    feats = np.empty((len(rows), len(FEATURES)))
     # RSI distance from mid (50) scaled
-    rsi = float(last["rsi14"]) if pd.notna(last.get("rsi14")) else 50.0
-    feats["rsi_bias"] = (rsi - 50.0) / 50.0  # -1..+1 approx
+    rsi = at("rsi14")
+    feats[:, 0] = (np.where(np.isnan(rsi), 50.0, rsi) - 50.0) / 50.0
     # MACD histogram sign and magnitude
-    macdh = float(last["macd_hist"]) if pd.notna(last.get("macd_hist")) else 0.0
-    feats["macd_momentum"] = max(-1.0, min(1.0, macdh))
+    feats[:, 1] = np.clip(np.nan_to_num(at("macd_hist"), nan=0.0), -1.0, 1.0)
     # ADX trend strength scaled 0..1
-    adx = float(last["adx14"]) if pd.notna(last.get("adx14")) else 0.0
-    feats["trend_strength"] = max(0.0, min(1.0, adx / 50.0))
+    feats[:, 2] = np.clip(np.nan_to_num(at("adx14"), nan=0.0) / 50.0, 0.0, 1.0)
     # Price vs VWAP distance in ATRs
-    if pd.notna(last.get("vwap")) and pd.notna(last.get("atr14")) and last["atr14"]:
-        feats["vwap_premium_atr"] = float((last["close"] - last["vwap"]) / last["atr14"])
-    else:
-        feats["vwap_premium_atr"] = 0.0
+    close, vwap, atr = at("close"), at("vwap"), at("atr14")
+    has_vwap = ~np.isnan(vwap) & ~np.isnan(atr) & (atr != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        feats[:, 3] = np.where(has_vwap, (close - vwap) / np.where(has_vwap, atr, 1.0), 0.0)
     # Bollinger width regime (narrow/wide)
-    bb_width = float(last["bb_width"]) if pd.notna(last.get("bb_width")) else 0.05
-    feats["bb_regime"] = max(0.0, min(1.0, bb_width / 0.1))
-    # Volume z-score (20)
-    vol = df["volume"].rolling(20).mean()
-    vol_z = (df["volume"] - vol) / (df["volume"].rolling(20).std() + 1e-9)
-    v = vol_z.iloc[-1]
-    feats["volume_z"] = float(v) if pd.notna(v) else 0.0
+    bb_width = at("bb_width")
+    feats[:, 4] = np.clip(np.where(np.isnan(bb_width), 0.05, bb_width) / 0.1, 0.0, 1.0)
+    # Volume z-score over the 20 bars ending at each candidate
+    window = bars[:, None] + np.arange(-19, 1)[None, :]
+    vols = panel["volume"][rows[:, None], np.maximum(window, 0)]
+    vols[window < 0] = np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vol_z = (at("volume") - vols.mean(axis=1)) / (vols.std(axis=1, ddof=1) + 1e-9)
+    feats[:, 5] = np.where(np.isnan(vol_z), 0.0, vol_z)
     return feats
 
 
-def _sentiment_bias(ticker: str, exchange: str, lookback: int = 3) -> float:
-    # Skip sentiment bias during backtesting and scanner to avoid database calls
-    try:
-        import inspect
-        # Check if we're being called from backtest or scanner context
-        frame = inspect.currentframe()
-        while frame:
-            filename = frame.f_code.co_filename.lower()
-            if 'backtest' in filename or 'scanner' in filename:
-                return 0.0
-            frame = frame.f_back
-    except:
-        pass
-
-    try:
-        from supabase_client import get_client
-        sb = get_client()
-        sym = sb.table('symbols').select('id').eq('ticker', ticker).eq('exchange', exchange).single().execute().data
-        if not sym:
-            return 0.0
-        data = sb.table('sentiment').select('score').eq('symbol_id', sym['id']).order('ts', desc=True).limit(10).execute().data
-        if not data:
-            return 0.0
-        scores = [float(x['score']) for x in data][:lookback]
-        return float(sum(scores) / max(1, len(scores)))
-    except Exception:
-        return 0.0
-
-
-def score_signal(df: pd.DataFrame, action: str, base_conf: float, context: Dict | None = None) -> tuple[float, Dict]:
-    feats = _feature_contributions(df)
-    last = df.iloc[-1]
-    contribs: Dict[str, float] = {}
-
-    # Detect regime - Hull Suite is trend-following, so optimize for trends
-    adx = feats.get("trend_strength", 0.0)
-    macd = feats.get("macd_momentum", 0.0)
-    trend_regime = "trend" if adx > 0.6 and abs(macd) > 0.2 else "range"
-
-    # Dynamic weights based on market regime - favor trend-following for Hull
-    if trend_regime == "range":
-        w = {
-            "rsi_bias": 0.6 if action == "BUY" else -0.5,  # Moderate RSI preference
-            "macd_momentum": 0.5 if action == "BUY" else -0.6,  # MACD confirmation
-            "trend_strength": -0.3,  # Slightly penalize weak trends in ranging markets
-            "vwap_premium_atr": 0.25,
-            "bb_regime": 0.4,  # Moderate volatility preference
-            "volume_z": 0.3,
-        }
-    else:  # trend regime - optimize for Hull Suite trend-following
-        w = {
-            "rsi_bias": 0.3 if action == "BUY" else -0.3,  # Reduced RSI importance in trends
-            "macd_momentum": 0.9 if action == "BUY" else -0.9,  # Strong MACD alignment with trend
-            "trend_strength": 0.8,  # Reward strong trends (Hull's strength)
-            "vwap_premium_atr": 0.4,  # Trend continuation signal
-            "bb_regime": 0.2,  # Less emphasis on volatility in strong trends
-            "volume_z": 0.6,  # Volume confirmation for trend moves
-        }
+def _feature_contributions(df: pd.DataFrame) -> Dict[str, float]:
+    """Features of the last bar of df"""
+    feats = _candidate_features(scoring_panel([df.tail(20)]), np.array([0]), np.array([min(len(df), 20) - 1]))
+    return dict(zip(FEATURES, feats[0].tolist()))
+
 
-    logits = base_conf * 1.2  # Reduced base multiplier for more conservative scoring
+def _sentiment_of(context: Dict | None, sentiment) -> float | None:
+    """Bias for the context's symbol from the provider, or None without one"""
+    ticker = context.get("ticker") if context else None
+    exchange = context.get("exchange") if context else None
+    if sentiment is None or not (ticker and exchange):
+        return None
+    return sentiment.bias(ticker, exchange)
 
-    # Compute contributions
-    for k, weight in w.items():
-        c = feats.get(k, 0.0) * weight
-        contribs[k] = c
-        logits += c
 
-    # RSI extreme confirmation (but not primary signal)
-    rsi = float(last.get("rsi14", 50))
-    if action == "BUY" and rsi < 35:  # Only boost on extreme oversold in trends
-        logits += 0.2
-        contribs["rsi_extreme"] = 0.2
-    elif action == "SELL" and rsi > 65:  # Only boost on extreme overbought in trends
-        logits += 0.2
-        contribs["rsi_extreme"] = 0.2
-
-    # HMA trend alignment (Hull-specific confirmation) - DISABLED for now
-    # The base Hull signal already includes HMA slope logic, so don't double-count
-    pass
+@dataclass
+class CandidateScores:
+    """score_candidates output, one row per candidate"""
+    confidence: np.ndarray      # (N,)
+    features: np.ndarray        # (N, len(FEATURES))
+    contribs: np.ndarray        # (N, len(CONTRIBUTIONS))
+    trend: np.ndarray           # (N,) True in the trend regime
+    has_sentiment: np.ndarray   # (N,) True where a sentiment bias was given
+
+    def rationale(self, i: int, base_conf: float) -> Dict:
+        """score_signal's rationale for candidate i"""
+        contribs = dict(zip(FEATURES, self.contribs[i, :len(FEATURES)].tolist()))
+        if self.contribs[i, len(FEATURES)]:
+            contribs["rsi_extreme"] = float(self.contribs[i, len(FEATURES)])
+        if self.has_sentiment[i]:
+            contribs["sentiment"] = float(self.contribs[i, -1])
+        return {
+            "base": base_conf,
+            "regime": "trend" if self.trend[i] else "range",
+            "features": dict(zip(FEATURES, self.features[i].tolist())),
+            "contribs": contribs,
+        }
 
+
+def score_candidates(panel: Dict[str, np.ndarray], symbols, bars, actions, base_conf, sentiment=None) -> CandidateScores:
+    """Score many candidate signals in one vectorized pass.
+
+    panel comes from scoring_panel; candidate k is (symbols[k] row, bars[k]
+    bar, actions[k], base_conf[k]) and is scored exactly as score_signal on
+    that frame cut at that bar. sentiment is a bias per candidate (or one for
+    all); NaN/None means no sentiment context.
+    """
+    rows = np.asarray(symbols, dtype=np.intp)
+    bars = np.asarray(bars, dtype=np.intp)
+    actions = np.asarray(actions, dtype=object)
+    base_conf = np.asarray(base_conf, dtype=float)
+    n = len(rows)
+    is_buy = actions == "BUY"
+    is_sell = actions == "SELL"
+
+    feats = _candidate_features(panel, rows, bars)
+    # Regime: trending when ADX and MACD momentum are both strong
+    trend = (feats[:, 2] > 0.6) & (np.abs(feats[:, 1]) > 0.2)
+    weights = _WEIGHTS[:, np.where(trend, 2, 0) + np.where(is_buy, 0, 1)].T
+
+    contribs = np.zeros((n, len(CONTRIBUTIONS)))
+    contribs[:, :len(FEATURES)] = feats * weights
+    # RSI extreme confirmation (but not primary signal)
+    rsi = panel["rsi14"][rows, bars]
+    with np.errstate(invalid="ignore"):
+        extreme = (is_buy & (rsi < 35)) | (is_sell & (rsi > 65))
+    contribs[:, len(FEATURES)] = np.where(extreme, 0.2, 0.0)
     # Sentiment bias (reduced importance for trend strategies)
-    ticker = context.get("ticker") if context else None
-    exchange = context.get("exchange") if context else None
-    if ticker and exchange:
-        s_bias = _sentiment_bias(ticker, exchange)
-        logits += s_bias * (0.15 if action == "BUY" else -0.15)
-        contribs["sentiment"] = s_bias * (0.15 if action == "BUY" else -0.15)
-
-    # Compute final confidence
-    conf = _sigmoid(logits)
-    conf = float(max(0.0, min(1.0, conf)))
-    rationale = {
-        "base": base_conf,
-        "regime": trend_regime,
-        "features": feats,
-        "contribs": contribs,
-    }
-    return conf, rationale
+    bias = np.broadcast_to(np.asarray(np.nan if sentiment is None else sentiment, dtype=float), (n,))
+    has_sentiment = ~np.isnan(bias)
+    contribs[:, -1] = np.where(has_sentiment, bias * np.where(is_buy, 0.15, -0.15), 0.0)
+
+    # Reduced base multiplier for more conservative scoring; terms added in score_signal's order
+    logits = base_conf * 1.2
+    for k in range(len(CONTRIBUTIONS)):
+        logits = logits + contribs[:, k]
+    with np.errstate(over="ignore"):
+        conf = np.clip(1.0 / (1.0 + np.exp(-logits)), 0.0, 1.0)
+    return CandidateScores(conf, feats, contribs, trend, has_sentiment)
+
+
+def score_signal(df: pd.DataFrame, action: str, base_conf: float, context: Dict | None = None,
+                 sentiment=None) -> tuple[float, Dict]:
+    """Confidence and rationale for one signal on the last bar of df.
+
+    sentiment is a provider with bias(ticker, exchange) (see
+    sentiment_cache.SentimentProvider) applied to the context's symbol;
+    without one the score has no sentiment term.
+    """
+    tail = df.tail(20)
+    scores = score_candidates(scoring_panel([tail]), [0], [len(tail) - 1], [action], [base_conf],
+                              _sentiment_of(context, sentiment))
+    return float(scores.confidence[0]), scores.rationale(0, base_conf)
+
+
+def score_signal_batch(df: pd.DataFrame, actions: np.ndarray, base_conf: np.ndarray, context: Dict | None = None,
+                       sentiment=None) -> np.ndarray:
+    """Vectorized score_signal: confidence for every bar with an action (NaN elsewhere).
+
+    Bar i is scored exactly as score_signal(df.iloc[:i+1], actions[i], base_conf[i])
+    would score it; the sentiment bias is looked up once for the whole series.
+    """
+    actions = np.asarray(actions, dtype=object)
+    base_conf = np.asarray(base_conf, dtype=float)
+    conf = np.full(len(df), np.nan)
+    bars = np.flatnonzero((actions == "BUY") | (actions == "SELL"))
+    if not len(bars):
+        return conf
+
+    scores = score_candidates(scoring_panel([df]), np.zeros(len(bars), dtype=np.intp), bars,
+                              actions[bars], base_conf[bars], _sentiment_of(context, sentiment))
+    conf[bars] = scores.confidence
+    return conf
 
 
 def ensemble(signals: List[ScoredSignal], strategy_weights: Dict[str, float] | None = None) -> Dict:
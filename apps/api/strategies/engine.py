@@ -1,5 +1,10 @@
+import numpy as np
 import pandas as pd
-from typing import Optional, List
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, Optional, List, Tuple
+
+from . import kernels
+from .indicators import ensure_indicators, required_warmup
 
 # Define Signal class if not imported
 class Signal:
@@ -13,9 +18,79 @@ class Signal:
         self.strategy = strategy
         self.rationale = rationale
 
+TIMEFRAMES: Tuple[str, ...] = ("1m", "5m", "15m", "1h", "1d")
+
+
+@dataclass(frozen=True)
+class StrategySpec:
+    """One registered strategy.
+
+    `columns` are the indicators it reads (see strategies.indicators),
+    `min_bars` the history it needs before it will signal, `lookback` how many
+    earlier bars it compares against and `timeframes` where it may run.
+    `batch` is the whole-series form used by the backtester; `live`
+    strategies are the ones the scanner runs by default.
+    """
+    name: str
+    fn: Callable[..., Optional[Signal]]
+    columns: Tuple[str, ...]
+    min_bars: int
+    lookback: int = 1
+    timeframes: Tuple[str, ...] = TIMEFRAMES
+    live: bool = False
+    batch: Callable[[pd.DataFrame], Tuple[np.ndarray, np.ndarray]] | None = None
+
+    @property
+    def window(self) -> int:
+        """Bars needed to evaluate the latest one (its own minimum or indicator warmup)"""
+        return max(self.min_bars, required_warmup(self.columns) + self.lookback)
+
+
+STRATEGIES: Dict[str, StrategySpec] = {}
+
+
+def register_strategy(name: str, columns: Iterable[str], min_bars: int, lookback: int = 1,
+                      timeframes: Iterable[str] = TIMEFRAMES, live: bool = False):
+    """Decorator adding a per-bar strategy `fn(df, current_index=-1)` to the registry"""
+    def wrap(fn):
+        STRATEGIES[name] = StrategySpec(name, fn, tuple(columns), min_bars, lookback, tuple(timeframes), live)
+        return fn
+    return wrap
+
+
+def register_batch(name: str):
+    """Decorator attaching the whole-series form of a registered strategy"""
+    def wrap(fn):
+        STRATEGIES[name] = replace(STRATEGIES[name], batch=fn)
+        return fn
+    return wrap
+
+
+def _min_bars(name: str) -> int:
+    return STRATEGIES[name].min_bars
+
+
+def select_strategies(names: Iterable[str] | None = None, timeframe: str | None = None) -> List[StrategySpec]:
+    """Registered strategies by name (default: the live ones), limited to those supporting `timeframe`"""
+    if names is None:
+        specs = [s for s in STRATEGIES.values() if s.live]
+    else:
+        unknown = [n for n in names if n not in STRATEGIES]
+        if unknown:
+            raise ValueError(f"Unknown strategy {', '.join(unknown)}")
+        specs = [STRATEGIES[n] for n in names]
+    return [s for s in specs if timeframe is None or timeframe in s.timeframes]
+
+
+def strategy_window(specs: Iterable[StrategySpec]) -> int:
+    """Bars of history needed to evaluate the latest bar for every strategy in `specs`"""
+    return max((s.window for s in specs), default=0)
+
+
+@register_strategy("mean_reversion", ("rsi14", "bb_lower", "bb_upper", "atr14"), min_bars=30)
 def mean_reversion(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal]:
     """Mean Reversion Strategy with Bollinger Bands and RSI"""
-    if len(df) < 30:  # Need enough data for indicators
+    if len(df) < _min_bars("mean_reversion"):  # Need enough data for indicators
         return None
 
     if current_index >= 0 and current_index < len(df):
@@ -66,6 +141,50 @@ def mean_reversion(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal
                       "bb_distance": bb_distance, "atr": float(last["atr14"])})
 
 
+def _col(df: pd.DataFrame, name: str) -> np.ndarray:
+    """Column as float array (all-NaN if the column is missing)"""
+    if name not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float)
+
+
+def _shift(arr: np.ndarray, n: int) -> np.ndarray:
+    """arr shifted forward by n bars (value of bar i-n at position i)"""
+    out = np.full(arr.shape, np.nan)
+    if n < len(arr):
+        out[n:] = arr[:len(arr) - n]
+    return out
+
+
+def _empty_batch(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    return np.full(n, None, dtype=object), np.full(n, np.nan)
+
+
+def _price_ok(close: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        return (close >= 10) & (close <= 10000)
+
+
+@register_batch("mean_reversion")
+def mean_reversion_batch(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Whole-series mean_reversion: (actions, confidences) for every bar"""
+    actions, conf = _empty_batch(len(df))
+    if len(df) < _min_bars("mean_reversion"):
+        return actions, conf
+
+    close = _col(df, "close"); rsi = _col(df, "rsi14")
+    bb_lower = _col(df, "bb_lower"); bb_upper = _col(df, "bb_upper"); atr = _col(df, "atr14")
+    valid = ~(np.isnan(close) | np.isnan(rsi) | np.isnan(bb_lower) | np.isnan(bb_upper) | np.isnan(atr))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        buy = valid & (close < bb_lower) & (rsi > 42) & _price_ok(close)
+        bb_distance = (bb_lower - close) / close
+        c = 0.75 + np.where(bb_distance > 0.02, 0.1, 0.0) + np.where((rsi >= 45) & (rsi <= 55), 0.1, 0.0)
+    actions[buy] = "BUY"
+    conf[buy] = np.minimum(0.95, c[buy])
+    return actions, conf
+
+
 def signal_quality_filter(signal: Signal, df: pd.DataFrame) -> bool:
     """Filter signals based on quality criteria"""
     return True  # Accept all signals for now
@@ -73,25 +192,14 @@ def signal_quality_filter(signal: Signal, df: pd.DataFrame) -> bool:
 
 def smma(src: pd.Series, length: int) -> pd.Series:
     """Smoothed Moving Average (SMMA) calculation - like in Pine Script"""
-    smma_values = []
-    for i in range(len(src)):
-        if i < length - 1:
-            smma_values.append(pd.NA)
-        elif i == length - 1:
-            # First SMMA value is SMA
-            smma_values.append(src.iloc[:length].mean())
-        else:
-            # SMMA formula: (previous SMMA * (length - 1) + current src) / length
-            prev_smma = smma_values[-1]
-            current = src.iloc[i]
-            new_smma = (prev_smma * (length - 1) + current) / length
-            smma_values.append(new_smma)
-    return pd.Series(smma_values, index=src.index)
+    # First value is the SMA, then (previous SMMA * (length - 1) + src) / length
+    return pd.Series(kernels.smma(pd.to_numeric(src, errors="coerce"), length), index=src.index)
 
 
+@register_strategy("alligator", ("jaw", "teeth", "lips", "atr14"), min_bars=50)
 def alligator(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal]:
     """Alligator Strategy with ATR Stop-Loss - Based on TradingView Pine Script"""
-    if len(df) < 50:  # Need enough data for indicators
+    if len(df) < _min_bars("alligator"):  # Need enough data for indicators
         return None
 
     if current_index >= 0 and current_index < len(df):
@@ -111,14 +219,8 @@ def alligator(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal]:
 
     price_ok = 10 <= last["close"] <= 10000
 
-    # Calculate Alligator lines using SMMA on hl2
-    hl2 = (df["high"] + df["low"]) / 2
-
-    # Calculate SMMA lines
-    df_copy = df.copy()
-    df_copy["jaw"] = smma(hl2, 13)
-    df_copy["teeth"] = smma(hl2, 8)
-    df_copy["lips"] = smma(hl2, 5)
+    # Alligator lines (SMMA of hl2); free when the frame already carries them
+    df_copy = ensure_indicators(df, ("jaw", "teeth", "lips"))
 
     if current_index >= 0 and current_index < len(df_copy):
         last = df_copy.iloc[current_index]
@@ -168,9 +270,38 @@ def alligator(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal]:
     return None
 
 
+@register_batch("alligator")
+def alligator_batch(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Whole-series alligator: (actions, confidences) for every bar"""
+    actions, conf = _empty_batch(len(df))
+    if len(df) < _min_bars("alligator"):
+        return actions, conf
+
+    close = _col(df, "close"); high = _col(df, "high"); low = _col(df, "low"); atr = _col(df, "atr14")
+    lines = ensure_indicators(df, ("jaw", "teeth", "lips"))
+    jaw = _col(lines, "jaw"); teeth = _col(lines, "teeth"); lips = _col(lines, "lips")
+    prev_jaw = _shift(jaw, 1); prev_lips = _shift(lips, 1); prev_teeth = _shift(teeth, 1)
+
+    valid = ~(np.isnan(close) | np.isnan(high) | np.isnan(low) | np.isnan(atr))
+    valid &= ~(np.isnan(jaw) | np.isnan(teeth) | np.isnan(lips) |
+               np.isnan(prev_jaw) | np.isnan(prev_teeth) | np.isnan(prev_lips))
+    valid[0] = False  # Need at least 2 data points
+
+    with np.errstate(invalid="ignore"):
+        long_condition = valid & (prev_lips <= prev_jaw) & (lips > jaw) & _price_ok(close)
+        exit_condition = valid & (prev_lips >= prev_jaw) & (lips < jaw) & _price_ok(close) & ~long_condition
+    actions[long_condition] = "BUY"
+    conf[long_condition] = 0.75
+    actions[exit_condition] = "SELL"
+    conf[exit_condition] = 0.7
+    return actions, conf
+
+
+# Live strategy (replaced Alligator)
+@register_strategy("hull_suite", ("hma55", "atr14"), min_bars=60, lookback=2, live=True)
 def hull_suite(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal]:
     """Hull Suite Strategy - Slope-based trend following with HMA"""
-    if len(df) < 60:  # Need enough data for HMA
+    if len(df) < _min_bars("hull_suite"):  # Need enough data for HMA
         return None
 
     if current_index >= 0 and current_index < len(df):
@@ -233,9 +364,30 @@ def hull_suite(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal]:
     return None
 
 
+@register_batch("hull_suite")
+def hull_suite_batch(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Whole-series hull_suite: (actions, confidences) for every bar"""
+    actions, conf = _empty_batch(len(df))
+    if len(df) < _min_bars("hull_suite"):
+        return actions, conf
+
+    close = _col(df, "close"); hma = _col(df, "hma55"); atr = _col(df, "atr14")
+    hma_prev_2 = _shift(hma, 2)
+    valid = ~(np.isnan(close) | np.isnan(hma) | np.isnan(hma_prev_2) | np.isnan(atr))
+
+    with np.errstate(invalid="ignore"):
+        buy = valid & (hma > hma_prev_2) & _price_ok(close)
+        sell = valid & (hma < hma_prev_2) & _price_ok(close)
+    actions[buy] = "BUY"
+    actions[sell] = "SELL"
+    conf[buy | sell] = 0.4
+    return actions, conf
+
+
+@register_strategy("macd_trend", ("macd", "macd_signal", "macd_hist", "sma12", "sma26", "sma200", "atr14"), min_bars=200)
 def macd_trend(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal]:
     """MACD Trend Following Strategy - Based on TradingView Pine Script"""
-    if len(df) < 200:  # Need enough data for 200-period MA
+    if len(df) < _min_bars("macd_trend"):  # Need enough data for 200-period MA
         return None
 
     if current_index >= 0 and current_index < len(df):
@@ -254,11 +406,8 @@ def macd_trend(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal]:
             pd.notna(last.get("atr14"))):
         return None
 
-    # Calculate required MAs manually
-    df_copy = df.copy()
-    df_copy["fastMA"] = df_copy["close"].rolling(12).mean()
-    df_copy["slowMA"] = df_copy["close"].rolling(26).mean()
-    df_copy["veryslowMA"] = df_copy["close"].rolling(200).mean()
+    # Fast/slow/very slow SMAs; free when the frame already carries them
+    df_copy = ensure_indicators(df, ("sma12", "sma26", "sma200"))
 
     if current_index >= 0 and current_index < len(df_copy):
         last = df_copy.iloc[current_index]
@@ -274,10 +423,10 @@ def macd_trend(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal]:
     hist_cross_below = (prev["macd_hist"] >= 0) and (last["macd_hist"] < 0)
 
     # Trend alignment conditions
-    bullish_trend = (last["macd"] > 0 and last["fastMA"] > last["slowMA"] and
-                    last["close"] > last["veryslowMA"])
-    bearish_trend = (last["macd"] < 0 and last["fastMA"] < last["slowMA"] and
-                    last["close"] < last["veryslowMA"])
+    bullish_trend = (last["macd"] > 0 and last["sma12"] > last["sma26"] and
+                    last["close"] > last["sma200"])
+    bearish_trend = (last["macd"] < 0 and last["sma12"] < last["sma26"] and
+                    last["close"] < last["sma200"])
 
     if hist_cross_above and bullish_trend and price_ok:
         entry = float(last["close"])
@@ -289,8 +438,8 @@ def macd_trend(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal]:
 
         return Signal("BUY", entry, stop, target, confidence, "macd_trend",
                      {"macd": float(last["macd"]), "macd_hist": float(last["macd_hist"]),
-                      "fastMA": float(last["fastMA"]), "slowMA": float(last["slowMA"]),
-                      "veryslowMA": float(last["veryslowMA"]), "trend": "bullish"})
+                      "fastMA": float(last["sma12"]), "slowMA": float(last["sma26"]),
+                      "veryslowMA": float(last["sma200"]), "trend": "bullish"})
 
     elif hist_cross_below and bearish_trend and price_ok:
         entry = float(last["close"])
@@ -302,34 +451,51 @@ def macd_trend(df: pd.DataFrame, current_index: int = -1) -> Optional[Signal]:
 
         return Signal("SELL", entry, stop, target, confidence, "macd_trend",
                      {"macd": float(last["macd"]), "macd_hist": float(last["macd_hist"]),
-                      "fastMA": float(last["fastMA"]), "slowMA": float(last["slowMA"]),
-                      "veryslowMA": float(last["veryslowMA"]), "trend": "bearish"})
+                      "fastMA": float(last["sma12"]), "slowMA": float(last["sma26"]),
+                      "veryslowMA": float(last["sma200"]), "trend": "bearish"})
 
     return None
 
 
-def momentum(df: pd.DataFrame) -> Optional[Signal]:
-    """Placeholder for momentum strategy"""
-    return None
+@register_batch("macd_trend")
+def macd_trend_batch(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Whole-series macd_trend: (actions, confidences) for every bar"""
+    actions, conf = _empty_batch(len(df))
+    if len(df) < _min_bars("macd_trend"):
+        return actions, conf
 
+    close = _col(df, "close"); macd = _col(df, "macd")
+    macd_signal = _col(df, "macd_signal"); macd_hist = _col(df, "macd_hist"); atr = _col(df, "atr14")
+    mas = ensure_indicators(df, ("sma12", "sma26", "sma200"))
+    fast_ma = _col(mas, "sma12"); slow_ma = _col(mas, "sma26"); veryslow_ma = _col(mas, "sma200")
+    prev_hist = _shift(macd_hist, 1)
 
-def run_strategies(df: pd.DataFrame) -> List[Optional[Signal]]:
-    """Run all available strategies and return their signals"""
-    signals = []
+    valid = ~(np.isnan(close) | np.isnan(macd) | np.isnan(macd_signal) | np.isnan(macd_hist) | np.isnan(atr))
+    valid[0] = False  # Need at least 2 data points
+
+    with np.errstate(invalid="ignore"):
+        hist_cross_above = (prev_hist <= 0) & (macd_hist > 0)
+        hist_cross_below = (prev_hist >= 0) & (macd_hist < 0)
+        bullish_trend = (macd > 0) & (fast_ma > slow_ma) & (close > veryslow_ma)
+        bearish_trend = (macd < 0) & (fast_ma < slow_ma) & (close < veryslow_ma)
+        buy = valid & hist_cross_above & bullish_trend & _price_ok(close)
+        sell = valid & hist_cross_below & bearish_trend & _price_ok(close) & ~buy
+    actions[buy] = "BUY"
+    actions[sell] = "SELL"
+    conf[buy | sell] = 0.8
+    return actions, conf
 
-    # Run mean reversion strategy
-    # mean_rev_signal = mean_reversion(df)
-    # if mean_rev_signal:
-    #     signals.append(mean_rev_signal)
 
-    # Run MACD trend strategy
-    # macd_signal = macd_trend(df)
-    # if macd_signal:
-    #     signals.append(macd_signal)
+def momentum(df: pd.DataFrame) -> Optional[Signal]:
+    """Placeholder for momentum strategy"""
+    return None
 
-    # Run Hull Suite strategy (replacing Alligator)
-    hull_signal = hull_suite(df)
-    if hull_signal:
-        signals.append(hull_signal)
 
+def run_strategies(df: pd.DataFrame, names: Iterable[str] | None = None, timeframe: str | None = None) -> List[Signal]:
+    """Run the selected strategies (default: the live ones) and return their signals"""
+    signals = []
+    for spec in select_strategies(names, timeframe):
+        signal = spec.fn(df)
+        if signal:
+            signals.append(signal)
     return signals
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Hashable, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indicators import ensure_indicators
+
+# The Hull screen runs on every symbol ahead of the strategies
+HULL_SCREEN_COLUMNS = ("adx14", "bb_width", "hma55")
+HULL_SCREEN_BARS = 200
+HULL_MIN_SCORE = 0.75
+
+_IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def _stack(frames, col: str, T: int) -> np.ndarray:
+    """col of every frame, left-aligned and NaN-padded to T bars"""
+    out = np.full((len(frames), T), np.nan)
+    for i, df in enumerate(frames):
+        out[i, :len(df)] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return out
+
+
+def hull_characteristics_panel(frames) -> Dict[str, np.ndarray]:
+    """Hull screen statistics for many annotated frames in one pass.
+
+    Per frame (over all of its bars, as the per-symbol screen did): mean ADX,
+    share of bars with ADX > 25, mean BB width, and the share of 2-bar HMA
+    slopes whose sign flips from the previous slope.
+    """
+    frames = list(frames)
+    n = np.array([len(df) for df in frames], dtype=np.float64)
+    T = int(n.max()) if len(frames) else 0
+    adx = _stack(frames, "adx14", T)
+    bbw = _stack(frames, "bb_width", T)
+    hma = _stack(frames, "hma55", T)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # NaN padding drops out of the sums and never compares true
+        avg_adx = np.nansum(adx, axis=1) / (~np.isnan(adx)).sum(axis=1)
+        trend_consistency = (adx > 25).sum(axis=1) / n
+        volatility_regime = np.nansum(bbw, axis=1) / (~np.isnan(bbw)).sum(axis=1)
+        slopes = hma[:, 2:] - hma[:, :-2]
+        flips = (slopes[:, 1:] * slopes[:, :-1] < 0).sum(axis=1)
+        hma_slope_freq = np.where(n > 2, flips / np.maximum(n - 2, 1), 0.0)
+    return {
+        "avg_adx": avg_adx,
+        "trend_consistency": trend_consistency,
+        "volatility_regime": volatility_regime,
+        "hma_slope_freq": hma_slope_freq,
+    }
+
+
+def hull_characteristics(df: pd.DataFrame) -> Dict[str, float]:
+    """hull_characteristics_panel for a single annotated frame"""
+    return {k: float(v[0]) for k, v in hull_characteristics_panel([df]).items()}
+
+
+def hull_score(chars: Mapping[str, float]) -> float:
+    """Share of the four Hull suitability criteria met (profitable-stock patterns)"""
+    criteria = (
+        chars["avg_adx"] > 22,                             # trending market
+        0.25 <= chars["trend_consistency"] <= 0.60,        # moderately often trending
+        0.02 <= chars["volatility_regime"] <= 0.08,        # moderate volatility
+        0.15 <= chars["hma_slope_freq"] <= 0.45,           # HMA neither noisy nor static
+    )
+    return sum(bool(c) for c in criteria) / len(criteria)
+
+
+def trading_day(df: pd.DataFrame) -> date:
+    """IST session date of the frame's last bar (today if it has no ts)"""
+    if "ts" in df.columns and len(df):
+        ts = pd.Timestamp(df["ts"].iloc[-1])
+        ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts
+        return ts.tz_convert(_IST).date()
+    return datetime.now(_IST).date()
+
+
+class HullScreenCache:
+    """Hull screen characteristics per (symbol, timeframe, trading day).
+
+    The screen is computed once per symbol and session; later scans that day
+    read the cached characteristics instead of recomputing the statistics.
+    """
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[Hashable, str, date], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "computed": 0}
+
+    def screen(self, frames: Mapping[Hashable, pd.DataFrame], timeframe: str) -> Dict[Hashable, Dict[str, float]]:
+        """Characteristics for every frame with at least HULL_SCREEN_BARS bars; missing ones in one pass"""
+        out: Dict[Hashable, Dict[str, float]] = {}
+        todo = {}
+        with self._lock:
+            for sid, df in frames.items():
+                if len(df) < HULL_SCREEN_BARS:
+                    continue
+                key = (sid, timeframe, trading_day(df))
+                cached = self._entries.get(key)
+                if cached is not None:
+                    out[sid] = cached
+                    self.stats["hits"] += 1
+                else:
+                    todo[sid] = key
+        if todo:
+            annotated = [ensure_indicators(frames[sid], HULL_SCREEN_COLUMNS) for sid in todo]
+            panel = hull_characteristics_panel(annotated)
+            with self._lock:
+                if len(self._entries) + len(todo) > self.max_entries:
+                    self._entries.clear()
+                for i, (sid, key) in enumerate(todo.items()):
+                    chars = {k: float(v[i]) for k, v in panel.items()}
+                    self._entries[key] = out[sid] = chars
+                self.stats["computed"] += len(todo)
+        return out
+
+
+_CACHE: HullScreenCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_hull_screen_cache() -> HullScreenCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = HullScreenCache()
+    return _CACHE
@@ -1,76 +1,294 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
 import pandas as pd
 import pandas_ta as ta
 
+from . import kernels
 
-def add_core_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    # Ensure ordered DatetimeIndex for TA functions that require it (e.g., VWAP)
-    had_index = False
-    if "ts" in out.columns:
-        try:
-            out["ts"] = pd.to_datetime(out["ts"], utc=True)
-            # set index to 'ts' and drop the column to avoid duplicates on reset
-            out = out.set_index("ts", drop=True).sort_index()
-            had_index = True
-        except Exception:
-            had_index = False
-    # Moving averages
-    out["ema20"] = ta.ema(out["close"], length=20)
-    out["ema50"] = ta.ema(out["close"], length=50)
-    # RSI
-    out["rsi14"] = ta.rsi(out["close"], length=14)
-    # MACD
-    macd = ta.macd(out["close"], fast=12, slow=26, signal=9)
-    out["macd"] = macd["MACD_12_26_9"]
-    out["macd_signal"] = macd["MACDs_12_26_9"]
-    out["macd_hist"] = macd["MACDh_12_26_9"]
-    # Bollinger Bands
+
+@dataclass(frozen=True)
+class Indicator:
+    """One node of the indicator graph.
+
+    `inputs` are raw candle columns or other indicator names; `fn` is called
+    with those series (None for a missing raw column) plus `params`.
+    `warmup` is the number of bars before values are meaningful. Private
+    nodes (public=False) are shared intermediates that never land on the frame.
+    """
+    name: str
+    inputs: Tuple[str, ...]
+    fn: Callable[..., Any]
+    params: Dict[str, Any] = field(default_factory=dict)
+    warmup: int = 0
+    public: bool = True
+
+
+INDICATORS: Dict[str, Indicator] = {}
+
+# False recomputes every request from scratch (benchmarks / debugging)
+REUSE_RECORDED = True
+
+
+def register_indicator(name: str, inputs: Iterable[str], warmup: int = 0, public: bool = True, **params):
+    """Decorator adding `fn` to the registry (re-registering a name replaces it)"""
+    def wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+        INDICATORS[name] = Indicator(name, tuple(inputs), fn, params, warmup, public)
+        return fn
+    return wrap
+
+
+def _series(values, like: pd.Series) -> pd.Series:
+    return pd.Series(values, index=like.index)
+
+
+def _pick(frame: pd.DataFrame | None, prefix: str) -> pd.Series | None:
+    # pandas-ta versions differ in column suffixes; match on the prefix
+    if frame is None or frame.empty:
+        return None
+    key = next((c for c in frame.columns if str(c).startswith(prefix)), None)
+    return frame[key] if key is not None else None
+
+
+@register_indicator("ema20", ["close"], warmup=20, length=20)
+@register_indicator("ema50", ["close"], warmup=50, length=50)
+def _ema(close, length):
+    return _series(kernels.ema(close, length), close)
+
+
+@register_indicator("rsi14", ["close"], warmup=15, length=14)
+def _rsi(close, length):
+    # Wilder-smoothed gains over Wilder-smoothed gains + |losses|
+    diff = np.diff(close.to_numpy(dtype=float), prepend=np.nan)
+    pos = kernels.rma(np.where(np.isnan(diff), np.nan, np.maximum(diff, 0.0)), length)
+    neg = kernels.rma(np.where(np.isnan(diff), np.nan, np.minimum(diff, 0.0)), length)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _series(100.0 * pos / (pos + np.abs(neg)), close)
+
+
+@register_indicator("_macd", ["close"], warmup=34, public=False, fast=12, slow=26, signal=9)
+def _macd(close, fast, slow, signal):
+    macd = kernels.ema(close, fast) - kernels.ema(close, slow)
+    # The signal line is seeded from the first defined MACD value
+    sig = kernels.ema(macd, signal, start=max(fast, slow) - 1)
+    return pd.DataFrame({"macd": macd, "signal": sig, "hist": macd - sig}, index=close.index)
+
+
+@register_indicator("macd", ["_macd"], warmup=34, key="macd")
+@register_indicator("macd_signal", ["_macd"], warmup=34, key="signal")
+@register_indicator("macd_hist", ["_macd"], warmup=34, key="hist")
+def _macd_part(macd, key):
+    return macd[key]
+
+
+@register_indicator("_bbands", ["close"], warmup=20, public=False, length=20, std=2.0)
+def _bbands(close, length, std):
     try:
-        bb = ta.bbands(out["close"], length=20, std=2.0)
-        # Some pandas-ta versions use different column keys; detect dynamically
-        if bb is not None and not bb.empty:
-            lower_key = next((c for c in bb.columns if str(c).startswith("BBL_")), None)
-            mid_key = next((c for c in bb.columns if str(c).startswith("BBM_")), None)
-            upper_key = next((c for c in bb.columns if str(c).startswith("BBU_")), None)
-            if lower_key and mid_key and upper_key:
-                out["bb_lower"] = bb[lower_key]
-                out["bb_mid"] = bb[mid_key]
-                out["bb_upper"] = bb[upper_key]
-            else:
-                raise KeyError("BB columns missing")
-        else:
-            raise KeyError("BB empty")
+        bb = ta.bbands(close, length=length, std=std)
+        lower, mid, upper = _pick(bb, "BBL_"), _pick(bb, "BBM_"), _pick(bb, "BBU_")
+        if lower is None or mid is None or upper is None:
+            raise KeyError("BB columns missing")
     except Exception:
         # Manual fallback
-        mid = out["close"].rolling(20).mean()
-        std = out["close"].rolling(20).std()
-        out["bb_mid"] = mid
-        out["bb_lower"] = mid - 2.0 * std
-        out["bb_upper"] = mid + 2.0 * std
+        mid = close.rolling(length).mean()
+        dev = close.rolling(length).std()
+        lower, upper = mid - std * dev, mid + std * dev
+    return pd.DataFrame({"lower": lower, "mid": mid, "upper": upper})
+
+
+@register_indicator("bb_lower", ["_bbands"], warmup=20, key="lower")
+@register_indicator("bb_mid", ["_bbands"], warmup=20, key="mid")
+@register_indicator("bb_upper", ["_bbands"], warmup=20, key="upper")
+def _bb_part(bb, key):
+    return bb[key]
+
+
+@register_indicator("bb_width", ["_bbands"], warmup=20)
+def _bb_width(bb):
     # width (avoid divide-by-zero)
-    out["bb_width"] = (out["bb_upper"] - out["bb_lower"]) / (out["bb_mid"].replace(0, pd.NA))
-    # ATR
-    out["atr14"] = ta.atr(out["high"], out["low"], out["close"], length=14)
-    # ADX
-    out["adx14"] = ta.adx(out["high"], out["low"], out["close"], length=14)["ADX_14"]
-    # VWAP (requires ordered DatetimeIndex). Compute or fallback to manual.
+    return (bb["upper"] - bb["lower"]) / (bb["mid"].replace(0, pd.NA))
+
+
+@register_indicator("atr14", ["true_range"], warmup=14, length=14)
+def _atr(tr, length):
+    return _series(kernels.smma(tr, length), tr)
+
+
+@register_indicator("adx14", ["high", "low", "close"], warmup=28, length=14)
+def _adx(high, low, close, length):
+    return _pick(ta.adx(high, low, close, length=length), "ADX_")
+
+
+@register_indicator("vwap", ["high", "low", "close", "volume", "ts"], warmup=1)
+def _vwap(high, low, close, volume, ts):
+    # pandas-ta's VWAP needs an ordered DatetimeIndex; fall back to a running VWAP
     try:
-        vwap = ta.vwap(out["high"], out["low"], out["close"], out["volume"])  # type: ignore
-        out["vwap"] = vwap
+        index = pd.DatetimeIndex(pd.to_datetime(ts, utc=True))
+        frame = pd.DataFrame({"high": high.to_numpy(), "low": low.to_numpy(), "close": close.to_numpy(),
+                              "volume": volume.to_numpy()}, index=index)
+        vwap = ta.vwap(frame["high"], frame["low"], frame["close"], frame["volume"])  # type: ignore
+        return pd.Series(vwap.to_numpy(), index=close.index)
     except Exception:
+        tp = (high.astype(float) + low.astype(float) + close.astype(float)) / 3.0
+        vol = volume.astype(float).fillna(0.0)
+        return (tp * vol).cumsum() / vol.cumsum().replace(0, pd.NA)
+
+
+@register_indicator("hma55", ["close"], warmup=61, length=55)
+def _hma(close, length):
+    # HMA formula: WMA(2 * WMA(src, L/2) - WMA(src, L), sqrt(L))
+    return _series(kernels.hma(close, length), close)
+
+
+@register_indicator("sma12", ["close"], warmup=12, length=12)
+@register_indicator("sma26", ["close"], warmup=26, length=26)
+@register_indicator("sma200", ["close"], warmup=200, length=200)
+def _sma(close, length):
+    return _series(kernels.sma(close, length), close)
+
+
+@register_indicator("_hl2", ["high", "low"], warmup=1, public=False)
+def _hl2(high, low):
+    return (high.astype(float) + low.astype(float)) / 2
+
+
+@register_indicator("jaw", ["_hl2"], warmup=13, length=13)
+@register_indicator("teeth", ["_hl2"], warmup=8, length=8)
+@register_indicator("lips", ["_hl2"], warmup=5, length=5)
+def _smma(src, length):
+    # Alligator lines: SMMA (SMA seed followed by Wilder smoothing)
+    return _series(kernels.smma(src, length), src)
+
+
+@register_indicator("true_range", ["high", "low", "close"], warmup=1)
+def _true_range(high, low, close):
+    high, low, close = high.astype(float), low.astype(float), close.astype(float)
+    return pd.concat([
+        (high - low),
+        (high - close.shift(1)).abs(),
+        (low - close.shift(1)).abs(),
+    ], axis=1).max(axis=1)
+
+
+@register_indicator("atr_sma14", ["true_range"], warmup=14, length=14)
+def _atr_sma(tr, length):
+    # Simple-average ATR used for execution/risk sizing
+    return _series(kernels.sma(tr, length), tr)
+
+
+# Columns produced by add_core_indicators, in order
+CORE_COLUMNS: Tuple[str, ...] = (
+    "ema20", "ema50", "rsi14",
+    "macd", "macd_signal", "macd_hist",
+    "bb_lower", "bb_mid", "bb_upper", "bb_width",
+    "atr14", "adx14", "vwap",
+)
+
+
+def resolve_indicators(columns: Iterable[str]) -> List[str]:
+    """Requested indicators plus their dependencies, in computation order"""
+    order: List[str] = []
+    seen = set()
+
+    def visit(name: str, path: Tuple[str, ...]) -> None:
+        if name in seen:
+            return
+        if name in path:
+            raise ValueError(f"Indicator cycle: {' -> '.join(path + (name,))}")
+        spec = INDICATORS.get(name)
+        if spec is None:
+            raise KeyError(f"Unknown indicator {name}")
+        for dep in spec.inputs:
+            if dep in INDICATORS:
+                visit(dep, path + (name,))
+        seen.add(name)
+        order.append(name)
+
+    for c in columns:
+        visit(c, ())
+    return order
+
+
+def required_warmup(columns: Iterable[str]) -> int:
+    """Bars of history needed before every requested indicator is meaningful"""
+    return max((INDICATORS[n].warmup for n in resolve_indicators(columns)), default=0)
+
+
+class IndicatorRecord(dict):
+    """Indicators (name -> params) a frame carries, kept in df.attrs["indicators"].
+
+    Treated as immutable (mark_indicators builds a new one), so the deepcopy
+    pandas applies to attrs on every slice/row access can share it.
+    """
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def computed_indicators(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """Indicators (name -> params) recorded as already present on df"""
+    return {n: p for n, p in df.attrs.get("indicators", {}).items() if n in df.columns}
+
+
+def mark_indicators(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+    """Record that df carries `columns` as computed with the registry's params"""
+    record = dict(df.attrs.get("indicators", {}))
+    for c in columns:
+        record[c] = dict(INDICATORS[c].params)
+    df.attrs["indicators"] = IndicatorRecord(record)
+    return df
+
+
+def has_indicators(df: pd.DataFrame, columns: Iterable[str]) -> bool:
+    """True if df already carries every column in `columns` with the registry's params"""
+    have = computed_indicators(df)
+    return all(have.get(c) == INDICATORS[c].params for c in columns)
+
+
+def ensure_indicators(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+    """Return df carrying `columns`, computing only what is missing.
+
+    Dependencies are resolved through the registry; shared intermediates
+    (e.g. one MACD or Bollinger pass for all of its columns) are computed
+    once and only the requested columns are added. Columns already recorded
+    on the frame with the same parameters are reused as-is, and a frame that
+    already has everything is returned unchanged (no copy), so repeat
+    requests are free. Otherwise a new frame is returned.
+    """
+    columns = tuple(columns)
+    if REUSE_RECORDED and has_indicators(df, columns):
+        return df
+    out = df.copy()
+    if "ts" in out.columns:
+        # Ordered candles, as the TA functions expect
+        out["ts"] = pd.to_datetime(out["ts"], utc=True)
+        if not out["ts"].is_monotonic_increasing:
+            out = out.sort_values("ts")
+        out = out.reset_index(drop=True)
+    have = computed_indicators(out) if REUSE_RECORDED else {}
+    cache: Dict[str, Any] = {}
+    written: List[str] = []
+    for name in resolve_indicators(columns):
+        spec = INDICATORS[name]
+        if spec.public and have.get(name) == spec.params:
+            continue
+        args = [cache[i] if i in cache else (out[i] if i in out.columns else None) for i in spec.inputs]
         try:
-            tp = (out["high"].astype(float) + out["low"].astype(float) + out["close"].astype(float)) / 3.0
-            vol = out["volume"].astype(float).fillna(0.0)
-            cum_pv = (tp * vol).cumsum()
-            cum_v = vol.cumsum().replace(0, pd.NA)
-            out["vwap"] = cum_pv / cum_v
-        except Exception:
-            out["vwap"] = pd.NA
-    # Restore original index if we changed it
-    if had_index:
-        out = out.reset_index()  # index name 'ts' becomes a 'ts' column
-    return out
+            value = spec.fn(*args, **spec.params)
+        except Exception as e:
+            print(f"⚠️ {name} calculation failed: {e}")
+            value = None
+        if value is None and spec.public:
+            value = pd.Series(np.nan, index=out.index)
+        cache[name] = value
+        if name in columns:
+            out[name] = value
+            written.append(name)
+    return mark_indicators(out, written)
 
 
+def add_core_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    return ensure_indicators(df, CORE_COLUMNS)
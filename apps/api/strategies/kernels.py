@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, List, Tuple
+
+import numpy as np
+from scipy.signal import lfilter
+
+_NAN = float("nan")
+
+
+def _rows(x) -> Tuple[np.ndarray, bool]:
+    """x as a C-contiguous float64 (rows x bars) array, and whether it was 1D"""
+    arr = np.ascontiguousarray(x, dtype=np.float64)
+    if arr.ndim == 1:
+        return arr[None, :], True
+    if arr.ndim != 2:
+        raise ValueError(f"Expected 1D or 2D input, got {arr.ndim}D")
+    return arr, False
+
+
+def _ewm_loop(x: np.ndarray, alpha: float) -> np.ndarray:
+    """pandas ewm(alpha, adjust=False).mean() one bar at a time (any NaN layout)"""
+    S, T = x.shape
+    out = np.full((S, T), np.nan)
+    w = np.full(S, np.nan)
+    old_wt = np.ones(S)
+    decay = 1.0 - alpha
+    for t in range(T):
+        xt = x[:, t]
+        have = ~np.isnan(w)
+        obs = ~np.isnan(xt)
+        old_wt = np.where(have, old_wt * decay, old_wt)
+        both = have & obs
+        with np.errstate(invalid="ignore"):
+            new = (old_wt * w + alpha * xt) / (old_wt + alpha)
+        w = np.where(both & (w != xt), new, np.where(~have & obs, xt, w))
+        old_wt = np.where(both, 1.0, old_wt)
+        out[:, t] = w
+    return out
+
+
+def ewm(x, alpha: float) -> np.ndarray:
+    """pandas ewm(alpha=alpha, adjust=False).mean() along the last axis.
+
+    Rows whose observations are contiguous (leading/trailing NaNs only) run
+    through one IIR filter call; rows with interior gaps keep pandas'
+    gap weighting via the per-bar recursion.
+    """
+    arr, one_d = _rows(x)
+    S, T = arr.shape
+    out = np.full((S, T), np.nan)
+    valid = ~np.isnan(arr)
+    n = valid.sum(axis=1)
+    first = valid.argmax(axis=1)
+    last = T - 1 - valid[:, ::-1].argmax(axis=1)
+    gapless = (n > 0) & (last - first + 1 == n)
+
+    rows = np.flatnonzero(gapless)
+    for f in np.unique(first[rows]):
+        # Rows sharing a first observation filter together from there
+        grp = rows[first[rows] == f]
+        x0 = arr[grp, f]
+        out[grp, f] = x0
+        if f + 1 < T:
+            out[grp, f + 1:], _ = lfilter([alpha], [1.0, alpha - 1.0], arr[grp, f + 1:], axis=1,
+                                          zi=((1.0 - alpha) * x0)[:, None])
+    tail = rows[last[rows] < T - 1]
+    if tail.size:
+        # pandas carries the last value through trailing NaNs
+        l = last[tail]
+        out[tail] = np.where(np.arange(T)[None, :] > l[:, None], out[tail, l][:, None], out[tail])
+
+    rows = np.flatnonzero((n > 0) & ~gapless)
+    if rows.size:
+        out[rows] = _ewm_loop(arr[rows], alpha)
+    return out[0] if one_d else out
+
+
+def _seeded(x, length: int, alpha: float, start: int = 0) -> np.ndarray:
+    """ewm seeded with the mean of the first `length` inputs from column `start` (pandas_ta presma)"""
+    arr, one_d = _rows(x)
+    seed_at = start + length - 1
+    if seed_at >= arr.shape[1]:
+        out = np.full(arr.shape, np.nan)
+    else:
+        z = arr.copy()
+        z[:, :seed_at] = np.nan
+        z[:, seed_at] = np.nanmean(arr[:, start:seed_at + 1], axis=1)
+        out = ewm(z, alpha)
+    return out[0] if one_d else out
+
+
+def ema(x, length: int, start: int = 0) -> np.ndarray:
+    """EMA (alpha 2/(length+1)) seeded with an SMA, like pandas_ta.ema"""
+    return _seeded(x, length, 2.0 / (length + 1), start)
+
+
+def rma(x, length: int) -> np.ndarray:
+    """Wilder's moving average (alpha 1/length, unseeded), like pandas_ta.rma"""
+    return ewm(x, 1.0 / length)
+
+
+def smma(x, length: int, start: int = 0) -> np.ndarray:
+    """Smoothed MA: SMA seed then Wilder smoothing (Pine SMMA, pandas_ta ATR)"""
+    return _seeded(x, length, 1.0 / length, start)
+
+
+def _fir(x, weights: np.ndarray) -> np.ndarray:
+    """Weighted sum over a trailing window (weights[-1] applies to the current bar).
+
+    NaN if the window is incomplete or holds a NaN, like pandas rolling.
+    """
+    arr, one_d = _rows(x)
+    k = len(weights)
+    out = np.full(arr.shape, np.nan)
+    if k <= arr.shape[1]:
+        missing = np.isnan(arr)
+        y = lfilter(weights[::-1], [1.0], np.where(missing, 0.0, arr), axis=1)
+        gaps = lfilter(np.ones(k), [1.0], missing.astype(np.float64), axis=1)
+        y[gaps > 0.5] = np.nan
+        out[:, k - 1:] = y[:, k - 1:]
+    return out[0] if one_d else out
+
+
+def sma(x, length: int) -> np.ndarray:
+    """Simple moving average (rolling mean)"""
+    return _fir(x, np.full(length, 1.0 / length))
+
+
+def wma(x, length: int) -> np.ndarray:
+    """Linearly weighted moving average, like pandas_ta.wma"""
+    w = np.arange(1, length + 1, dtype=np.float64)
+    return _fir(x, w) * (2.0 / (length * length + length))
+
+
+def hma(x, length: int) -> np.ndarray:
+    """Hull MA: WMA(2 * WMA(x, L/2) - WMA(x, L), sqrt(L))"""
+    return wma(2.0 * wma(x, int(length / 2)) - wma(x, length), int(np.sqrt(length)))
+
+
+class EwmState:
+    """Streaming ewm(alpha, adjust=False) (ignore_na=False): one value per update"""
+
+    def __init__(self, alpha: float, adjust: bool = False):
+        self.alpha = alpha
+        self.adjust = adjust
+        self.value = _NAN
+        self._old_wt = 1.0
+
+    def update(self, x: float) -> float:
+        is_obs = not math.isnan(x)
+        if not math.isnan(self.value):
+            new_wt = 1.0 if self.adjust else self.alpha
+            self._old_wt *= 1.0 - self.alpha
+            if is_obs:
+                if self.value != x:
+                    self.value = (self._old_wt * self.value + new_wt * x) / (self._old_wt + new_wt)
+                self._old_wt = self._old_wt + new_wt if self.adjust else 1.0
+        elif is_obs:
+            self.value = x
+        return self.value
+
+    def extend(self, values) -> np.ndarray:
+        """update() for each value; a gapless chunk resumes the vectorized filter"""
+        x = np.ascontiguousarray(values, dtype=np.float64)
+        if self.adjust or not len(x) or np.isnan(x).any() or self._old_wt != 1.0:
+            return np.array([self.update(v) for v in x.tolist()])
+        out = ewm(np.concatenate([[self.value], x]), self.alpha)[1:] if not math.isnan(self.value) \
+            else ewm(x, self.alpha)
+        self.value = float(out[-1])
+        return out
+
+
+class SeededState:
+    """Streaming counterpart of ema/smma: SMA of the first `length` inputs, then ewm"""
+
+    def __init__(self, length: int, alpha: float | None = None):
+        self.length = length
+        self._seed: List[float] | None = []
+        self._ewm = EwmState(alpha if alpha is not None else 2.0 / (length + 1))
+
+    @property
+    def value(self) -> float:
+        return self._ewm.value
+
+    def update(self, x: float) -> float:
+        if self._seed is not None:
+            self._seed.append(x)
+            if len(self._seed) < self.length:
+                return self._ewm.update(_NAN)
+            vals = [v for v in self._seed if not math.isnan(v)]
+            x = sum(vals) / len(vals) if vals else _NAN
+            self._seed = None
+        return self._ewm.update(x)
+
+
+class WmaState:
+    """Streaming wma over the last `length` inputs (NaN until the window fills)"""
+
+    def __init__(self, length: int):
+        self.length = length
+        self._weights = np.arange(1, length + 1, dtype=np.float64) * (2.0 / (length * length + length))
+        self._win: Deque[float] = deque(maxlen=length)
+
+    def update(self, x: float) -> float:
+        self._win.append(x)
+        if len(self._win) < self.length:
+            return _NAN
+        return float(np.dot(self._weights, np.fromiter(self._win, dtype=np.float64, count=self.length)))
+
+
+class HmaState:
+    """Streaming hma built from three WmaState windows"""
+
+    def __init__(self, length: int):
+        self._half = WmaState(int(length / 2))
+        self._full = WmaState(length)
+        self._out = WmaState(int(np.sqrt(length)))
+        self._started = False
+
+    def update(self, x: float) -> float:
+        raw = 2.0 * self._half.update(x) - self._full.update(x)
+        # The outer window starts at the first defined inner value
+        self._started = self._started or not math.isnan(raw)
+        return self._out.update(raw) if self._started else _NAN
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import sys
+from typing import Dict, Hashable, Iterable, List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from .indicators import mark_indicators
+from .streaming import INDICATOR_COLUMNS
+
+
+# add_core_indicators columns plus the Hull MA used by ml/backtest.add_indicators
+PANEL_COLUMNS: Tuple[str, ...] = INDICATOR_COLUMNS + ("hma55",)
+
+_OHLCV = ("open", "high", "low", "close", "volume")
+_EPS = sys.float_info.epsilon
+_DAY_NS = 86_400 * 1_000_000_000
+
+
+def _compute(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+             ts_ns: np.ndarray, columns: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Indicators for left-aligned rows (every row starts at column 0)"""
+    S, T = close.shape
+    wanted = set(columns)
+    out: Dict[str, np.ndarray] = {}
+    prev_close = np.concatenate([np.full((S, 1), np.nan), close[:, :-1]], axis=1)
+
+    out["ema20"] = kernels.ema(close, 20)
+    out["ema50"] = kernels.ema(close, 50)
+
+    # RSI (Wilder smoothing of gains/losses)
+    diff = close - prev_close
+    avg_pos = kernels.rma(np.where(np.isnan(diff), np.nan, np.maximum(diff, 0.0)), 14)
+    avg_neg = kernels.rma(np.where(np.isnan(diff), np.nan, np.minimum(diff, 0.0)), 14)
+    out["rsi14"] = 100.0 * avg_pos / (avg_pos + np.abs(avg_neg))
+
+    # MACD: the signal line is seeded from the first defined MACD value
+    macd = kernels.ema(close, 12) - kernels.ema(close, 26)
+    signal = kernels.ema(macd, 9, start=25)
+    out["macd"] = macd
+    out["macd_signal"] = signal
+    out["macd_hist"] = macd - signal
+
+    # Bollinger Bands (20, 2)
+    mid = kernels.sma(close, 20)
+    sq = np.zeros((S, T))
+    for k in range(20):
+        dev = np.concatenate([np.full((S, k), np.nan), close[:, :T - k]], axis=1) - mid
+        sq += dev * dev
+    std = np.sqrt(sq / 19)
+    out["bb_lower"] = mid - 2.0 * std
+    out["bb_mid"] = mid
+    out["bb_upper"] = mid + 2.0 * std
+    out["bb_width"] = np.where(mid != 0, (out["bb_upper"] - out["bb_lower"]) / mid, np.nan)
+
+    # True range (first bar is high-low) and ATR14
+    hl = np.abs(high - low)
+    tr = np.fmax(hl, np.fmax(np.abs(high - prev_close), np.abs(prev_close - low)))
+    tr[:, 0] = hl[:, 0]
+    out["atr14"] = kernels.smma(tr, 14)
+
+    # ADX (its own ATR drops the first true range)
+    tr_adx = tr.copy()
+    tr_adx[:, 0] = np.nan
+    adx_atr = kernels.smma(tr_adx, 14)
+    up = high - np.concatenate([np.full((S, 1), np.nan), high[:, :-1]], axis=1)
+    dn = np.concatenate([np.full((S, 1), np.nan), low[:, :-1]], axis=1) - low
+    dm_pos = np.where((up > dn) & (up > 0), up, 0.0)
+    dm_neg = np.where((dn > up) & (dn > 0), dn, 0.0)
+    dm_pos[np.abs(dm_pos) < _EPS] = 0.0
+    dm_neg[np.abs(dm_neg) < _EPS] = 0.0
+    dm_pos[:, 0] = dm_neg[:, 0] = np.nan
+    k = 100.0 / adx_atr
+    dmp = k * kernels.rma(dm_pos, 14)
+    dmn = k * kernels.rma(dm_neg, 14)
+    dx = 100.0 * np.abs(dmp - dmn) / (dmp + dmn)
+    out["adx14"] = kernels.rma(dx, 14)
+
+    # Session VWAP (resets every UTC day like pandas_ta's default anchor)
+    if "vwap" in wanted:
+        vwap = np.full((S, T), np.nan)
+        tp = (high + low + close) / 3.0
+        day = ts_ns // _DAY_NS
+        cum_pv = np.zeros(S)
+        cum_v = np.zeros(S)
+        prev_day = np.full(S, np.iinfo(np.int64).min)
+        for t in range(T):
+            new_day = day[:, t] != prev_day
+            prev_day = day[:, t]
+            cum_pv = np.where(new_day, 0.0, cum_pv)
+            cum_v = np.where(new_day, 0.0, cum_v)
+            v = volume[:, t]
+            ok = ~np.isnan(v)
+            cum_pv = np.where(ok, cum_pv + tp[:, t] * v, cum_pv)
+            cum_v = np.where(ok, cum_v + v, cum_v)
+            vwap[:, t] = np.where(ok, cum_pv / cum_v, np.nan)
+        out["vwap"] = vwap
+
+    # Hull MA 55: WMA(2 * WMA(27) - WMA(55), 7)
+    if "hma55" in wanted:
+        out["hma55"] = kernels.hma(close, 55)
+
+    return {c: out[c] for c in columns}
+
+
+def panel_indicators(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                     ts_ns: np.ndarray, columns: Iterable[str] = PANEL_COLUMNS) -> Dict[str, np.ndarray]:
+    """Indicators for a (symbols x bars) panel in one vectorized pass along the time axis.
+
+    Inputs are aligned float arrays of shape (S, T); ts_ns is int64 epoch
+    nanoseconds, either (T,) shared or (S, T). Bars whose close is NaN are
+    missing for that symbol (ragged histories, gaps): every row is computed
+    over its own bars only, so the values match add_core_indicators run on
+    each symbol's frame, and missing cells come back as NaN.
+    """
+    columns = tuple(columns)
+    close = np.asarray(close, dtype=float)
+    S, T = close.shape
+    ts_ns = np.broadcast_to(np.asarray(ts_ns, dtype=np.int64), (S, T))
+    inputs = [np.asarray(a, dtype=float) for a in (high, low, close, volume)]
+    valid = ~np.isnan(close)
+    n = valid.sum(axis=1)
+    width = int(n.max()) if S else 0
+    if width == 0:
+        return {c: np.full((S, T), np.nan) for c in columns}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if valid.all():
+            return _compute(*inputs, ts_ns, columns)
+        # Left-align each row's bars so warmups/seeds line up across symbols
+        order = np.argsort(~valid, axis=1, kind="stable")[:, :width]
+        packed = [np.take_along_axis(a, order, axis=1) for a in inputs]
+        keep = np.arange(width)[None, :] < n[:, None]
+        packed = [np.where(keep, a, np.nan) for a in packed]
+        res = _compute(*packed, np.take_along_axis(ts_ns, order, axis=1), columns)
+
+    out: Dict[str, np.ndarray] = {}
+    for c, vals in res.items():
+        full = np.full((S, T), np.nan)
+        np.put_along_axis(full, order, np.where(keep, vals, np.nan), axis=1)
+        full[~valid] = np.nan
+        out[c] = full
+    return out
+
+
+def _utc(ts: pd.Series) -> pd.Series:
+    return ts if isinstance(ts.dtype, pd.DatetimeTZDtype) else pd.to_datetime(ts, utc=True)
+
+
+def _ts_ns(ts: pd.Series) -> np.ndarray:
+    return _utc(ts).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def build_panel(frames: Mapping[Hashable, pd.DataFrame]) -> Tuple[List[Hashable], np.ndarray, Dict[str, np.ndarray]]:
+    """Align per-symbol candle frames on the union of their timestamps.
+
+    Returns (keys, ts_ns (T,), {ohlcv column: (S, T) array}) with NaN where a
+    symbol has no bar.
+    """
+    keys = list(frames)
+    stamps = [_ts_ns(frames[k]["ts"]) for k in keys]
+    ts = np.unique(np.concatenate(stamps)) if stamps else np.empty(0, dtype=np.int64)
+    panel = {c: np.full((len(keys), len(ts)), np.nan) for c in _OHLCV}
+    for i, k in enumerate(keys):
+        pos = np.searchsorted(ts, stamps[i])
+        values = frames[k][list(_OHLCV)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        for j, c in enumerate(_OHLCV):
+            panel[c][i, pos] = values[:, j]
+    return keys, ts, panel
+
+
+def annotate_panel(frames: Mapping[Hashable, pd.DataFrame], columns: Iterable[str] = PANEL_COLUMNS) -> Dict[Hashable, pd.DataFrame]:
+    """Panel counterpart of add_core_indicators for many symbols at once.
+
+    Each frame comes back sorted by ts with the requested indicator columns
+    appended; values are those of add_core_indicators (and ml/backtest's
+    hma55) on that frame alone.
+    """
+    columns = tuple(columns)
+    cleaned: Dict[Hashable, pd.DataFrame] = {}
+    for k, df in frames.items():
+        if df is None or df.empty:
+            continue
+        out = df.drop(columns=[c for c in PANEL_COLUMNS if c in df.columns])
+        out["ts"] = _utc(out["ts"])
+        if not out["ts"].is_monotonic_increasing:
+            out = out.sort_values("ts")
+        if not out["ts"].is_unique:
+            out = out.drop_duplicates("ts", keep="last")
+        cleaned[k] = out.reset_index(drop=True)
+    if not cleaned:
+        return {}
+    keys, ts, panel = build_panel(cleaned)
+    values = panel_indicators(panel["high"], panel["low"], panel["close"], panel["volume"], ts, columns)
+    result: Dict[Hashable, pd.DataFrame] = {}
+    for i, k in enumerate(keys):
+        out = cleaned[k]
+        pos = np.searchsorted(ts, _ts_ns(out["ts"]))
+        ind = pd.DataFrame({c: values[c][i, pos] for c in columns}, index=out.index)
+        result[k] = mark_indicators(pd.concat([out, ind], axis=1), columns)
+    return result
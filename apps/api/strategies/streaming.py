@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import copy
+import math
+import sys
+from collections import deque
+from typing import Deque, Dict, Hashable, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+from .indicators import CORE_COLUMNS, mark_indicators
+from .kernels import EwmState, SeededState
+
+# Columns produced by add_core_indicators, in the same order
+INDICATOR_COLUMNS: Tuple[str, ...] = CORE_COLUMNS
+
+_OHLCV = ("open", "high", "low", "close", "volume")
+_NAN = float("nan")
+_EPS = sys.float_info.epsilon
+
+
+def _div(num: float, den: float) -> float:
+    """Division with pandas semantics (x/0 -> +/-inf, 0/0 -> NaN)"""
+    if den == 0 or math.isnan(den) or math.isnan(num):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return float(np.float64(num) / np.float64(den))
+    return num / den
+
+
+class _RollingStats:
+    """Fixed window mean / sample std over the last `length` inputs"""
+
+    def __init__(self, length: int):
+        self.length = length
+        self._win: Deque[float] = deque(maxlen=length)
+
+    def update(self, x: float) -> Tuple[float, float]:
+        self._win.append(x)
+        if len(self._win) < self.length:
+            return _NAN, _NAN
+        mean = sum(self._win) / self.length
+        var = sum((v - mean) ** 2 for v in self._win) / (self.length - 1)
+        return mean, math.sqrt(var)
+
+
+class StreamingIndicators:
+    """Incremental counterpart of add_core_indicators for one symbol/timeframe.
+
+    Keeps the recursive state (EMA seeds, Wilder averages, rolling windows,
+    session VWAP sums) so each appended candle costs O(1). Feeding candles
+    one at a time yields the same values as add_core_indicators run over the
+    whole sequence seen so far.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.last_ts: pd.Timestamp | None = None
+        self._prev_close = _NAN
+        self._prev_high = _NAN
+        self._prev_low = _NAN
+        # Moving averages / MACD
+        self._ema20 = SeededState(20)
+        self._ema50 = SeededState(50)
+        self._ema12 = SeededState(12)
+        self._ema26 = SeededState(26)
+        self._macd_signal = SeededState(9)
+        # RSI (Wilder smoothing of gains/losses)
+        self._rsi_pos = EwmState(1.0 / 14)
+        self._rsi_neg = EwmState(1.0 / 14)
+        # Bollinger
+        self._bb = _RollingStats(20)
+        # ATR14 (first TR is high-low) and the ADX's own ATR (first TR dropped)
+        self._atr = SeededState(14, alpha=1.0 / 14)
+        self._adx_atr = SeededState(14, alpha=1.0 / 14)
+        self._dm_pos = EwmState(1.0 / 14)
+        self._dm_neg = EwmState(1.0 / 14)
+        self._adx = EwmState(1.0 / 14)
+        # VWAP anchored to the (UTC) session day
+        self._vwap_day = None
+        self._cum_pv = 0.0
+        self._cum_v = 0.0
+
+    def update(self, ts, open_: float, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """Append one closed candle and return the indicator values for it"""
+        ts = pd.Timestamp(ts)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize("UTC")
+        high = float(high); low = float(low); close = float(close)
+        volume = float(volume) if volume is not None else _NAN
+        first = self.count == 0
+        out: Dict[str, float] = {}
+
+        out["ema20"] = self._ema20.update(close)
+        out["ema50"] = self._ema50.update(close)
+
+        # RSI
+        diff = _NAN if first else close - self._prev_close
+        pos = diff if math.isnan(diff) else max(diff, 0.0)
+        neg = diff if math.isnan(diff) else min(diff, 0.0)
+        avg_pos = self._rsi_pos.update(pos)
+        avg_neg = self._rsi_neg.update(neg)
+        out["rsi14"] = _div(100.0 * avg_pos, avg_pos + abs(avg_neg))
+
+        # MACD: the signal line only starts once the MACD line is defined
+        macd = self._ema12.update(close) - self._ema26.update(close)
+        signal = self._macd_signal.update(macd) if not math.isnan(macd) else _NAN
+        out["macd"] = macd
+        out["macd_signal"] = signal
+        out["macd_hist"] = macd - signal
+
+        # Bollinger Bands (20, 2)
+        mid, std = self._bb.update(close)
+        out["bb_lower"] = mid - 2.0 * std
+        out["bb_mid"] = mid
+        out["bb_upper"] = mid + 2.0 * std
+        out["bb_width"] = _div(out["bb_upper"] - out["bb_lower"], mid) if mid != 0 else _NAN
+
+        # True range
+        hl = high - low
+        if first:
+            tr = abs(hl)
+        else:
+            tr = max(abs(hl), abs(high - self._prev_close), abs(self._prev_close - low))
+        out["atr14"] = self._atr.update(tr)
+
+        # ADX
+        adx_atr = self._adx_atr.update(_NAN if first else tr)
+        if first:
+            dm_pos = dm_neg = _NAN
+        else:
+            up = high - self._prev_high
+            dn = self._prev_low - low
+            dm_pos = up if (up > dn and up > 0) else 0.0
+            dm_neg = dn if (dn > up and dn > 0) else 0.0
+            dm_pos = 0.0 if abs(dm_pos) < _EPS else dm_pos
+            dm_neg = 0.0 if abs(dm_neg) < _EPS else dm_neg
+        k = _div(100.0, adx_atr)
+        dmp = k * self._dm_pos.update(dm_pos)
+        dmn = k * self._dm_neg.update(dm_neg)
+        dx = _div(100.0 * abs(dmp - dmn), dmp + dmn)
+        out["adx14"] = self._adx.update(dx)
+
+        # Session VWAP (resets every UTC day like pandas_ta's default anchor)
+        day = ts.tz_convert("UTC").date()
+        if day != self._vwap_day:
+            self._vwap_day = day
+            self._cum_pv = 0.0
+            self._cum_v = 0.0
+        if math.isnan(volume):
+            out["vwap"] = _NAN
+        else:
+            tp = (high + low + close) / 3.0
+            self._cum_pv += tp * volume
+            self._cum_v += volume
+            out["vwap"] = _div(self._cum_pv, self._cum_v)
+
+        self._prev_close = close
+        self._prev_high = high
+        self._prev_low = low
+        self.count += 1
+        self.last_ts = ts
+        return out
+
+
+class _SymbolState:
+    """Engine plus a bounded history of the candles/values it has produced"""
+
+    def __init__(self, max_rows: int):
+        self.engine = StreamingIndicators()
+        self.prev_engine: StreamingIndicators | None = None
+        self.max_rows = max_rows
+        self.order: Deque[int] = deque()
+        self.inputs: Dict[int, Tuple[float, ...]] = {}
+        self.values: Dict[int, Tuple[float, ...]] = {}
+
+    def push(self, ts_ns: int, ts: pd.Timestamp, candle: Tuple[float, ...], snapshot: bool = False) -> None:
+        # Only the newest candle can be revised, so only it needs a snapshot
+        self.prev_engine = copy.deepcopy(self.engine) if snapshot else None
+        out = self.engine.update(ts, *candle)
+        self.order.append(ts_ns)
+        self.inputs[ts_ns] = candle
+        self.values[ts_ns] = tuple(out[c] for c in INDICATOR_COLUMNS)
+        while len(self.order) > self.max_rows:
+            old = self.order.popleft()
+            self.inputs.pop(old, None)
+            self.values.pop(old, None)
+
+    def rewind_last(self) -> None:
+        """Drop the most recent candle (e.g. a still-forming bar that got revised)"""
+        last = self.order.pop()
+        self.inputs.pop(last, None)
+        self.values.pop(last, None)
+        self.engine = self.prev_engine
+        self.prev_engine = None
+
+
+def _same_candle(a: Tuple[float, ...], b: Tuple[float, ...]) -> bool:
+    for x, y in zip(a, b):
+        if x != y and not (math.isnan(x) and math.isnan(y)):
+            return False
+    return True
+
+
+class IndicatorStateStore:
+    """Per-(symbol, timeframe) streaming indicator states.
+
+    annotate() is a drop-in replacement for add_core_indicators on the
+    scanner's candle window: only candles newer than the last one seen are
+    pushed through the engine. A revised last candle is rewound and
+    re-applied; any other mismatch (gaps, edits further back, history that
+    fell out of the window) rebuilds the state from the given frame.
+    """
+
+    def __init__(self, max_rows: int = 2000):
+        self.max_rows = max_rows
+        self._states: Dict[Hashable, _SymbolState] = {}
+        self.stats = {"appended": 0, "rebuilt": 0, "rewound": 0}
+
+    def reset(self, key: Hashable | None = None) -> None:
+        if key is None:
+            self._states.clear()
+        else:
+            self._states.pop(key, None)
+
+    def annotate(self, key: Hashable, df: pd.DataFrame) -> pd.DataFrame:
+        out = df.copy()
+        if out.empty:
+            return out
+        out["ts"] = pd.to_datetime(out["ts"], utc=True)
+        out = out.sort_values("ts").reset_index(drop=True)
+        ts_ns = out["ts"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        candles = out[list(_OHLCV)].to_numpy(dtype=float)
+
+        state = self._states.get(key)
+        start = 0
+        if state is not None and state.order:
+            last_ns = state.order[-1]
+            n_known = int(np.searchsorted(ts_ns, last_ns, side="right"))
+            ok = True
+            for i in range(n_known):
+                prev = state.inputs.get(int(ts_ns[i]))
+                if prev is None:
+                    ok = False
+                    break
+                if not _same_candle(prev, tuple(candles[i])):
+                    if i == n_known - 1 and ts_ns[i] == last_ns and state.prev_engine is not None:
+                        state.rewind_last()
+                        self.stats["rewound"] += 1
+                        n_known -= 1
+                    else:
+                        ok = False
+                    break
+            start = n_known if ok else 0
+            if not ok:
+                state = None
+        if state is None:
+            state = _SymbolState(self.max_rows)
+            self._states[key] = state
+            self.stats["rebuilt"] += 1
+
+        ts_list = list(out["ts"])
+        last = len(out) - 1
+        for i in range(start, len(out)):
+            state.push(int(ts_ns[i]), ts_list[i], tuple(candles[i]), snapshot=(i == last))
+        self.stats["appended"] += len(out) - start
+
+        values = np.array([state.values[int(t)] for t in ts_ns], dtype=float)
+        out = out.drop(columns=[c for c in INDICATOR_COLUMNS if c in out.columns])
+        out = pd.concat([out, pd.DataFrame(values, columns=list(INDICATOR_COLUMNS))], axis=1)
+        return mark_indicators(out, INDICATOR_COLUMNS)
+
+
+# Process-wide store used by the scanner
+_STORE = IndicatorStateStore()
+
+
+def get_indicator_store() -> IndicatorStateStore:
+    return _STORE
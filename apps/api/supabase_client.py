@@ -1,8 +1,93 @@
 import os
+import ssl
+import threading
+import time
+from typing import Dict, Tuple
+
+import httpx
 from supabase import create_client, Client
 from dotenv import load_dotenv
 load_dotenv()
 
+
+_CLIENTS: Dict[Tuple[str, str], Client] = {}
+_CLIENTS_LOCK = threading.Lock()
+_METRICS: Dict[str, Dict[str, float]] = {}
+_METRICS_LOCK = threading.Lock()
+
+
+def _table_of(request: httpx.Request) -> str:
+    # /rest/v1/<table> or /rest/v1/rpc/<function>
+    path = request.url.path.split("/rest/v1/", 1)[-1]
+    return path.strip("/") or "?"
+
+
+def _on_request(request: httpx.Request) -> None:
+    request.extensions["sb_started"] = time.perf_counter()
+
+
+def _on_response(response: httpx.Response) -> None:
+    started = response.request.extensions.get("sb_started")
+    elapsed_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+    table = _table_of(response.request)
+    with _METRICS_LOCK:
+        m = _METRICS.setdefault(table, {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        m["count"] += 1
+        m["errors"] += 1 if response.status_code >= 400 else 0
+        m["total_ms"] += elapsed_ms
+        m["max_ms"] = max(m["max_ms"], elapsed_ms)
+
+
+def get_client_metrics(reset: bool = False) -> Dict[str, Dict[str, float]]:
+    """Per-table request count, errors and latency (time to response headers, ms)"""
+    with _METRICS_LOCK:
+        out = {t: {**m, "avg_ms": m["total_ms"] / m["count"] if m["count"] else 0.0} for t, m in _METRICS.items()}
+        if reset:
+            _METRICS.clear()
+    return out
+
+
+def _session_verify(session: httpx.Client) -> bool:
+    """Whether a session verifies TLS certificates (httpx keeps the setting only in its SSL context)"""
+    ctx = getattr(getattr(getattr(session, "_transport", None), "_pool", None), "_ssl_context", None)
+    return ctx is None or ctx.verify_mode != ssl.CERT_NONE
+
+
+def _pool_session(client: Client) -> None:
+    """Swap the PostgREST session for a pooled, metered one (shared across threads).
+
+    Keeps what postgrest's create_session sets (HTTP/2, TLS verification,
+    redirects) and adds the connection limits and metering hooks.
+    """
+    pg = client.postgrest
+    old = pg.session
+    pool_size = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+    pg.session = type(old)(
+        base_url=old.base_url,
+        headers=old.headers,
+        timeout=old.timeout,
+        verify=_session_verify(old),
+        follow_redirects=True,
+        http2=True,
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+    old.close()
+
+
+def get_pooled_client(url: str, key: str) -> Client:
+    """Process-wide client for (url, key); safe to share between threads"""
+    client = _CLIENTS.get((url, key))
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get((url, key))
+            if client is None:
+                client = create_client(url, key)
+                _pool_session(client)
+                _CLIENTS[(url, key)] = client
+    return client
+
+
 def get_client() -> Client | None:
     url = os.environ.get("SUPABASE_URL")
     key = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_ANON_KEY")
@@ -12,6 +97,4 @@ def get_client() -> Client | None:
         print(f"  SUPABASE_URL: {url or 'NOT SET'}")
         print(f"  SUPABASE_SERVICE_KEY: {'SET' if key else 'NOT SET'}")
         return None
-    return create_client(url, key)
-
-
+    return get_pooled_client(url, key)
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from typing import Dict, List
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+import requests
+
+from apps.api.candle_resample import BAR_NS, DERIVED_TIMEFRAMES, SESSION_ANCHOR_NS, resample_candles
+from apps.api.yahoo_client import TF_TO_YF
+
+# Per-5m-bar log drift and volatility of each market regime
+REGIMES = {
+    "bull": (0.00012, 0.0018),
+    "bear": (-0.00012, 0.0022),
+    "sideways": (0.0, 0.0012),
+    "volatile": (0.0, 0.0045),
+}
+# Mean regime length in 5m bars (about four sessions)
+MEAN_REGIME_BARS = 300
+_BARS_PER_SESSION = 75
+_DAY_NS = DERIVED_TIMEFRAMES["1d"]
+_YF_TO_TF = {v: k for k, v in TF_TO_YF.items()}
+
+
+def session_times(days: int, end_ns: int | None = None) -> np.ndarray:
+    """Start (UTC ns) of every NSE 5m bar on the weekdays of the last `days` days that has opened by end_ns"""
+    end_ns = pd.Timestamp.now(tz="UTC").value if end_ns is None else end_ns
+    last_day = end_ns // _DAY_NS * _DAY_NS
+    day_starts = last_day - np.arange(days)[::-1] * _DAY_NS
+    weekdays = pd.to_datetime(day_starts, utc=True).weekday < 5
+    bars = (day_starts[weekdays, None] + SESSION_ANCHOR_NS + np.arange(_BARS_PER_SESSION) * BAR_NS["5m"]).ravel()
+    return bars[bars <= end_ns]
+
+
+def regime_path(n: int, rng: np.random.Generator) -> np.ndarray:
+    """Regime index per bar from a Markov chain with geometric regime lengths"""
+    lengths, total = [], 0
+    while total < n:
+        lengths.append(int(rng.geometric(1.0 / MEAN_REGIME_BARS)))
+        total += lengths[-1]
+    labels = rng.integers(0, len(REGIMES), len(lengths))
+    return np.repeat(labels, lengths)[:n]
+
+
+def generate_candles(ts_ns: np.ndarray, seed: int, start_price: float | None = None) -> pd.DataFrame:
+    """Regime-switching GBM 5m candles at the given bar starts.
+
+    Each bar's log return is drawn from its regime's drift/volatility, the
+    first bar of a session opens with an overnight gap, and high/low extend
+    past open/close by a volatility-scaled wick. Volume is log-normal and
+    rises with the size of the move.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(ts_ns)
+    regime = regime_path(n, rng)
+    mu, sigma = (np.array(v)[regime] for v in zip(*REGIMES.values()))
+    ret = mu - 0.5 * sigma ** 2 + sigma * rng.standard_normal(n)
+    new_session = np.r_[True, np.diff(ts_ns) > BAR_NS["5m"]]
+    gap = np.where(new_session, rng.normal(0, 0.006, n), 0.0)
+    gap[0] = 0.0
+    price = start_price if start_price is not None else float(rng.uniform(50, 3000))
+    log_close = np.log(price) + np.cumsum(gap + ret)
+    close = np.exp(log_close)
+    open_ = np.exp(log_close - ret)
+    wick = sigma * np.abs(rng.standard_normal((2, n))) * 0.5
+    return pd.DataFrame({
+        "ts": pd.to_datetime(ts_ns, utc=True),
+        "open": open_.round(2),
+        "high": (np.maximum(open_, close) * np.exp(wick[0])).round(2),
+        "low": (np.minimum(open_, close) * np.exp(-wick[1])).round(2),
+        "close": close.round(2),
+        "volume": np.floor(rng.lognormal(10, 0.6, n) * (1 + 50 * np.abs(ret))),
+    })
+
+
+class SyntheticMarket:
+    """A universe of synthetic NSE symbols with 5m history and 15m/1h/1d bars aggregated from it.
+
+    Candles are generated lazily per symbol (seeded by its index, so runs are
+    reproducible) and end at end_ns (default: now).
+    """
+
+    def __init__(self, n_symbols: int, days: int = 60, seed: int = 7, end_ns: int | None = None):
+        self.days = days
+        self.seed = seed
+        self.times = session_times(days, end_ns)
+        self.symbols: List[dict] = [
+            {"id": str(uuid.UUID(int=seed * 1_000_000 + i)), "ticker": f"SYN{i:04d}", "exchange": "NSE", "is_active": True}
+            for i in range(n_symbols)
+        ]
+        self._index = {s["ticker"]: i for i, s in enumerate(self.symbols)}
+        self._frames: Dict[tuple, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def candles(self, ticker: str, tf: str = "5m") -> pd.DataFrame:
+        key = (ticker, tf)
+        with self._lock:
+            df = self._frames.get(key)
+        if df is not None:
+            return df
+        if tf == "5m":
+            i = self._index[ticker]
+            df = generate_candles(self.times, seed=self.seed * 1_000_000 + i)
+        elif tf in DERIVED_TIMEFRAMES:
+            df = resample_candles(self.candles(ticker, "5m"), tf)
+        else:
+            raise ValueError(f"No synthetic {tf} candles (have 5m, {', '.join(DERIVED_TIMEFRAMES)})")
+        with self._lock:
+            self._frames[key] = df
+        return df
+
+    def candle_rows(self, symbol: dict, tf: str, start_ns: int | None = None, end_ns: int | None = None) -> List[dict]:
+        """Rows for seeding the candles table: bars starting in [start_ns, end_ns)"""
+        df = self.candles(symbol["ticker"], tf)
+        ts = df["ts"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        keep = np.ones(len(df), dtype=bool)
+        if start_ns is not None:
+            keep &= ts >= start_ns
+        if end_ns is not None:
+            keep &= ts < end_ns
+        df = df[keep]
+        out = df.assign(ts=df["ts"].dt.strftime("%Y-%m-%dT%H:%M:%S+00:00"), symbol_id=symbol["id"], timeframe=tf)
+        return out.to_dict("records")
+
+    def chart(self, yf_symbol: str, params: dict) -> dict | None:
+        """Yahoo v8 chart payload for a symbol, or None if it is not in the universe"""
+        ticker = yf_symbol.split(".")[0]
+        tf = _YF_TO_TF.get(params.get("interval", "1d"))
+        if ticker not in self._index or tf is None:
+            return None
+        df = self.candles(ticker, tf)
+        ts = df["ts"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+        keep = (ts >= int(params.get("period1", 0))) & (ts < int(params.get("period2", 2**62)))
+        bars = df[keep]
+        return {"chart": {"result": [{
+            "meta": {"symbol": yf_symbol, "currency": "INR", "dataGranularity": params.get("interval")},
+            "timestamp": ts[keep].tolist(),
+            "indicators": {"quote": [{c: bars[c].tolist() for c in ("open", "high", "low", "close", "volume")}]},
+        }], "error": None}}
+
+    def quotes(self, yf_symbols: List[str]) -> dict:
+        """Yahoo v7 quote payload: the last close as the market price"""
+        result = []
+        for sym in yf_symbols:
+            ticker = sym.split(".")[0]
+            if ticker in self._index:
+                result.append({"symbol": sym, "regularMarketPrice": float(self.candles(ticker)["close"].iloc[-1])})
+        return {"quoteResponse": {"result": result, "error": None}}
+
+
+class StubResponse:
+    """The parts of requests.Response the Yahoo client reads"""
+
+    def __init__(self, status_code: int, payload: dict, url: str):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode()
+        self.headers: Dict[str, str] = {}
+        self.url = url
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class StubYahooSession:
+    """Offline replacement for YahooHttpClient.session serving chart/quote responses from a SyntheticMarket.
+
+    latency_ms simulates the network round trip of each request.
+    """
+
+    def __init__(self, market: SyntheticMarket, latency_ms: float = 0.0):
+        self.market = market
+        self.latency_ms = latency_ms
+        self.headers: Dict[str, str] = {}
+        self.requests = 0
+
+    def get(self, url: str, params: dict | None = None, timeout: float | None = None) -> StubResponse:
+        self.requests += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        params = params or {}
+        if "/v8/finance/chart/" in url:
+            payload = self.market.chart(unquote(url.rsplit("/", 1)[-1]), params)
+            if payload is None:
+                return StubResponse(404, {"chart": {"result": None, "error": {"code": "Not Found"}}}, url)
+            return StubResponse(200, payload, url)
+        if "/v7/finance/quote" in url:
+            return StubResponse(200, self.market.quotes(params.get("symbols", "").split(",")), url)
+        return StubResponse(404, {"error": "unknown endpoint"}, url)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Checks for deriving 15m/1h/1d candles from stored 5m bars
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api.candle_resample import plan_derived, resample_candles, update_derived
+
+
+def _sessions(days: int = 2, seed: int = 0) -> pd.DataFrame:
+    # 75 five-minute bars per NSE session, 09:15-15:25 IST (03:45-09:55 UTC)
+    rng = np.random.default_rng(seed)
+    ts = np.concatenate([pd.date_range(f"2025-01-{6 + d:02d} 03:45", periods=75, freq="5min", tz="UTC") for d in range(days)])
+    close = 100 + np.cumsum(rng.normal(0, 0.3, len(ts)))
+    open_ = np.r_[100, close[:-1]]
+    return pd.DataFrame({
+        "ts": pd.to_datetime(ts, utc=True), "open": open_,
+        "high": np.maximum(open_, close) + 0.2, "low": np.minimum(open_, close) - 0.2,
+        "close": close, "volume": rng.integers(100, 1000, len(ts)).astype(float),
+    })
+
+
+def _pandas_resample(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    ist = df.set_index(df["ts"].dt.tz_convert("Asia/Kolkata"))
+    agg = ist.resample(rule, origin=pd.Timestamp("2025-01-01 09:15", tz="Asia/Kolkata")).agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}).dropna()
+    return agg.reset_index(drop=True)
+
+
+def test_session_aligned_ohlcv():
+    df = _sessions()
+    for tf, rule, per_day in (("15m", "15min", 25), ("1h", "60min", 7), ("1d", "24h", 1)):
+        out = resample_candles(df, tf)
+        assert len(out) == 2 * per_day, tf
+        ref = _pandas_resample(df, rule)
+        for c in ("open", "high", "low", "close", "volume"):
+            np.testing.assert_allclose(out[c].to_numpy(), ref[c].to_numpy(), err_msg=f"{tf} {c}")
+    hours = resample_candles(df, "1h")["ts"].dt.tz_convert("Asia/Kolkata").dt.strftime("%H:%M")
+    assert list(hours[:7]) == ["09:15", "10:15", "11:15", "12:15", "13:15", "14:15", "15:15"]
+    assert (resample_candles(df, "1d")["ts"].dt.tz_convert("Asia/Kolkata").dt.strftime("%H:%M") == "09:15").all()
+
+
+class _Query:
+    def __init__(self, sb):
+        self.sb, self.filters, self.rows = sb, [], None
+
+    def __getattr__(self, _):
+        return lambda *a, **k: self
+
+    def gte(self, col, value):
+        self.filters.append(lambda r: pd.Timestamp(r["ts"]) >= pd.Timestamp(value))
+        return self
+
+    def gt(self, col, value):
+        self.filters.append(lambda r: pd.Timestamp(r["ts"]) > pd.Timestamp(value))
+        return self
+
+    def lt(self, col, value):
+        self.filters.append(lambda r: pd.Timestamp(r["ts"]) < pd.Timestamp(value))
+        return self
+
+    def upsert(self, rows, **kwargs):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        if self.rows is not None:
+            self.sb.upserts.extend(self.rows)
+            return type('Res', (), {'data': self.rows})()
+        data = [r for r in self.sb.base if all(f(r) for f in self.filters)]
+        return type('Res', (), {'data': data})()
+
+
+class _FakeSB:
+    def __init__(self, base: pd.DataFrame):
+        self.base = [{**r, "ts": r["ts"].isoformat()} for r in base.to_dict("records")]
+        self.upserts = []
+
+    def table(self, name):
+        return _Query(self)
+
+
+def test_incremental_update_touches_only_affected_buckets():
+    old = os.environ.get("CANDLE_CACHE")
+    os.environ["CANDLE_CACHE"] = "0"
+    try:
+        df = _sessions()
+        sb = _FakeSB(df)
+        # The last three 5m bars of day 2 arrived; earlier bars are already stored
+        written = update_derived(sb, "sym", df.tail(3))
+        assert written == {"15m": 1, "1h": 1, "1d": 1}
+        by_tf = {r["timeframe"]: r for r in sb.upserts}
+        day = resample_candles(df, "1d").iloc[-1]
+        assert by_tf["1d"]["volume"] == day["volume"] and by_tf["1d"]["open"] == day["open"]
+        assert by_tf["1h"]["ts"].startswith("2025-01-07T09:45")  # 15:15 IST
+        # A bucket whose earlier 5m bars are not stored is left alone
+        sb = _FakeSB(df.tail(3))
+        assert update_derived(sb, "sym", df.tail(3), ["1d"]) == {"1d": 0}
+    finally:
+        if old is None:
+            os.environ.pop("CANDLE_CACHE", None)
+        else:
+            os.environ["CANDLE_CACHE"] = old
+
+
+def test_bucket_missing_its_first_bar_is_written():
+    # Illiquid day 2: no 09:15 IST bar (opens the day) and no 15:15 IST bar (opens a 15m and a 1h bucket)
+    df = _sessions()
+    ist = df["ts"].dt.tz_convert("Asia/Kolkata")
+    day2 = ist.dt.day == 7
+    df = df[~(day2 & ist.dt.strftime("%H:%M").isin(["09:15", "15:15"]))].reset_index(drop=True)
+    old = os.environ.get("CANDLE_CACHE")
+    os.environ["CANDLE_CACHE"] = "0"
+    try:
+        sb = _FakeSB(df)
+        # 15:10, 15:20 and 15:25 arrive; day 1 is stored, so day 2's history is loaded from its open
+        assert update_derived(sb, "sym", df.tail(3)) == {"15m": 2, "1h": 2, "1d": 1}
+    finally:
+        if old is None:
+            os.environ.pop("CANDLE_CACHE", None)
+        else:
+            os.environ["CANDLE_CACHE"] = old
+    written = {(r["timeframe"], r["ts"]): r for r in sb.upserts}
+    for tf in ("15m", "1h", "1d"):
+        expected = resample_candles(df, tf).tail(2 if tf != "1d" else 1)
+        for bar in expected.to_dict("records"):
+            row = written[(tf, bar["ts"].isoformat())]
+            assert all(row[c] == bar[c] for c in ("open", "high", "low", "close", "volume"))
+    first_day2 = df[df["ts"] >= pd.Timestamp("2025-01-07", tz="UTC")].iloc[0]
+    assert first_day2["ts"].strftime("%H:%M") == "03:50" and written[("1d", "2025-01-07T03:45:00+00:00")]["open"] == first_day2["open"]
+
+
+def test_stale_daily_widens_the_5m_fetch():
+    # 5m and 15m are current, 1d last stored on Monday; it is Friday 17:30 IST
+    now = pd.Timestamp("2025-01-10 12:00", tz="UTC")
+    derived, days = plan_derived({"15m": None, "1h": None, "1d": "2025-01-06T03:45:00+00:00"}, now.value)
+    assert derived == ["15m", "1h", "1d"] and days == 5
+    # A 5m fetch of that many days reaches back to Monday, so every missing daily bar is rebuilt
+    df = _sessions(days=5)
+    fetched = df[df["ts"] >= now - pd.Timedelta(days=days)]
+    old = os.environ.get("CANDLE_CACHE")
+    os.environ["CANDLE_CACHE"] = "0"
+    try:
+        sb = _FakeSB(df)
+        assert update_derived(sb, "sym", fetched, ["1d"]) == {"1d": 5}
+    finally:
+        if old is None:
+            os.environ.pop("CANDLE_CACHE", None)
+        else:
+            os.environ["CANDLE_CACHE"] = old
+    # Nothing lagging: no widened fetch; a gap beyond the 5m history is fetched directly
+    assert plan_derived({"1d": None}, now.value) == (["1d"], 0)
+    assert plan_derived({"1h": None, "1d": "2024-09-01T03:45:00+00:00"}, now.value) == (["1h"], 0)
+
+
+if __name__ == "__main__":
+    test_session_aligned_ohlcv()
+    test_incremental_update_touches_only_affected_buckets()
+    test_bucket_missing_its_first_bar_is_written()
+    test_stale_daily_widens_the_5m_fetch()
+    print("✅ Candle resampling checks passed")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Checks for the offline benchmark fixtures: in-memory Supabase, synthetic market and stub Yahoo transport
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+import apps.api.yahoo_http as yahoo_http
+from apps.api import execution, risk_engine, yahoo_client
+from apps.api.candle_freshness import load_candle_freshness
+from apps.api.candle_resample import resample_candles
+from apps.api.fake_supabase import FakeSupabase, install_fake_client
+from apps.api.synthetic_market import StubYahooSession, SyntheticMarket, generate_candles, session_times
+
+_END = pd.Timestamp("2025-03-07 12:00", tz="UTC").value
+
+
+def test_queries_and_rpcs():
+    market = SyntheticMarket(3, days=10, end_ns=_END)
+    sb = FakeSupabase()
+    sb.seed("symbols", market.symbols)
+    sid = market.symbols[0]["id"]
+    sb.seed("candles", market.candle_rows(market.symbols[0], "15m"))
+    bars = market.candles("SYN0000", "15m")
+
+    resp = sb.table("candles").select("ts,close", count="exact").eq("symbol_id", sid).eq("timeframe", "15m") \
+        .order("ts", desc=True).limit(2).execute()
+    assert resp.count == len(bars) and [r["close"] for r in resp.data] == bars["close"].iloc[:-3:-1].tolist()
+    assert set(resp.data[0]) == {"ts", "close"}
+    since = bars["ts"].iloc[-5].isoformat()
+    assert len(sb.table("candles").select("ts").eq("symbol_id", sid).eq("timeframe", "15m").gte("ts", since).execute().data) == 5
+
+    # Upserts replace on the conflict key; inserts add ids
+    row = {"symbol_id": sid, "timeframe": "15m", "ts": resp.data[0]["ts"], "open": 1, "high": 1, "low": 1, "close": 1.5, "volume": 0}
+    sb.table("candles").upsert([row], on_conflict="symbol_id,timeframe,ts").execute()
+    again = sb.table("candles").select("close", count="exact").eq("symbol_id", sid).eq("timeframe", "15m").order("ts", desc=True).limit(1).execute()
+    assert again.data == [{"close": 1.5}] and again.count == len(bars)
+    run = sb.table("strategy_runs").insert({"mode": "15m"}).execute().data[0]
+    sb.table("strategy_runs").update({"signals_generated": 4}).eq("id", run["id"]).execute()
+    assert sb.table("strategy_runs").select("*").eq("id", run["id"]).single().execute().data["signals_generated"] == 4
+
+    fresh = load_candle_freshness(sb, "15m")
+    assert fresh == {sid: {"latest_date": resp.data[0]["ts"], "count": len(bars)}}
+    assert sb.requests["rpc/candle_freshness"] == 1
+
+
+def test_freshness_paged_past_row_cap():
+    # PostgREST caps each response; the freshness map must still cover every symbol
+    market = SyntheticMarket(7, days=3, end_ns=_END)
+    sb = FakeSupabase(max_rows=3)
+    sb.seed("symbols", market.symbols)
+    for s in market.symbols:
+        sb.seed("candles", market.candle_rows(s, "1h"))
+    assert len(sb.rpc("candle_freshness", {"p_timeframe": "1h"}).execute().data) == 3
+    fresh = load_candle_freshness(sb, "1h", page_size=3)
+    assert sorted(fresh) == sorted(s["id"] for s in market.symbols)
+    assert {f["count"] for f in fresh.values()} == {len(market.candles("SYN0000", "1h"))}
+    assert sb.requests["rpc/candle_freshness"] == 1 + 3
+
+
+def test_execution_and_risk_against_fake():
+    market = SyntheticMarket(1, days=5, end_ns=_END)
+    sb = FakeSupabase()
+    sym = market.symbols[0]
+    sb.seed("symbols", [sym])
+    sb.seed("candles", market.candle_rows(sym, "15m"))
+    restore = install_fake_client(sb)
+    try:
+        fill = execution.simulate_order(sym["id"], "BUY", "MARKET", 10, timeframe="15m")
+        execution.apply_trade_updates(sym["id"], "BUY", fill.fill_price, 10)
+        execution.apply_trade_updates(sym["id"], "SELL", fill.fill_price + 5, 4)
+        snapshot = risk_engine.portfolio_snapshot()
+    finally:
+        restore()
+    assert fill.status == "FILLED" and fill.fill_price > 0
+    pos = sb.rows("positions")
+    assert len(pos) == 1 and pos[0]["qty"] == 6 and round(pos[0]["realized_pnl"], 6) == 20
+    assert snapshot["equity"] == 1000000.0 and snapshot["exposure"] > 0
+
+
+def test_synthetic_market_through_stub_yahoo():
+    times = session_times(7, _END)
+    assert len(times) == 5 * 75
+    # At 05:00 UTC (10:30 IST) Friday's session has opened 16 bars
+    assert len(session_times(7, pd.Timestamp("2025-03-07 05:00", tz="UTC").value)) == 4 * 75 + 16
+    a, b = generate_candles(times, seed=3), generate_candles(times, seed=3)
+    assert a.equals(b)
+    assert (a["high"] >= a[["open", "close"]].max(axis=1)).all() and (a["low"] <= a[["open", "close"]].min(axis=1)).all()
+
+    # Ends now: the Yahoo client asks for bars relative to the current time
+    market = SyntheticMarket(2, days=7)
+    pd.testing.assert_frame_equal(market.candles("SYN0001", "1h"), resample_candles(market.candles("SYN0001"), "1h"))
+    client = yahoo_http.YahooHttpClient(rate_per_sec=0, max_retries=0)
+    client.session = StubYahooSession(market)
+    old_client = yahoo_client.get_yahoo_http
+    yahoo_client.get_yahoo_http = lambda: client
+    try:
+        df = yahoo_client.fetch_yahoo_candles_df("SYN0001", "NSE", "15m", lookback_days=10000)
+        missing = yahoo_client.fetch_yahoo_candles_df("NOPE", "NSE", "15m")
+        price = yahoo_client.fetch_real_time_quotes(["SYN0000"])["SYN0000"]
+    finally:
+        yahoo_client.get_yahoo_http = old_client
+    expected = market.candles("SYN0001", "15m")
+    assert len(df) == len(expected) and df["close"].tolist() == expected["close"].tolist()
+    assert missing.empty and price == market.candles("SYN0000")["close"].iloc[-1]
+    assert client.session.requests == 3
+
+
+if __name__ == "__main__":
+    test_queries_and_rpcs()
+    test_freshness_paged_past_row_cap()
+    test_execution_and_risk_against_fake()
+    test_synthetic_market_through_stub_yahoo()
+    print("✅ Offline benchmark fixture checks passed")
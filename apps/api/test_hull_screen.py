@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Parity and caching checks for the vectorized Hull suitability screen
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api.strategies.hull_screen import (HULL_SCREEN_COLUMNS, HullScreenCache, hull_characteristics_panel,
+                                             trading_day)
+from apps.api.strategies.indicators import ensure_indicators
+from apps.api.test_streaming_indicators import _candles
+
+
+def _loop_characteristics(df: pd.DataFrame) -> dict:
+    # The original per-bar screen
+    slopes = [df['hma55'].iloc[i] - df['hma55'].iloc[i - 2] for i in range(2, len(df))]
+    flips = sum(1 for i in range(1, len(slopes)) if slopes[i] * slopes[i - 1] < 0)
+    return {
+        'avg_adx': df['adx14'].mean(),
+        'trend_consistency': (df['adx14'] > 25).mean(),
+        'volatility_regime': df['bb_width'].mean(),
+        'hma_slope_freq': flips / len(slopes),
+    }
+
+
+def test_panel_matches_per_symbol_loop():
+    frames = [ensure_indicators(_candles(n, seed=s), HULL_SCREEN_COLUMNS) for s, n in enumerate((200, 260, 420, 233))]
+    panel = hull_characteristics_panel(frames)
+    for i, df in enumerate(frames):
+        for name, value in _loop_characteristics(df).items():
+            assert abs(value - panel[name][i]) < 1e-12, (i, name)
+
+
+def test_cached_per_symbol_timeframe_and_day():
+    cache = HullScreenCache()
+    df = _candles(300, seed=4)
+    short = _candles(150, seed=5)
+    first = cache.screen({'a': df, 'b': short}, '15m')
+    assert set(first) == {'a'} and cache.stats == {'hits': 0, 'computed': 1}
+    assert cache.screen({'a': df}, '15m')['a'] is first['a'] and cache.stats['hits'] == 1
+    cache.screen({'a': df}, '5m')
+    assert cache.stats['computed'] == 2
+    # A new session recomputes
+    later = df.copy()
+    later['ts'] = later['ts'] + pd.Timedelta(days=1)
+    assert trading_day(later) != trading_day(df)
+    cache.screen({'a': later}, '15m')
+    assert cache.stats['computed'] == 3
+
+
+if __name__ == "__main__":
+    test_panel_matches_per_symbol_loop()
+    test_cached_per_symbol_timeframe_and_day()
+    print("✅ Hull screen checks passed")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Indicator registry: lazy resolution, shared intermediates and reuse of recorded columns
+"""
+import os
+import sys
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api.strategies.indicators import (
+    INDICATORS, CORE_COLUMNS, add_core_indicators, ensure_indicators, required_warmup, resolve_indicators,
+)
+from apps.api.test_streaming_indicators import _candles
+
+
+def _counting(name: str, calls: dict):
+    spec = INDICATORS[name]
+
+    def fn(*args, **kwargs):
+        calls[name] = calls.get(name, 0) + 1
+        return spec.fn(*args, **kwargs)
+    INDICATORS[name] = replace(spec, fn=fn)
+    return spec
+
+
+def test_only_requested_columns_are_added():
+    df = _candles(300)
+    out = ensure_indicators(df, ["hma55", "atr14"])
+    assert list(out.columns) == list(df.columns) + ["hma55", "atr14"]
+    np.testing.assert_allclose(out["atr14"], ta.atr(df["high"], df["low"], df["close"], length=14), equal_nan=True)
+    hma = ta.wma(2 * ta.wma(df["close"], length=27) - ta.wma(df["close"], length=55), length=7)
+    np.testing.assert_allclose(out["hma55"], hma, equal_nan=True)
+    assert list(add_core_indicators(df).columns) == list(df.columns) + list(CORE_COLUMNS)
+
+
+def test_shared_intermediate_computed_once():
+    calls = {}
+    original = _counting("_macd", calls)
+    try:
+        out = ensure_indicators(_candles(300), ["macd", "macd_signal", "macd_hist"])
+    finally:
+        INDICATORS["_macd"] = original
+    assert calls == {"_macd": 1}
+    np.testing.assert_allclose(out["macd_hist"], out["macd"] - out["macd_signal"], equal_nan=True)
+
+
+def test_recorded_columns_are_reused():
+    calls = {}
+    original = _counting("rsi14", calls)
+    try:
+        out = ensure_indicators(_candles(300), ["rsi14"])
+        # Row slices keep the record, so nothing is recomputed on them either
+        again = ensure_indicators(out.iloc[:200], ["rsi14", "ema20"])
+    finally:
+        INDICATORS["rsi14"] = original
+    assert calls == {"rsi14": 1}
+    assert "ema20" in again.columns
+    assert set(again.attrs["indicators"]) == {"rsi14", "ema20"}
+
+
+def test_repeat_request_is_free():
+    out = ensure_indicators(_candles(300), ["jaw", "teeth", "lips", "sma200"])
+    assert ensure_indicators(out, ["lips", "jaw"]) is out
+    # Row access shares the (immutable) record instead of deep-copying it
+    assert out.iloc[5:].attrs["indicators"] is out.attrs["indicators"]
+
+
+def test_resolution_order_and_warmup():
+    order = resolve_indicators(["bb_width", "macd_signal"])
+    assert order.index("_bbands") < order.index("bb_width")
+    assert order.index("_macd") < order.index("macd_signal")
+    assert required_warmup(["hma55", "atr14"]) == INDICATORS["hma55"].warmup
+    try:
+        ensure_indicators(_candles(50), ["nope"])
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("unknown indicator accepted")
+
+
+if __name__ == "__main__":
+    test_only_requested_columns_are_added()
+    test_shared_intermediate_computed_once()
+    test_recorded_columns_are_reused()
+    test_repeat_request_is_free()
+    test_resolution_order_and_warmup()
+    print("✅ Indicator registry checks passed")
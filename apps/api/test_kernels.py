@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Parity checks: recursive-filter kernels vs pandas / pandas_ta
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api.strategies import kernels
+from apps.api.test_streaming_indicators import _candles
+
+
+def _same(a, b, name: str):
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(pd.to_numeric(pd.Series(b), errors="coerce"), dtype=float)
+    assert np.array_equal(np.isnan(a), np.isnan(b)), name
+    np.testing.assert_allclose(a, b, rtol=1e-10, atol=1e-10, equal_nan=True, err_msg=name)
+
+
+def test_kernels_match_pandas_ta():
+    close = _candles(500, seed=11)["close"]
+    _same(kernels.ema(close, 20), ta.ema(close, length=20), "ema")
+    _same(kernels.rma(close, 14), ta.rma(close, length=14), "rma")
+    _same(kernels.wma(close, 27), ta.wma(close, length=27), "wma")
+    _same(kernels.sma(close, 20), close.rolling(20).mean(), "sma")
+    _same(kernels.hma(close, 55), ta.wma(2 * ta.wma(close, length=27) - ta.wma(close, length=55), length=7), "hma")
+    seeded = pd.Series(np.nan, index=close.index)
+    seeded.iloc[12] = close.iloc[:13].mean()
+    seeded.iloc[13:] = close.iloc[13:]
+    _same(kernels.smma(close, 13), seeded.ewm(alpha=1 / 13, adjust=False).mean(), "smma")
+
+
+def test_ewm_keeps_pandas_gap_semantics():
+    x = _candles(300, seed=12)["close"].copy()
+    x.iloc[:7] = np.nan           # late start
+    x.iloc[120:135] = np.nan      # interior gap (per-bar path)
+    x.iloc[-5:] = np.nan          # trailing gap (carried forward)
+    _same(kernels.ewm(x, 0.1), x.ewm(alpha=0.1, adjust=False).mean(), "ewm gaps")
+    _same(kernels.sma(x, 10), x.rolling(10).mean(), "sma gaps")
+
+
+def test_batch_rows_match_single_rows():
+    rows = np.vstack([_candles(400, seed=s)["close"].to_numpy() for s in range(4)])
+    rows[1, :50] = np.nan
+    rows[2, -30:] = np.nan
+    rows[3, 200:210] = np.nan
+    for fn, arg in ((kernels.ewm, 0.2), (kernels.ema, 20), (kernels.smma, 14), (kernels.wma, 9), (kernels.hma, 55)):
+        batch = fn(rows, arg)
+        assert batch.shape == rows.shape
+        for i in range(len(rows)):
+            _same(batch[i], fn(rows[i], arg), f"{fn.__name__} row {i}")
+
+
+def test_streaming_states_match_batch():
+    close = _candles(400, seed=13)["close"].to_numpy()
+    ema = kernels.SeededState(20)
+    smma = kernels.SeededState(14, alpha=1.0 / 14)
+    hma = kernels.HmaState(55)
+    _same([ema.update(v) for v in close], kernels.ema(close, 20), "ema state")
+    _same([smma.update(v) for v in close], kernels.smma(close, 14), "smma state")
+    _same([hma.update(v) for v in close], kernels.hma(close, 55), "hma state")
+    ewm = kernels.EwmState(0.1)
+    chunks = np.concatenate([ewm.extend(close[:150]), ewm.extend(close[150:])])
+    _same(chunks, kernels.ewm(close, 0.1), "ewm extend")
+
+
+if __name__ == "__main__":
+    test_kernels_match_pandas_ta()
+    test_ewm_keeps_pandas_gap_semantics()
+    test_batch_rows_match_single_rows()
+    test_streaming_states_match_batch()
+    print("✅ Kernels match pandas / pandas_ta")
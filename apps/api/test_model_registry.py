@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Checks for the cached model registry: TTL version checks, publish and default model
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api.model_weights import DEFAULT_MODEL, ModelRegistry
+
+
+class _Query:
+    def __init__(self, sb):
+        self.sb, self.cols, self.row = sb, None, None
+
+    def __getattr__(self, _):
+        return lambda *a, **k: self
+
+    def select(self, cols):
+        self.cols = cols
+        return self
+
+    def insert(self, row):
+        self.row = row
+        return self
+
+    def execute(self):
+        if self.row is not None:
+            self.sb.rows.append({'id': f"m{len(self.sb.rows)}", **self.row})
+            self.sb.calls.append('insert')
+            data = [self.sb.rows[-1]]
+        else:
+            self.sb.calls.append(self.cols)
+            data = self.sb.rows[-1:]
+            if self.cols == 'id':
+                data = [{'id': r['id']} for r in data]
+        return type('Res', (), {'data': data})()
+
+
+class _FakeSB:
+    def __init__(self, rows=None):
+        self.rows = list(rows or [])
+        self.calls = []
+
+    def table(self, name):
+        assert name == 'ai_models'
+        return _Query(self)
+
+
+def test_cached_within_ttl_and_version_checked_after():
+    sb = _FakeSB([{'id': 'm0', 'version': 'rl-1', 'params': {'weights': {'hull_suite': 1.0}}}])
+    reg = ModelRegistry(ttl=60)
+    seen = []
+    reg.on_change(lambda row: seen.append(row['id']))
+    assert reg.weights({'x': 1}, sb=sb) == {'hull_suite': 1.0}
+    assert reg.active_model_id(sb) == 'm0' and sb.calls == ['*']
+    # Expired but unchanged: one id-only check, row kept
+    reg._checked_at -= 120
+    assert reg.active_model_id(sb) == 'm0' and sb.calls == ['*', 'id']
+    # Expired and a newer model exists: reload and notify
+    sb.rows.append({'id': 'm1', 'version': 'rl-2', 'params': {}})
+    reg._checked_at -= 120
+    assert reg.weights({'x': 1}, sb=sb) == {'x': 1}
+    assert sb.calls == ['*', 'id', 'id', '*'] and seen == ['m0', 'm1']
+
+
+def test_publish_and_default_model():
+    sb = _FakeSB()
+    reg = ModelRegistry(ttl=60)
+    assert reg.active_model_id(sb) == 'm0' and sb.rows[0]['version'] == DEFAULT_MODEL['version']
+    assert reg.active_model_id(sb) == 'm0' and sb.calls.count('insert') == 1
+    reg.publish({'id': 'm9', 'version': 'rl-9', 'params': {'weights': {'a': 2.0}}})
+    n = len(sb.calls)
+    assert reg.active_model_id(sb) == 'm9' and reg.weights(sb=sb) == {'a': 2.0}
+    assert len(sb.calls) == n
+
+
+if __name__ == "__main__":
+    test_cached_within_ttl_and_version_checked_after()
+    test_publish_and_default_model()
+    print("✅ Model registry checks passed")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Parity checks: panel (multi-symbol) indicators vs add_core_indicators per symbol
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api.strategies.indicators import add_core_indicators
+from apps.api.strategies.panel import annotate_panel, panel_indicators, PANEL_COLUMNS
+from apps.api.test_streaming_indicators import _candles
+
+
+def _hma55(close: pd.Series) -> pd.Series:
+    # Same formula as ml/backtest.add_indicators
+    return ta.wma(2 * ta.wma(close, length=27) - ta.wma(close, length=55), length=7)
+
+
+def _universe() -> dict:
+    # Ragged: different history lengths, late listings and a symbol with gaps
+    return {
+        "AAA": _candles(600, seed=1),
+        "BBB": _candles(600, seed=2).iloc[250:].reset_index(drop=True),
+        "CCC": _candles(420, seed=3),
+        "DDD": _candles(600, seed=4).drop(index=range(100, 140)).reset_index(drop=True),
+    }
+
+
+def test_panel_matches_per_symbol_indicators():
+    frames = _universe()
+    out = annotate_panel(frames)
+    assert set(out) == set(frames)
+    for key, df in frames.items():
+        ref = add_core_indicators(df)
+        ref["hma55"] = _hma55(ref["close"])
+        got = out[key]
+        assert len(got) == len(ref)
+        for col in PANEL_COLUMNS:
+            a = got[col].to_numpy(dtype=float)
+            b = ref[col].to_numpy(dtype=float)
+            assert np.array_equal(np.isnan(a), np.isnan(b)), (key, col)
+            np.testing.assert_allclose(a, b, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=f"{key} {col}")
+
+
+def test_panel_masks_missing_bars():
+    df = _candles(200, seed=5)
+    ts = df["ts"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    close = np.vstack([df["close"].to_numpy(), df["close"].to_numpy()])
+    close[1, :50] = np.nan
+    high = np.vstack([df["high"].to_numpy()] * 2)
+    low = np.vstack([df["low"].to_numpy()] * 2)
+    vol = np.vstack([df["volume"].to_numpy()] * 2)
+    res = panel_indicators(high, low, close, vol, ts, columns=("ema20", "rsi14"))
+    assert np.isnan(res["ema20"][1, :50 + 19]).all()
+    full = add_core_indicators(df)
+    np.testing.assert_allclose(res["ema20"][0], full["ema20"].to_numpy(dtype=float), rtol=1e-9, equal_nan=True)
+    ref = add_core_indicators(df.iloc[50:].reset_index(drop=True))
+    np.testing.assert_allclose(res["rsi14"][1, 50:], ref["rsi14"].to_numpy(dtype=float), rtol=1e-9, equal_nan=True)
+
+
+if __name__ == "__main__":
+    test_panel_matches_per_symbol_indicators()
+    test_panel_masks_missing_bars()
+    print("✅ Panel indicators match add_core_indicators")
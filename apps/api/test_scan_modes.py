@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Checks that the scan modes agree: pipelined and panel scans write the same signals and decisions as the serial scan
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+import apps.api.yahoo_http as yahoo_http
+from apps.api import clock, scanner
+from apps.api.fake_supabase import FakeSupabase, install_fake_client
+from apps.api.synthetic_market import StubYahooSession, SyntheticMarket
+
+# Friday 11:30 IST, inside the session
+_NOW = pd.Timestamp("2025-03-07 06:00", tz="UTC")
+_MARKET = SyntheticMarket(12, days=30, end_ns=_NOW.value)
+
+
+class _RecordingWriter(scanner.ScanWriter):
+    """ScanWriter that also keeps every symbol result handed to it"""
+    results = []
+
+    def add(self, result: dict) -> int:
+        _RecordingWriter.results.append(result)
+        return super().add(result)
+
+
+def _scan(**kwargs):
+    """Scan a freshly seeded universe.
+
+    Returns the run result, each symbol's result as queued for writing, and
+    the written signals and decisions (ids and timestamps left out).
+    """
+    sb = FakeSupabase()
+    sb.seed("symbols", _MARKET.symbols)
+    for s in _MARKET.symbols:
+        sb.seed("candles", _MARKET.candle_rows(s, "15m"))
+    client = yahoo_http.YahooHttpClient(rate_per_sec=0, max_retries=0)
+    client.session = StubYahooSession(_MARKET)
+    old_client, old_writer = yahoo_http._CLIENT, scanner.ScanWriter
+    yahoo_http._CLIENT, scanner.ScanWriter = client, _RecordingWriter
+    _RecordingWriter.results = []
+    restore = install_fake_client(sb)
+    clock.pin(_NOW.to_pydatetime())
+    try:
+        result = scanner.scan_once("15m", max_symbols=len(_MARKET.symbols), incremental=False, **kwargs)
+    finally:
+        yahoo_http._CLIENT, scanner.ScanWriter = old_client, old_writer
+        restore()
+        clock.pin(None)
+    volatile = ("id", "ts", "created_at")
+    queued = {
+        r["ticker"]: {**{k: v for k, v in r.items() if k not in ("seconds", "signal_rows")},
+                      "signal_rows": [{k: v for k, v in row.items() if k not in volatile} for row in r["signal_rows"]]}
+        for r in _RecordingWriter.results
+    }
+    signals = {r["id"]: {k: v for k, v in r.items() if k not in volatile} for r in sb.rows("signals")}
+    key = lambda r: (r["symbol_id"], r["strategy"], r["action"], r["confidence"])
+    decisions = [
+        {**{k: v for k, v in d.items() if k not in volatile + ("signal_id",)},
+         "signal": key(signals[d["signal_id"]]) if d.get("signal_id") else None}
+        for d in sb.rows("ai_decisions")
+    ]
+    return result, queued, sorted(signals.values(), key=key), sorted(decisions, key=lambda d: d["rationale"])
+
+
+def test_pipelined_matches_serial():
+    serial, queued, signals, decisions = _scan(pipelined=False, panel=False)
+    assert serial["evaluated"] == len(_MARKET.symbols) and serial["signals"] > 0 and len(decisions) == len(queued)
+    for cpu_workers in (0, 2):
+        result, p_queued, p_signals, p_decisions = _scan(pipelined=True, panel=False, io_workers=4, cpu_workers=cpu_workers)
+        assert result["signals"] == serial["signals"] and result["evaluated"] == serial["evaluated"]
+        assert p_queued == queued and p_signals == signals and p_decisions == decisions
+
+
+def test_panel_matches_serial():
+    serial, queued, signals, decisions = _scan(pipelined=False, panel=False)
+    result, p_queued, p_signals, p_decisions = _scan(pipelined=False, panel=True, io_workers=4)
+    assert result["signals"] == serial["signals"] > 0 and result["evaluated"] == serial["evaluated"]
+    assert p_queued == queued and p_signals == signals and p_decisions == decisions
+
+
+if __name__ == "__main__":
+    test_pipelined_matches_serial()
+    test_panel_matches_serial()
+    print("✅ Scan mode parity checks passed")
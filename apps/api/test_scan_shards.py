@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Checks for sharded scanning: deterministic partitions and merging shard runs
+"""
+import os
+import sys
+import uuid
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+import apps.api.yahoo_http as yahoo_http
+from apps.api import scan_shards, scanner, supabase_client
+from apps.api.scanner import shard_of
+
+
+class _Query:
+    def __init__(self, sb):
+        self.sb, self.op, self.payload, self.ids = sb, None, None, None
+
+    def __getattr__(self, _):
+        return lambda *a, **k: self
+
+    def insert(self, row):
+        self.op, self.payload = "insert", row
+        return self
+
+    def update(self, row):
+        self.op, self.payload = "update", row
+        return self
+
+    def in_(self, col, ids):
+        self.ids = ids
+        return self
+
+    def eq(self, col, value):
+        self.ids = [value]
+        return self
+
+    def execute(self):
+        if self.op == "insert":
+            row = {"id": str(uuid.uuid4()), **self.payload}
+            self.sb.runs[row["id"]] = row
+            return type('Res', (), {'data': [row]})()
+        if self.op == "update":
+            self.sb.runs[self.ids[0]].update(self.payload)
+            return type('Res', (), {'data': []})()
+        return type('Res', (), {'data': [self.sb.runs[i] for i in self.ids]})()
+
+
+class _FakeSB:
+    def __init__(self):
+        self.runs = {}
+
+    def table(self, name):
+        return _Query(self)
+
+
+def test_shards_partition_deterministically():
+    ids = [str(uuid.UUID(int=i)) for i in range(500)]
+    parts = [[i for i in ids if shard_of(i, 4) == k] for k in range(4)]
+    assert sorted(sum(parts, [])) == sorted(ids)
+    assert all(len(p) > 60 for p in parts)
+    assert [shard_of(i, 4) for i in ids] == [shard_of(i, 4) for i in ids]
+
+
+def test_coordinator_merges_shard_runs():
+    sb = _FakeSB()
+    calls = []
+
+    def fake_scan(mode, shard=None, shards=1, parent_run_id=None, **kwargs):
+        calls.append((shard, shards, kwargs))
+        if shard == 2:
+            raise RuntimeError("worker lost")
+        run = sb.table("strategy_runs").insert({"mode": mode}).execute().data[0]
+        meta = {"shard": shard, "shards": shards, "parent_run_id": parent_run_id, "evaluated": 3, "skipped": 1}
+        sb.table("strategy_runs").update({"symbols_scanned": 4, "signals_generated": shard, "metadata": str(meta)}).eq("id", run["id"]).execute()
+        return {"run_id": run["id"]}
+
+    old_client, old_scan = scan_shards.get_client, scanner.scan_once
+    scan_shards.get_client, scanner.scan_once = (lambda: sb), fake_scan
+    try:
+        result = scan_shards.scan_sharded("15m", 3, in_process=True, force=True)
+    finally:
+        scan_shards.get_client, scanner.scan_once = old_client, old_scan
+    assert [c[:2] for c in calls] == [(0, 3), (1, 3), (2, 3)] and calls[0][2] == {"force": True}
+    assert result["symbols_scanned"] == 8 and result["signals"] == 1
+    assert result["failed_shards"] == [2] and result["evaluated"] == 6 and result["skipped"] == 2
+    parent = sb.runs[result["run_id"]]
+    assert parent["symbols_scanned"] == 8 and "completed_at" in parent and len(result["shard_runs"]) == 2
+
+
+def _child_shard(mode, shard, shards, parent_run_id, kwargs):
+    # Runs in the shard worker; a worker that inherited the coordinator's connections reports a run that does not exist
+    if shard == 1:
+        raise RuntimeError("worker lost")
+    inherited = bool(supabase_client._CLIENTS) or yahoo_http._CLIENT is not None
+    return {"run_id": f"{'inherited' if inherited else 'run'}-{shard}"}
+
+
+def test_coordinator_process_pool():
+    sb = _FakeSB()
+    for shard in (0, 2):
+        meta = {"shard": shard, "shards": 3, "evaluated": 2, "skipped": 0}
+        sb.runs[f"run-{shard}"] = {"id": f"run-{shard}", "symbols_scanned": 5, "signals_generated": 1, "metadata": str(meta)}
+    old = (scan_shards.get_client, scan_shards._run_shard, dict(supabase_client._CLIENTS), yahoo_http._CLIENT)
+    scan_shards.get_client, scan_shards._run_shard = (lambda: sb), _child_shard
+    # Pooled connections in the coordinator must not reach the workers
+    supabase_client._CLIENTS[("http://coordinator", "key")] = object()
+    yahoo_http._CLIENT = yahoo_http.YahooHttpClient(rate_per_sec=0)
+    try:
+        result = scan_shards.scan_sharded("15m", 3)
+        pools = sorted(scan_shards._POOLS)
+    finally:
+        scan_shards.get_client, scan_shards._run_shard = old[0], old[1]
+        supabase_client._CLIENTS.clear()
+        supabase_client._CLIENTS.update(old[2])
+        yahoo_http._CLIENT = old[3]
+        for pool in scan_shards._POOLS.values():
+            pool.shutdown()
+        scan_shards._POOLS.clear()
+    assert result["shard_runs"] == ["run-0", "run-2"] and result["failed_shards"] == [1]
+    assert result["symbols_scanned"] == 10 and result["signals"] == 2 and result["evaluated"] == 4
+    # The failed shard's worker is dropped; the others are kept for the next run
+    assert pools == [(0, 3), (2, 3)]
+
+if __name__ == "__main__":
+    test_shards_partition_deterministically()
+    test_coordinator_merges_shard_runs()
+    test_coordinator_process_pool()
+    print("✅ Sharded scan checks passed")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Checks for dirty-set scanning: closed-bar detection and the evaluated-bar tracker
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+import apps.api.yahoo_http as yahoo_http
+from apps.api import clock, scanner
+from apps.api.candle_resample import latest_closed_bar_ns
+from apps.api.fake_supabase import FakeSupabase, install_fake_client
+from apps.api.scan_state import EvaluatedBars, get_evaluated_bars
+from apps.api.synthetic_market import StubYahooSession, SyntheticMarket
+
+
+def _ns(ts: str) -> int:
+    return pd.Timestamp(ts, tz="UTC").value
+
+
+def test_latest_closed_bar():
+    # 15m bars 09:15..10:00 IST; at 10:10 IST the 10:00 bar is still forming
+    df = pd.DataFrame({"ts": pd.date_range("2025-01-06 03:45", periods=4, freq="15min", tz="UTC")})
+    assert latest_closed_bar_ns(df, "15m", _ns("2025-01-06 04:40")) == _ns("2025-01-06 04:15")
+    assert latest_closed_bar_ns(df, "15m", _ns("2025-01-06 04:45")) == _ns("2025-01-06 04:30")
+    assert latest_closed_bar_ns(df, "15m", _ns("2025-01-06 03:50")) is None
+    # The 15:15 IST hourly bar closes with the session at 15:30, not at 16:15
+    hourly = pd.DataFrame({"ts": [pd.Timestamp("2025-01-06 09:45", tz="UTC")]})
+    assert latest_closed_bar_ns(hourly, "1h", _ns("2025-01-06 10:00")) == _ns("2025-01-06 09:45")
+    daily = pd.DataFrame({"ts": [pd.Timestamp("2025-01-06 03:45", tz="UTC")]})
+    assert latest_closed_bar_ns(daily, "1d", _ns("2025-01-06 09:00")) is None
+    assert latest_closed_bar_ns(daily, "1d", _ns("2025-01-06 10:00")) == _ns("2025-01-06 03:45")
+
+
+def test_dirty_only_on_new_bar_or_strategy_change():
+    bars = EvaluatedBars()
+    key = ("sym", "15m")
+    assert bars.is_dirty(key, 100, ("hull_suite",))
+    bars.mark(key, 100, ("hull_suite",))
+    assert not bars.is_dirty(key, 100, ("hull_suite",))
+    assert bars.is_dirty(key, 200, ("hull_suite",))
+    assert bars.is_dirty(key, 100, ("hull_suite", "macd_trend"))
+    assert bars.is_dirty(("sym", "5m"), 100, ("hull_suite",))
+    assert bars.is_dirty(key, None, ("hull_suite",))
+    bars.forget(key)
+    assert bars.is_dirty(key, 100, ("hull_suite",))
+
+
+def test_failed_evaluation_is_retried_next_scan():
+    # Friday 11:30 IST, inside the session
+    now = pd.Timestamp("2025-03-07 06:00", tz="UTC")
+    market = SyntheticMarket(3, days=10, end_ns=now.value)
+    sb = FakeSupabase()
+    sb.seed("symbols", market.symbols)
+    for s in market.symbols:
+        sb.seed("candles", market.candle_rows(s, "15m"))
+    client = yahoo_http.YahooHttpClient(rate_per_sec=0, max_retries=0)
+    client.session = StubYahooSession(market)
+    evaluate, old_client = scanner._evaluate_symbol, yahoo_http._CLIENT
+    failing = {market.symbols[1]["id"]}
+
+    def flaky(sid, *args, **kwargs):
+        if sid in failing:
+            failing.discard(sid)
+            raise RuntimeError("transient")
+        return evaluate(sid, *args, **kwargs)
+
+    scanner._evaluate_symbol, yahoo_http._CLIENT = flaky, client
+    restore = install_fake_client(sb)
+    clock.pin(now.to_pydatetime())
+    get_evaluated_bars().forget()
+    try:
+        try:
+            scanner.scan_once("15m", max_symbols=3, pipelined=False, panel=False, incremental=True)
+            raise AssertionError("evaluation error swallowed")
+        except RuntimeError as e:
+            assert str(e) == "transient"
+        second = scanner.scan_once("15m", max_symbols=3, pipelined=False, panel=False, incremental=True)
+    finally:
+        scanner._evaluate_symbol, yahoo_http._CLIENT = evaluate, old_client
+        restore()
+        clock.pin(None)
+        get_evaluated_bars().forget()
+    # SYN0000 was evaluated before the failure; SYN0001 (failed) and SYN0002 (not reached) are not skipped
+    assert second["evaluated"] == 2 and second["skipped"] == 1
+
+
+if __name__ == "__main__":
+    test_latest_closed_bar()
+    test_dirty_only_on_new_bar_or_strategy_change()
+    test_failed_evaluation_is_retried_next_scan()
+    print("✅ Dirty-set scan checks passed")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Checks for the batched scan writer: chunking, decision->signal links and retries
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api.scan_writer import ScanWriter
+
+
+class _Insert:
+    def __init__(self, sb, table, rows):
+        self.sb, self.table, self.rows = sb, table, rows
+
+    def execute(self):
+        self.sb.requests.append((self.table, len(self.rows)))
+        if self.sb.fail.get(self.table, 0) > 0:
+            self.sb.fail[self.table] -= 1
+            raise RuntimeError('503 Service Unavailable')
+        out = []
+        for row in self.rows:
+            self.sb.seq += 1
+            out.append({'id': f"{self.table}-{self.sb.seq}", **row})
+        self.sb.tables.setdefault(self.table, []).extend(out)
+        return type('Res', (), {'data': out})()
+
+
+class _FakeSB:
+    def __init__(self, fail=None):
+        self.fail = dict(fail or {})
+        self.requests, self.tables, self.seq = [], {}, 0
+
+    def table(self, name):
+        return type('T', (), {'insert': lambda _, rows: _Insert(self, name, rows)})()
+
+
+def _result(sid, decision, signals=()):
+    rows = [{'symbol_id': sid, 'action': a, 'confidence': c} for a, c in signals]
+    return {'symbol_id': sid, 'signal_rows': rows, 'signals_generated': len(rows), 'decision': {'decision': decision, 'weights': '{}', 'rationale': ''}}
+
+
+def test_batches_and_links_decisions():
+    sb = _FakeSB()
+    writer = ScanWriter(sb, 'model-1', batch_size=100)
+    total = writer.add(_result('a', 'ENTER_LONG', [('SELL', 0.9), ('BUY', 0.7), ('BUY', 0.8)]))
+    total += writer.add(_result('b', 'PASS', [('BUY', 0.6)]))
+    total += writer.add(_result('c', 'ENTER_SHORT'))
+    assert sb.requests == [] and total == 4
+    stats = writer.close()
+    assert sb.requests == [('signals', 4), ('ai_decisions', 3)]
+    assert stats['signals'] == 4 and stats['decisions'] == 3 and stats['failed_rows'] == 0
+    links = {d['decision']: d['signal_id'] for d in sb.tables['ai_decisions']}
+    buy_08 = next(s['id'] for s in sb.tables['signals'] if s['symbol_id'] == 'a' and s['confidence'] == 0.8)
+    assert links == {'ENTER_LONG': buy_08, 'PASS': None, 'ENTER_SHORT': None}
+    assert all(d['model_id'] == 'model-1' for d in sb.tables['ai_decisions'])
+
+
+def test_flushes_at_batch_size_and_retries():
+    sb = _FakeSB(fail={'signals': 1})
+    writer = ScanWriter(sb, 'm', batch_size=3, backoff_base=0.0)
+    writer.add(_result('a', 'ENTER_LONG', [('BUY', 0.9), ('BUY', 0.5)]))
+    # Three buffered rows trigger a flush; the first signals insert fails once
+    assert sb.requests == [('signals', 2), ('signals', 2), ('ai_decisions', 1)]
+    assert sb.tables['ai_decisions'][0]['signal_id'] is not None
+    assert writer.close()['retries'] == 1
+
+
+def test_failed_batch_is_retried_on_close():
+    sb = _FakeSB(fail={'ai_decisions': 2})
+    writer = ScanWriter(sb, 'm', batch_size=10, max_retries=1, backoff_base=0.0)
+    writer.add(_result('a', 'PASS'))
+    writer.flush()
+    assert 'ai_decisions' not in sb.tables
+    stats = writer.close()
+    assert len(sb.tables['ai_decisions']) == 1 and stats['decisions'] == 1 and stats['failed_rows'] == 0
+
+
+def test_rows_failing_on_close_name_their_symbols():
+    sb = _FakeSB(fail={'signals': 4})
+    writer = ScanWriter(sb, 'm', batch_size=10, max_retries=1, backoff_base=0.0)
+    writer.add(_result('a', 'ENTER_LONG', [('BUY', 0.9)]))
+    writer.add(_result('b', 'PASS'))
+    stats = writer.close()
+    assert stats['failed_rows'] == 1 and stats['decisions'] == 2
+    assert writer.failed_symbols == {'a'}
+
+
+if __name__ == "__main__":
+    test_batches_and_links_decisions()
+    test_flushes_at_batch_size_and_retries()
+    test_failed_batch_is_retried_on_close()
+    test_rows_failing_on_close_name_their_symbols()
+    print("✅ Scan writer checks passed")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Checks for the bulk sentiment prefetch and the explicit sentiment provider in scoring
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api import sentiment_cache
+from apps.api.sentiment_cache import SentimentProvider, get_sentiment_provider, load_sentiment
+from apps.api.signal_generator import SCORING_COLUMNS, score_signal
+from apps.api.strategies.indicators import ensure_indicators
+from apps.api.test_streaming_indicators import _candles
+
+
+class _Query:
+    def __init__(self, sb, name):
+        self.sb, self.name, self.bounds = sb, name, None
+
+    def __getattr__(self, _):
+        return lambda *a, **k: self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def execute(self):
+        self.sb.calls.append(self.name)
+        if self.name == 'rpc' and not self.sb.has_rpc:
+            raise RuntimeError('function recent_sentiment does not exist')
+        rows = self.sb.data[self.name]
+        if self.bounds:
+            rows = rows[self.bounds[0]:self.bounds[1] + 1]
+        return type('Res', (), {'data': rows})()
+
+
+class _FakeSB:
+    def __init__(self, has_rpc=True):
+        self.has_rpc = has_rpc
+        self.calls = []
+        self.data = {
+            'rpc': [{'ticker': 'AAA', 'exchange': 'NSE', 'score': 0.5}],
+            # newest first, as ordered by the query
+            'sentiment': [{'symbol_id': 'a', 'score': s} for s in (0.9, 0.6, 0.3, -1.0)]
+                         + [{'symbol_id': 'b', 'score': -0.4}],
+            'symbols': [{'id': 'a', 'ticker': 'AAA', 'exchange': 'NSE'}, {'id': 'b', 'ticker': 'BBB', 'exchange': 'NSE'}],
+        }
+
+    def rpc(self, *a, **k):
+        return _Query(self, 'rpc')
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+def test_load_uses_rpc_then_table_fallback():
+    p = load_sentiment(_FakeSB())
+    assert p.bias('AAA', 'NSE') == 0.5 and p.bias('ZZZ', 'NSE') == 0.0
+    p = load_sentiment(_FakeSB(has_rpc=False), lookback=3)
+    assert abs(p.bias('AAA', 'NSE') - 0.6) < 1e-12
+    assert p.bias('BBB', 'NSE') == -0.4
+
+
+def test_provider_is_cached_until_ttl():
+    sentiment_cache._PROVIDER = None
+    sb = _FakeSB()
+    a = get_sentiment_provider(sb, ttl=60)
+    b = get_sentiment_provider(sb, ttl=60)
+    assert a is b and sb.calls == ['rpc']
+    a.loaded_at -= 120
+    assert get_sentiment_provider(sb, ttl=60) is not a and sb.calls == ['rpc', 'rpc']
+    sentiment_cache._PROVIDER = None
+
+
+def test_scoring_reads_only_the_provider():
+    df = ensure_indicators(_candles(120, seed=5), SCORING_COLUMNS)
+    ctx = {'ticker': 'AAA', 'exchange': 'NSE'}
+    plain, r0 = score_signal(df, 'BUY', 0.5, ctx)
+    assert 'sentiment' not in r0['contribs']
+    bullish, r1 = score_signal(df, 'BUY', 0.5, ctx, sentiment=SentimentProvider({('AAA', 'NSE'): 0.8}))
+    assert r1['contribs']['sentiment'] == 0.8 * 0.15 and bullish > plain
+    neutral, r2 = score_signal(df, 'BUY', 0.5, ctx, sentiment=SentimentProvider())
+    assert r2['contribs']['sentiment'] == 0.0 and neutral == plain
+
+
+if __name__ == "__main__":
+    test_load_uses_rpc_then_table_fallback()
+    test_provider_is_cached_until_ttl()
+    test_scoring_reads_only_the_provider()
+    print("✅ Sentiment provider checks passed")
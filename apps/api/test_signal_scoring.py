@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Parity checks: batch candidate scoring vs score_signal one signal at a time
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api.signal_generator import CONTRIBUTIONS, SCORING_COLUMNS, score_candidates, score_signal, scoring_panel
+from apps.api.strategies.indicators import ensure_indicators
+from apps.api.test_streaming_indicators import _candles
+
+
+def test_candidates_match_score_signal():
+    # Ragged universe: frames of different lengths share one panel
+    frames = [ensure_indicators(_candles(n, seed=s), SCORING_COLUMNS) for s, n in enumerate((300, 180, 420))]
+    rng = np.random.default_rng(3)
+    rows = rng.integers(0, len(frames), 200)
+    bars = np.array([rng.integers(0, len(frames[r])) for r in rows])
+    actions = np.where(rng.random(200) < 0.5, "BUY", "SELL").astype(object)
+    base = rng.uniform(0.3, 0.9, 200)
+    scores = score_candidates(scoring_panel(frames), rows, bars, actions, base)
+    assert scores.contribs.shape == (200, len(CONTRIBUTIONS))
+    for k in range(200):
+        conf, rationale = score_signal(frames[rows[k]].iloc[:bars[k] + 1], actions[k], base[k])
+        assert abs(conf - scores.confidence[k]) < 1e-12, k
+        assert rationale["regime"] == scores.rationale(k, base[k])["regime"]
+        got = scores.rationale(k, base[k])["contribs"]
+        assert got.keys() == rationale["contribs"].keys(), k
+        for name, value in rationale["contribs"].items():
+            assert abs(value - got[name]) < 1e-12, (k, name)
+
+
+def test_sentiment_is_per_candidate():
+    df = ensure_indicators(_candles(120, seed=9), SCORING_COLUMNS)
+    panel = scoring_panel([df])
+    scores = score_candidates(panel, [0, 0, 0], [119, 119, 119], ["BUY", "BUY", "SELL"], [0.5, 0.5, 0.5], [np.nan, 0.8, 0.8])
+    assert not scores.has_sentiment[0] and "sentiment" not in scores.rationale(0, 0.5)["contribs"]
+    assert scores.rationale(1, 0.5)["contribs"]["sentiment"] == 0.8 * 0.15
+    assert scores.rationale(2, 0.5)["contribs"]["sentiment"] == 0.8 * -0.15
+    assert scores.confidence[1] > scores.confidence[0]
+
+
+if __name__ == "__main__":
+    test_candidates_match_score_signal()
+    test_sentiment_is_per_candidate()
+    print("✅ Batch scoring matches score_signal")
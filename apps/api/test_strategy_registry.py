@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Checks for the strategy registry: declared requirements, selection and run_strategies
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api.strategies.engine import STRATEGIES, run_strategies, select_strategies, strategy_window, hull_suite
+from apps.api.strategies.indicators import INDICATORS, ensure_indicators
+from apps.api.test_streaming_indicators import _candles
+
+
+def test_specs_declare_known_indicators_and_batches():
+    assert {"hull_suite", "mean_reversion", "macd_trend", "alligator"} <= set(STRATEGIES)
+    for spec in STRATEGIES.values():
+        assert all(c in INDICATORS for c in spec.columns), spec.name
+        assert spec.batch is not None, spec.name
+        assert spec.window >= spec.min_bars
+
+
+def test_selection_and_windows():
+    assert [s.name for s in select_strategies()] == ["hull_suite"]
+    assert [s.name for s in select_strategies(["macd_trend", "hull_suite"], timeframe="15m")] == ["macd_trend", "hull_suite"]
+    try:
+        select_strategies(["nope"])
+        assert False, "unknown strategy accepted"
+    except ValueError:
+        pass
+    # hma55 is defined from bar 61 and the Hull Suite compares against 2 bars back
+    assert STRATEGIES["hull_suite"].window == 63
+    assert strategy_window(select_strategies(["hull_suite", "macd_trend"])) == STRATEGIES["macd_trend"].window
+    assert strategy_window([]) == 0
+
+
+def test_declared_window_is_enough():
+    # The latest bar signals the same on the declared window as on the full history
+    df = _candles(600, seed=21)
+    spec = STRATEGIES["hull_suite"]
+    full = ensure_indicators(df, spec.columns)
+    tail = ensure_indicators(df.iloc[-spec.window:].reset_index(drop=True), spec.columns)
+    assert not np.isnan(tail["hma55"].iloc[-1 - spec.lookback])
+    a, b = hull_suite(full), hull_suite(tail)
+    assert (a is None) == (b is None) and (a is None or a.action == b.action)
+    assert [s.strategy for s in run_strategies(full)] == ([a.strategy] if a else [])
+
+
+if __name__ == "__main__":
+    test_specs_declare_known_indicators_and_batches()
+    test_selection_and_windows()
+    test_declared_window_is_enough()
+    print("✅ Strategy registry checks passed")
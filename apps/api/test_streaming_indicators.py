@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Parity checks: streaming indicator engine vs add_core_indicators
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api.strategies.indicators import add_core_indicators
+from apps.api.strategies.streaming import IndicatorStateStore, INDICATOR_COLUMNS
+
+
+def _candles(n: int = 600, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    return pd.DataFrame({
+        "ts": pd.date_range("2025-01-06 03:45", periods=n, freq="15min", tz="UTC"),
+        "open": close * (1 + rng.normal(0, 0.002, n)),
+        "high": close * (1 + rng.uniform(0, 0.01, n)),
+        "low": close * (1 - rng.uniform(0, 0.01, n)),
+        "close": close,
+        "volume": rng.integers(1_000, 100_000, n).astype(float),
+    })
+
+
+def _assert_same(streamed: pd.DataFrame, batch: pd.DataFrame):
+    assert list(streamed.columns) == list(batch.columns)
+    for col in INDICATOR_COLUMNS:
+        a = streamed[col].to_numpy(dtype=float)
+        b = batch[col].to_numpy(dtype=float)
+        assert np.array_equal(np.isnan(a), np.isnan(b)), col
+        np.testing.assert_allclose(a, b, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=col)
+
+
+def test_streaming_matches_batch_full_history():
+    df = _candles()
+    _assert_same(IndicatorStateStore().annotate("SYM", df), add_core_indicators(df))
+
+
+def test_streaming_sliding_window_appends():
+    df = _candles()
+    store = IndicatorStateStore()
+    store.annotate("SYM", df.iloc[:400])
+    for end in range(401, len(df) + 1):
+        out = store.annotate("SYM", df.iloc[max(0, end - 300):end])
+    assert store.stats["rebuilt"] == 1
+    assert store.stats["appended"] == len(df)
+    batch = add_core_indicators(df).iloc[len(df) - 300:].reset_index(drop=True)
+    _assert_same(out, batch)
+
+
+def test_streaming_revised_last_candle():
+    df = _candles()
+    store = IndicatorStateStore()
+    store.annotate("SYM", df)
+    revised = df.copy()
+    revised.loc[revised.index[-1], ["high", "close"]] *= 1.01
+    out = store.annotate("SYM", revised)
+    assert store.stats["rewound"] == 1
+    _assert_same(out, add_core_indicators(revised))
+
+
+if __name__ == "__main__":
+    test_streaming_matches_batch_full_history()
+    test_streaming_sliding_window_appends()
+    test_streaming_revised_last_candle()
+    print("✅ Streaming indicators match add_core_indicators")
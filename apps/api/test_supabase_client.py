@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Checks for the shared Supabase client: one instance per process, thread-safe use, per-table metrics
+"""
+import http.server
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api.supabase_client import _session_verify, get_pooled_client, get_client_metrics
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps([{"id": 1}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_pooled_client_is_shared_and_metered():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}"
+        key = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.test"
+        assert get_pooled_client(url, key) is get_pooled_client(url, key)
+        get_client_metrics(reset=True)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: get_pooled_client(url, key).table("candles").select("id").execute().data, range(24)))
+        assert all(r == [{"id": 1}] for r in results)
+        metrics = get_client_metrics()
+        assert metrics["candles"]["count"] == 24 and metrics["candles"]["errors"] == 0
+        assert metrics["candles"]["avg_ms"] > 0
+        # The pooled session keeps postgrest's HTTP/2 and TLS settings
+        session = get_pooled_client(url, key).postgrest.session
+        assert session._transport._pool._http2 and _session_verify(session)
+    finally:
+        server.shutdown()
+
+
+def test_session_verify_is_read_back():
+    assert _session_verify(httpx.Client()) and not _session_verify(httpx.Client(verify=False))
+
+
+if __name__ == "__main__":
+    test_pooled_client_is_shared_and_metered()
+    test_session_verify_is_read_back()
+    print("✅ Supabase client checks passed")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Checks for the shared Yahoo HTTP client: retries, counters, rate limiting, quotes and candles
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+import json
+
+import apps.api.yahoo_http as yahoo_http
+from apps.api import yahoo_client
+from apps.api.yahoo_http import TokenBucket, YahooHttpClient
+
+
+class _Resp:
+    def __init__(self, status: int, body: bytes = b"{}"):
+        self.status_code = status
+        self.content = body
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        pass
+
+
+class _Session:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return _Resp(self.statuses.pop(0), b"x" * 10)
+
+
+def test_retries_rate_limited_responses():
+    client = YahooHttpClient(rate_per_sec=0, max_retries=3, backoff_base=0.001)
+    client.session = _Session([429, 503, 200])
+    r = client.get("https://example.invalid/chart")
+    assert r.status_code == 200
+    stats = client.stats()
+    assert stats["requests"] == 3 and stats["retries"] == 2 and stats["bytes"] == 30
+
+
+def test_gives_up_after_max_retries():
+    client = YahooHttpClient(rate_per_sec=0, max_retries=1, backoff_base=0.001)
+    client.session = _Session([429, 429, 200])
+    assert client.get("https://example.invalid/chart").status_code == 429
+    assert client.session.calls == 2
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+class _QuoteSession:
+    def __init__(self):
+        self.requested = []
+
+    def get(self, url, params=None, timeout=None):
+        symbols = params["symbols"].split(",")
+        self.requested.append(symbols)
+        result = [{"symbol": sym, "regularMarketPrice": 100.0 + i} for i, sym in enumerate(symbols)]
+        return _Resp(200, json.dumps({"quoteResponse": {"result": result}}).encode())
+
+
+def test_batched_quotes_chunk_and_cache():
+    client = YahooHttpClient(rate_per_sec=0)
+    client.session = _QuoteSession()
+    yahoo_http._CLIENT = client
+    yahoo_client._QUOTE_CACHE.clear()
+    try:
+        tickers = [f"T{i}" for i in range(yahoo_client.QUOTE_CHUNK_SIZE + 5)]
+        prices = yahoo_client.fetch_real_time_quotes(tickers, "NSE")
+        assert len(prices) == len(tickers)
+        assert [len(c) for c in client.session.requested] == [yahoo_client.QUOTE_CHUNK_SIZE, 5]
+        # Repeated lookups inside the TTL are served from the cache
+        assert yahoo_client.fetch_real_time_quote("T1", "NSE") == prices["T1"]
+        assert len(client.session.requested) == 2
+    finally:
+        yahoo_http._CLIENT = None
+        yahoo_client._QUOTE_CACHE.clear()
+
+
+class _ChartSession:
+    def get(self, url, params=None, timeout=None):
+        chart = {"chart": {"result": [{
+            "timestamp": [1736135100, 1736136000],
+            "indicators": {"quote": [{
+                "open": [10.0, None], "high": [11.0, 12.0], "low": [9.5, 10.5],
+                "close": [10.5, 11.5], "volume": [1000, None],
+            }]},
+        }]}}
+        return _Resp(200, json.dumps(chart).encode())
+
+
+def test_columnar_candles_match_list_form():
+    client = YahooHttpClient(rate_per_sec=0)
+    client.session = _ChartSession()
+    yahoo_http._CLIENT = client
+    try:
+        df = yahoo_client.fetch_yahoo_candles_df("T0", "NSE", "15m", 1)
+        assert str(df["close"].dtype) == "float64" and df["ts"].dt.tz is not None
+        listed = yahoo_client.fetch_yahoo_candles("T0", "NSE", "15m", 1)
+        assert listed[0] == {"ts": "2025-01-06T03:45:00+00:00", "open": 10.0, "high": 11.0,
+                             "low": 9.5, "close": 10.5, "volume": 1000.0}
+        assert listed[1]["open"] == 0.0 and listed[1]["volume"] == 0.0
+        rows = yahoo_client.candle_rows(df, "sid", "15m")
+        assert rows[0] == {"symbol_id": "sid", "timeframe": "15m", **listed[0]}
+    finally:
+        yahoo_http._CLIENT = None
+
+
+if __name__ == "__main__":
+    test_retries_rate_limited_responses()
+    test_gives_up_after_max_retries()
+    test_token_bucket_limits_rate()
+    test_batched_quotes_chunk_and_cache()
+    test_columnar_candles_match_list_form()
+    print("✅ Yahoo HTTP client checks passed")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Checks for the Yahoo record/replay transport: archived chart/quote responses replay deterministically
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from apps.api import yahoo_client
+from apps.api.synthetic_market import StubYahooSession, SyntheticMarket
+from apps.api.yahoo_http import YahooHttpClient
+from apps.api.yahoo_replay import ReplaySession, YahooArchive, install_transport
+
+
+def _fetch_with(client, fn, *args, **kwargs):
+    old = yahoo_client.get_yahoo_http
+    yahoo_client.get_yahoo_http = lambda: client
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        yahoo_client.get_yahoo_http = old
+
+
+def test_record_then_replay():
+    root = tempfile.mkdtemp(prefix="yahoo_archive_")
+    try:
+        market = SyntheticMarket(3, days=10)
+        live = YahooHttpClient(rate_per_sec=0, max_retries=0)
+        live.session = StubYahooSession(market)
+        recorder = install_transport(live, "record", root)
+        recorded = _fetch_with(live, yahoo_client.fetch_yahoo_candles_df, "SYN0001", "NSE", "15m", lookback_days=7)
+        _fetch_with(live, yahoo_client.fetch_yahoo_candles_df, "SYN0001", "NSE", "15m", lookback_days=3)
+        yahoo_client._QUOTE_CACHE.clear()
+        quotes = _fetch_with(live, yahoo_client.fetch_real_time_quotes, ["SYN0000", "SYN0002"])
+        assert recorder.recorded == 4
+        archive = YahooArchive(root)
+        assert archive.symbols() == ["SYN0001.NS"] and archive.chart_periods("SYN0001.NS", "15m") == [3, 7]
+
+        offline = YahooHttpClient(rate_per_sec=0, max_retries=0)
+        replay = install_transport(offline, "replay", root)
+        assert isinstance(replay, ReplaySession)
+        replayed = _fetch_with(offline, yahoo_client.fetch_yahoo_candles_df, "SYN0001", "NSE", "15m", lookback_days=7)
+        pd.testing.assert_frame_equal(replayed, recorded)
+        # An unrecorded period is served from the shortest longer recording
+        five = _fetch_with(offline, yahoo_client.fetch_yahoo_candles_df, "SYN0001", "NSE", "15m", lookback_days=5)
+        pd.testing.assert_frame_equal(five, recorded)
+        # Quotes recorded in one request replay per symbol
+        yahoo_client._QUOTE_CACHE.clear()
+        assert _fetch_with(offline, yahoo_client.fetch_real_time_quotes, ["SYN0002"]) == {"SYN0002": quotes["SYN0002"]}
+        missing = _fetch_with(offline, yahoo_client.fetch_yahoo_candles_df, "SYN0000", "NSE", "15m", lookback_days=7)
+        assert missing.empty
+        assert replay.stats == {"hits": 3, "misses": 1}
+        assert offline.stats()["retries"] == 0
+    finally:
+        yahoo_client._QUOTE_CACHE.clear()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_unknown_transport_rejected():
+    try:
+        install_transport(YahooHttpClient(rate_per_sec=0), "cassette")
+    except ValueError:
+        return
+    raise AssertionError("unknown transport accepted")
+
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    test_unknown_transport_rejected()
+    print("✅ Yahoo record/replay checks passed")
@@ -1,8 +1,14 @@
-from datetime import datetime, timedelta, timezone
-from typing import Literal, List, Dict
-import requests
+from typing import Literal, List, Dict, Iterable, Tuple
+import os
+import threading
+import time
 import pandas as pd
 
+from apps.api import clock
+from apps.api.yahoo_http import get_yahoo_http
+
+
+CANDLE_COLUMNS = ("ts", "open", "high", "low", "close", "volume")
 
 TF_TO_YF = {
     '1m': '1m',
@@ -22,23 +28,17 @@ def map_symbol_to_yf(ticker: str, exchange: Literal['NSE','BSE'] = 'NSE') -> str
     return f"{ticker}{suffix}"
 
 
-def get_val(row, *keys):
-    for k in keys:
-        if k in row and not pd.isnull(row[k]):
-            v = row[k]
-            # If it's a Series, get the first value
-            if isinstance(v, pd.Series):
-                v = v.iloc[0]
-            return v
-    return 0.0
-
-
-def fetch_yahoo_candles(
+def fetch_yahoo_candles_df(
     ticker: str,
     exchange: Literal['NSE','BSE'],
     timeframe: str = '1m',
     lookback_days: int = 5
-) -> List[Dict]:
+) -> pd.DataFrame:
+    """Columnar form of fetch_yahoo_candles: ts (UTC datetime64) + float64 OHLCV.
+
+    Missing values are 0.0, as in the list form. Returns an empty frame with
+    the same columns when Yahoo has no data.
+    """
     yf_symbol = map_symbol_to_yf(ticker, exchange)
     interval = TF_TO_YF.get(timeframe, '1d')
 
@@ -47,7 +47,7 @@ def fetch_yahoo_candles(
     url = f"https://query2.finance.yahoo.com/v8/finance/chart/{yf_symbol}"
 
     # Fix: Use period1 and period2 with appropriate limits based on timeframe
-    now = int(datetime.now(timezone.utc).timestamp())
+    now = int(clock.utc_now().timestamp())
 
     # Yahoo Finance limitations for Indian stocks:
     # - 1m: NOT AVAILABLE for NSE/BSE stocks (only US stocks)
@@ -75,16 +75,8 @@ def fetch_yahoo_candles(
         "includePrePost": "false",
         "events": "div,splits",
     }
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        )
-    }
-
     try:
-        r = requests.get(url, headers=headers, params=params, timeout=10)
+        r = get_yahoo_http().get(url, params=params, timeout=10)
         r.raise_for_status()
         data = r.json()
         result = data["chart"]["result"][0]
@@ -93,7 +85,7 @@ def fetch_yahoo_candles(
         indicators = result["indicators"]["quote"][0]
 
         df = pd.DataFrame({
-            "time": pd.to_datetime(timestamps, unit="s", utc=True),
+            "ts": pd.to_datetime(timestamps, unit="s", utc=True),
             "open": indicators.get("open", []),
             "high": indicators.get("high", []),
             "low": indicators.get("low", []),
@@ -107,71 +99,114 @@ def fetch_yahoo_candles(
 
     if df is None or df.empty:
         print(f"❌ No data available for {yf_symbol} from Yahoo API")
+        return _empty_candles()
+
+    df = df.dropna(subset=["ts"]).reset_index(drop=True)
+    for col in CANDLE_COLUMNS[1:]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64").fillna(0.0)
+
+    print(f"Returning {len(df)} candles for {yf_symbol}.")
+    return df
+
+
+def _empty_candles() -> pd.DataFrame:
+    df = pd.DataFrame({c: pd.Series(dtype="float64") for c in CANDLE_COLUMNS})
+    df["ts"] = pd.Series(dtype="datetime64[ns, UTC]")
+    return df
+
+
+def _iso_frame(df: pd.DataFrame) -> pd.DataFrame:
+    out = df[list(CANDLE_COLUMNS)].copy()
+    out["ts"] = out["ts"].dt.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    return out
+
+
+def candle_rows(df: pd.DataFrame, symbol_id: str, timeframe: str) -> List[Dict]:
+    """Upsert rows for the candles table straight from a columnar candle frame"""
+    if df.empty:
         return []
+    out = _iso_frame(df)
+    out.insert(0, "timeframe", timeframe)
+    out.insert(0, "symbol_id", symbol_id)
+    return out.to_dict("records")
 
-    candles: List[Dict] = []
-    for _, row in df.iterrows():
-        ts = row["time"]
-        if not isinstance(ts, datetime):
-            continue
-        candles.append({
-            "ts": ts.isoformat(),
-            "open": float(get_val(row, "open")),
-            "high": float(get_val(row, "high")),
-            "low": float(get_val(row, "low")),
-            "close": float(get_val(row, "close")),
-            "volume": float(get_val(row, "volume")),
-        })
 
-    print(f"Returning {len(candles)} candles for {yf_symbol}.")
-    return candles
+def fetch_yahoo_candles(
+    ticker: str,
+    exchange: Literal['NSE','BSE'],
+    timeframe: str = '1m',
+    lookback_days: int = 5
+) -> List[Dict]:
+    """List-of-dicts form (ISO timestamps) kept for existing callers"""
+    df = fetch_yahoo_candles_df(ticker, exchange, timeframe, lookback_days)
+    if df.empty:
+        return []
+    return _iso_frame(df).to_dict("records")
+
 
-def fetch_real_time_quote(ticker: str, exchange: Literal['NSE','BSE'] = 'NSE') -> float:
-    """Fetch real-time quote for a stock from Yahoo Finance"""
-    yf_symbol = map_symbol_to_yf(ticker, exchange)
+# Symbols per v7 quote request (the endpoint takes a comma-separated list)
+QUOTE_CHUNK_SIZE = 50
+# Seconds a fetched quote is reused within the process
+QUOTE_TTL_SECONDS = float(os.getenv("YAHOO_QUOTE_TTL", "5"))
 
-    print(f"📊 Fetching real-time quote for {yf_symbol}")
+_QUOTE_CACHE: Dict[str, Tuple[float, float]] = {}
+_QUOTE_LOCK = threading.Lock()
 
-    url = f"https://query1.finance.yahoo.com/v7/finance/quote"
 
-    params = {
-        "symbols": yf_symbol
-    }
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        )
-    }
+def _quote_price(quote: Dict) -> float:
+    price = quote.get("regularMarketPrice") or quote.get("preMarketPrice") or quote.get("postMarketPrice")
+    return float(price) if price and price > 0 else 0.0
 
-    try:
-        r = requests.get(url, headers=headers, params=params, timeout=5)
-        r.raise_for_status()
-        data = r.json()
 
-        if "quoteResponse" in data and "result" in data["quoteResponse"] and len(data["quoteResponse"]["result"]) > 0:
-            quote = data["quoteResponse"]["result"][0]
-            price = quote.get("regularMarketPrice") or quote.get("preMarketPrice") or quote.get("postMarketPrice")
+def fetch_real_time_quotes(tickers: Iterable[str], exchange: Literal['NSE','BSE'] = 'NSE') -> Dict[str, float]:
+    """Fetch real-time quotes for many stocks in as few v7 requests as possible.
 
-            if price and price > 0:
-                print(f"✅ Real-time price for {yf_symbol}: ₹{price}")
-                return float(price)
+    Returns {ticker: price}; tickers without a valid quote are omitted. Quotes
+    younger than QUOTE_TTL_SECONDS are served from the in-process cache.
+    """
+    yf_by_ticker = {t: map_symbol_to_yf(t, exchange) for t in dict.fromkeys(tickers)}
+    prices: Dict[str, float] = {}
+    now = time.monotonic()
+    missing: List[str] = []
+    with _QUOTE_LOCK:
+        for ticker, yf_symbol in yf_by_ticker.items():
+            cached = _QUOTE_CACHE.get(yf_symbol)
+            if cached and now - cached[1] < QUOTE_TTL_SECONDS:
+                prices[ticker] = cached[0]
             else:
-                print(f"⚠️ No valid price found in quote for {yf_symbol}")
-                return 0.0
-        else:
-            print(f"❌ No quote data available for {yf_symbol}")
-            return 0.0
-
-    except requests.exceptions.HTTPError as e:
-        if r.status_code == 404:
-            print(f"⚠️ Symbol {yf_symbol} not found on Yahoo Finance (404)")
-            return 0.0
-        else:
-            print(f"❌ HTTP error fetching real-time quote for {yf_symbol}: {e}")
-            return 0.0
-    except Exception as e:
-        print(f"❌ Error fetching real-time quote for {yf_symbol}: {e}")
-        return 0.0
+                missing.append(ticker)
+    if not missing:
+        return prices
+
+    url = "https://query1.finance.yahoo.com/v7/finance/quote"
+    for i in range(0, len(missing), QUOTE_CHUNK_SIZE):
+        chunk = missing[i:i + QUOTE_CHUNK_SIZE]
+        symbols = [yf_by_ticker[t] for t in chunk]
+        print(f"📊 Fetching real-time quotes for {len(symbols)} symbols")
+        try:
+            r = get_yahoo_http().get(url, params={"symbols": ",".join(symbols)}, timeout=5)
+            r.raise_for_status()
+            results = r.json().get("quoteResponse", {}).get("result") or []
+        except Exception as e:
+            print(f"❌ Error fetching real-time quotes for {', '.join(symbols)}: {e}")
+            continue
+
+        by_symbol = {q.get("symbol"): _quote_price(q) for q in results}
+        fetched_at = time.monotonic()
+        with _QUOTE_LOCK:
+            for ticker in chunk:
+                price = by_symbol.get(yf_by_ticker[ticker], 0.0)
+                if price > 0:
+                    prices[ticker] = price
+                    _QUOTE_CACHE[yf_by_ticker[ticker]] = (price, fetched_at)
+                else:
+                    print(f"⚠️ No valid price found in quote for {yf_by_ticker[ticker]}")
+    return prices
+
 
+def fetch_real_time_quote(ticker: str, exchange: Literal['NSE','BSE'] = 'NSE') -> float:
+    """Fetch real-time quote for a stock from Yahoo Finance"""
+    price = fetch_real_time_quotes([ticker], exchange).get(ticker, 0.0)
+    if price > 0:
+        print(f"✅ Real-time price for {map_symbol_to_yf(ticker, exchange)}: ₹{price}")
+    return price
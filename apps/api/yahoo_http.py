@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from apps.api.yahoo_replay import install_transport
+
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Responses worth retrying (rate limited / transient upstream errors)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class YahooHttpClient:
+    """Shared keep-alive session for Yahoo Finance with rate limiting and retries.
+
+    One pooled requests.Session is reused by every caller (scanner threads,
+    API routes, data fetch scripts), so TLS connections stay open between
+    symbols. Each request takes a token from the bucket; 429/5xx responses and
+    connection errors are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, rate_per_sec: float = 5.0, burst: int = 10, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_cap: float = 8.0, pool_size: int = 16):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "retries": 0, "errors": 0, "bytes": 0, "throttled_s": 0.0}
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[key] += amount
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def _backoff(self, attempt: int, retry_after: str | None = None) -> float:
+        if retry_after:
+            try:
+                return min(self.backoff_cap, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter keeps parallel workers from retrying in lockstep
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url: str, params: Dict | None = None, timeout: float = 10) -> requests.Response:
+        """GET with rate limiting and retries; returns the last response (caller checks status)"""
+        attempt = 0
+        while True:
+            self._count("throttled_s", self.bucket.acquire())
+            self._count("requests")
+            try:
+                r = self.session.get(url, params=params, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self._count("errors")
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+            else:
+                self._count("bytes", len(r.content))
+                if r.status_code not in RETRY_STATUS or attempt >= self.max_retries:
+                    return r
+                time.sleep(self._backoff(attempt, r.headers.get("Retry-After")))
+            attempt += 1
+            self._count("retries")
+
+
+_CLIENT: YahooHttpClient | None = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_yahoo_http() -> YahooHttpClient:
+    """Process-wide client, configured from YAHOO_RATE_PER_SEC / YAHOO_BURST / YAHOO_MAX_RETRIES / YAHOO_POOL_SIZE.
+
+    YAHOO_TRANSPORT=record archives every chart/quote response under
+    YAHOO_ARCHIVE; YAHOO_TRANSPORT=replay serves them from there without
+    network access or rate limiting (see yahoo_replay).
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                transport = os.getenv("YAHOO_TRANSPORT", "live").lower()
+                client = YahooHttpClient(
+                    rate_per_sec=0 if transport == "replay" else float(os.getenv("YAHOO_RATE_PER_SEC", "5")),
+                    burst=int(os.getenv("YAHOO_BURST", "10")),
+                    max_retries=int(os.getenv("YAHOO_MAX_RETRIES", "3")),
+                    pool_size=int(os.getenv("YAHOO_POOL_SIZE", "16")),
+                )
+                install_transport(client, transport)
+                _CLIENT = client
+    return _CLIENT
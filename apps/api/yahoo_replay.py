@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, List, Tuple
+from urllib.parse import quote, unquote
+
+import requests
+
+# Transports selectable with YAHOO_TRANSPORT
+TRANSPORTS = ("live", "record", "replay")
+_CHART_PATH = "/v8/finance/chart/"
+_QUOTE_PATH = "/v7/finance/quote"
+_DAY_S = 86400
+
+
+def archive_root(root: str | None = None) -> str:
+    return root or os.getenv("YAHOO_ARCHIVE") or os.path.join(tempfile.gettempdir(), "aitradingapp_yahoo")
+
+
+def period_days(params: Dict | None) -> int:
+    """Length of a chart request's period1..period2 window in whole days"""
+    params = params or {}
+    try:
+        return max(1, round((int(params["period2"]) - int(params["period1"])) / _DAY_S))
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+class YahooArchive:
+    """Gzipped raw Yahoo responses on local disk.
+
+    Chart bodies are keyed by symbol/interval/period (days), e.g.
+    chart/RELIANCE.NS/15m_7d.json.gz; quotes are stored per symbol
+    (quote/RELIANCE.NS.json.gz) so any chunking of a quote request can be
+    replayed. Writes go to a temporary file and are renamed into place.
+    """
+
+    def __init__(self, root: str | None = None):
+        self.root = archive_root(root)
+
+    @staticmethod
+    def _name(symbol: str) -> str:
+        return quote(symbol, safe="")
+
+    def chart_path(self, symbol: str, interval: str, days: int) -> str:
+        return os.path.join(self.root, "chart", self._name(symbol), f"{interval}_{days}d.json.gz")
+
+    def quote_path(self, symbol: str) -> str:
+        return os.path.join(self.root, "quote", f"{self._name(symbol)}.json.gz")
+
+    def write(self, path: str, body: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+
+    def read(self, path: str) -> bytes | None:
+        try:
+            with gzip.open(path, "rb") as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def chart_periods(self, symbol: str, interval: str) -> List[int]:
+        """Recorded periods (days) for a symbol and interval, ascending"""
+        d = os.path.join(self.root, "chart", self._name(symbol))
+        if not os.path.isdir(d):
+            return []
+        pattern = re.compile(rf"^{re.escape(interval)}_(\d+)d\.json\.gz$")
+        return sorted(int(m.group(1)) for m in map(pattern.match, os.listdir(d)) if m)
+
+    def symbols(self) -> List[str]:
+        """Symbols with recorded chart responses"""
+        d = os.path.join(self.root, "chart")
+        return sorted(unquote(name) for name in os.listdir(d)) if os.path.isdir(d) else []
+
+
+class ArchivedResponse:
+    """The parts of requests.Response the Yahoo client reads, for replayed bodies"""
+
+    def __init__(self, status_code: int, content: bytes, url: str):
+        self.status_code = status_code
+        self.content = content
+        self.headers: Dict[str, str] = {}
+        self.url = url
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+def _chart_key(url: str, params: Dict | None) -> Tuple[str, str, int]:
+    params = params or {}
+    return unquote(url.split(_CHART_PATH, 1)[1].split("?")[0]), str(params.get("interval", "1d")), period_days(params)
+
+
+def _quote_symbols(params: Dict | None) -> List[str]:
+    return [s for s in str((params or {}).get("symbols", "")).split(",") if s]
+
+
+class RecordingSession:
+    """Wraps the live session and archives every successful chart/quote response"""
+
+    def __init__(self, inner, archive: YahooArchive):
+        self.inner = inner
+        self.archive = archive
+        self.recorded = 0
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def get(self, url: str, params: Dict | None = None, timeout: float | None = None):
+        r = self.inner.get(url, params=params, timeout=timeout)
+        if r.status_code != 200:
+            return r
+        try:
+            if _CHART_PATH in url:
+                self.archive.write(self.archive.chart_path(*_chart_key(url, params)), r.content)
+                self.recorded += 1
+            elif _QUOTE_PATH in url:
+                for q in json.loads(r.content).get("quoteResponse", {}).get("result") or []:
+                    if q.get("symbol"):
+                        self.archive.write(self.archive.quote_path(q["symbol"]), json.dumps(q).encode())
+                        self.recorded += 1
+        except Exception as e:
+            print(f"⚠️ Could not archive Yahoo response for {url}: {e}")
+        return r
+
+
+class ReplaySession:
+    """Serves archived responses instead of calling Yahoo.
+
+    A chart request is answered from the same symbol/interval and period; if
+    that period was not recorded, the shortest longer one (else the longest)
+    is used. Bodies are returned exactly as recorded, so replays are
+    deterministic whatever the clock. Unrecorded requests get a 404, as
+    Yahoo does for unknown symbols. Decompressed bodies are kept in memory.
+    """
+
+    def __init__(self, archive: YahooArchive):
+        self.archive = archive
+        self.headers: Dict[str, str] = {}
+        self._bodies: Dict[str, bytes | None] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _body(self, path: str) -> bytes | None:
+        with self._lock:
+            if path in self._bodies:
+                return self._bodies[path]
+        body = self.archive.read(path)
+        with self._lock:
+            self._bodies[path] = body
+        return body
+
+    def _chart(self, url: str, params: Dict | None) -> bytes | None:
+        symbol, interval, days = _chart_key(url, params)
+        periods = self.archive.chart_periods(symbol, interval)
+        if not periods:
+            return None
+        longer = [p for p in periods if p >= days]
+        return self._body(self.archive.chart_path(symbol, interval, longer[0] if longer else periods[-1]))
+
+    def _count(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.stats["hits"] += hits
+            self.stats["misses"] += misses
+
+    def _quotes(self, params: Dict | None) -> bytes:
+        symbols = _quote_symbols(params)
+        result = []
+        for symbol in symbols:
+            body = self._body(self.archive.quote_path(symbol))
+            if body is not None:
+                result.append(json.loads(body))
+        self._count(len(result), len(symbols) - len(result))
+        # Like Yahoo, unknown symbols are just absent from the result
+        return json.dumps({"quoteResponse": {"result": result, "error": None}}).encode()
+
+    def get(self, url: str, params: Dict | None = None, timeout: float | None = None) -> ArchivedResponse:
+        if _QUOTE_PATH in url:
+            return ArchivedResponse(200, self._quotes(params), url)
+        body = self._chart(url, params) if _CHART_PATH in url else None
+        self._count(body is not None, body is None)
+        if body is None:
+            return ArchivedResponse(404, b'{"chart": {"result": null, "error": {"code": "Not Found", "description": "Not in archive"}}}', url)
+        return ArchivedResponse(200, body, url)
+
+
+def install_transport(client, mode: str, root: str | None = None):
+    """Swap the client's session for the record/replay transport (mode 'live' leaves it as is)"""
+    if mode not in TRANSPORTS:
+        raise ValueError(f"Unknown Yahoo transport {mode!r}, expected one of {TRANSPORTS}")
+    if mode == "live":
+        return client.session
+    archive = YahooArchive(root)
+    if mode == "record":
+        if isinstance(client.session, RecordingSession):
+            client.session = client.session.inner
+        client.session = RecordingSession(client.session, archive)
+    else:
+        client.session = ReplaySession(archive)
+    print(f"📼 Yahoo transport: {mode} ({archive.root})")
+    return client.session
@@ -148,12 +148,13 @@ export default function Portfolio({ isVisible = true }: { isVisible?: boolean })
         setPricesLoading(true)
         const ad = await getMarketAdapter()
         const kv: Record<string, number> = {}
+        // One batched quote request per refresh instead of one per position
+        const prices = await ad.getLastPrices(Object.values(positions).map(p => ({ ticker: p.ticker, exchange: p.exchange })))
+        // Bail out if component unmounted or tab changed
+        if (!mounted || !isVisible) return
         for (const key of Object.keys(positions)) {
-          // Break if component unmounted or tab changed
-          if (!mounted || !isVisible) return
-
           const p = positions[key]
-          const price = await ad.getLastPrice(p.ticker, p.exchange)
+          const price = prices[`${p.ticker}.${p.exchange}`] ?? 0
 
           // Validate price - skip invalid prices (zero, negative, or extremely low)
           if (price > 0.01) {  // Minimum valid price threshold
@@ -29,6 +29,8 @@ export interface MarketAdapter {
 	getOverview(): Promise<MarketOverview>
 	getCandles(ticker: string, exchange: 'NSE'|'BSE', tf: Timeframe, lookback?: number): Promise<Candle[]>
 	getLastPrice(ticker: string, exchange: 'NSE'|'BSE'): Promise<number>
+	// Last prices keyed `${ticker}.${exchange}` (0 when no price is available)
+	getLastPrices(symbols: { ticker: string, exchange: 'NSE'|'BSE' }[]): Promise<Record<string, number>>
 }
 
 const API = process.env.NEXT_PUBLIC_API_BASE
@@ -170,6 +172,31 @@ class ApiAdapter implements MarketAdapter {
 			return 0
 		}
 	}
+	async getLastPrices(symbols: { ticker: string, exchange: 'NSE'|'BSE' }[]): Promise<Record<string, number>> {
+		// One batch request per exchange per refresh (the API falls back to stored candles for missing quotes)
+		const out: Record<string, number> = {}
+		const byExchange: Record<string, string[]> = {}
+		for (const s of symbols) {
+			out[`${s.ticker}.${s.exchange}`] = 0
+			const tickers = byExchange[s.exchange] || (byExchange[s.exchange] = [])
+			if (!tickers.includes(s.ticker)) tickers.push(s.ticker)
+		}
+		await Promise.all(Object.entries(byExchange).map(async ([exchange, tickers]) => {
+			try {
+				const url = `${API}/prices/realtime/batch?tickers=${encodeURIComponent(tickers.join(','))}&exchange=${exchange}`
+				const res = await axios.get(url, { timeout: 5000 })
+				const prices = res.data?.prices || {}
+				for (const t of tickers) {
+					const price = Number(prices[t]?.price || 0)
+					if (price > 0) out[`${t}.${exchange}`] = price
+				}
+				console.log(`✅ Real-time prices for ${Object.keys(prices).length}/${tickers.length} ${exchange} tickers`)
+			} catch (error: any) {
+				console.warn(`⚠️ Batch price fetch failed for ${exchange}:`, error?.message || 'Unknown error')
+			}
+		}))
+		return out
+	}
 }
 
 // -------- Mock implementation ---------
@@ -265,6 +292,11 @@ class MockAdapter implements MarketAdapter {
 		const cs = await this.getCandles(ticker, exchange, '1m', 1)
 		return cs.length ? cs[cs.length-1].close : 0
 	}
+	async getLastPrices(symbols: { ticker: string, exchange: 'NSE'|'BSE' }[]): Promise<Record<string, number>> {
+		const out: Record<string, number> = {}
+		for (const s of symbols) out[`${s.ticker}.${s.exchange}`] = await this.getLastPrice(s.ticker, s.exchange)
+		return out
+	}
 }
 
 // Cache API adapter and connection status
@@ -29,6 +29,13 @@ from typing import Optional, Dict, Any, List, Tuple
 import pandas as pd
 import numpy as np
 from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'apps', 'api'))
+from strategies.indicators import INDICATORS, ensure_indicators, register_indicator
+from strategies import kernels
 
 # -------------------------
 # Parameters / Config
@@ -53,50 +60,68 @@ class StrategyParams:
 # Indicator helpers
 # -------------------------
 
-def compute_indicators(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
-    """Compute EMA, RSI, ATR, and intraday VWAP for provided candles.
+def _ema_span(close: pd.Series, span: int) -> pd.Series:
+    return pd.Series(kernels.ewm(close, 2.0 / (span + 1)), index=close.index)
 
-    Expects df sorted by timestamp ascending and 'ts' as UTC tz-aware.
-    Returns a copy of df with new columns: EMA9, EMA21, RSI14, ATR14, VWAP
-    """
-    df = df.copy()
-    df['close'] = df['close'].astype(float)
-    # EMAs
-    df[f'EMA{params.ema_short}'] = df['close'].ewm(span=params.ema_short, adjust=False).mean()
-    df[f'EMA{params.ema_long}'] = df['close'].ewm(span=params.ema_long, adjust=False).mean()
 
+def _rsi_ewm(close: pd.Series, period: int) -> pd.Series:
     # RSI (EMA smoothing)
-    delta = df['close'].diff()
+    delta = close.astype(float).diff()
     up = delta.clip(lower=0)
     down = -1 * delta.clip(upper=0)
-    ma_up = up.ewm(alpha=1/params.rsi_period, adjust=False).mean()
-    ma_down = down.ewm(alpha=1/params.rsi_period, adjust=False).mean()
+    ma_up = pd.Series(kernels.rma(up, period), index=close.index)
+    ma_down = pd.Series(kernels.rma(down, period), index=close.index)
     rs = ma_up / ma_down
-    df[f'RSI{params.rsi_period}'] = 100 - (100 / (1 + rs))
+    return 100 - (100 / (1 + rs))
+
 
+def _atr_ewm(tr: pd.Series, period: int) -> pd.Series:
     # ATR (True Range smoothed by EMA)
-    tr1 = df['high'] - df['low']
-    tr2 = (df['high'] - df['close'].shift()).abs()
-    tr3 = (df['low'] - df['close'].shift()).abs()
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    df[f'ATR{params.atr_period}'] = tr.ewm(alpha=1/params.atr_period, adjust=False).mean()
+    return pd.Series(kernels.rma(tr, period), index=tr.index)
 
-    # Intraday VWAP: must reset at session start. We'll compute VWAP aggregated from session start in the file
-    df['typ_price'] = (df['high'] + df['low'] + df['close']) / 3.0
-    df['vp'] = df['typ_price'] * df['volume']
 
-    # Create a session key (date in IST) to reset VWAP per session
-    ist_offset = timedelta(hours=5, minutes=30)
-    df['ts_ist'] = df['ts'] + ist_offset
-    df['session_date_ist'] = df['ts_ist'].dt.date
+def _session_vwap(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series, ts: pd.Series) -> pd.Series:
+    # Intraday VWAP: must reset at session start (date in IST)
+    vp = (high + low + close) / 3.0 * volume
+    session_date_ist = (ts + timedelta(hours=5, minutes=30)).dt.date
+    cum_vol = volume.groupby(session_date_ist).cumsum()
+    cum_vp = vp.groupby(session_date_ist).cumsum()
+    return cum_vp / cum_vol.replace({0: np.nan}).ffill()
+
+
+# Strategy-specific nodes in the shared indicator registry (the true range is shared)
+register_indicator('VWAP', ['high', 'low', 'close', 'volume', 'ts'], warmup=1)(_session_vwap)
 
-    df['cum_vol'] = df.groupby('session_date_ist')['volume'].cumsum()
-    df['cum_vp'] = df.groupby('session_date_ist')['vp'].cumsum()
-    df['VWAP'] = df['cum_vp'] / df['cum_vol'].replace({0: np.nan}).ffill()
 
-    # cleanup helper columns
-    df.drop(columns=['typ_price','vp','cum_vol','cum_vp','ts_ist','session_date_ist'], inplace=True)
-    return df
+@lru_cache(maxsize=None)
+def _indicator_columns(ema_short: int, ema_long: int, rsi_period: int, atr_period: int) -> Tuple[str, ...]:
+    """Registry names for a parameter set; each period's node is registered once, on first use"""
+    nodes = {
+        f'EMA{ema_short}': (['close'], ema_short, _ema_span, {'span': ema_short}),
+        f'EMA{ema_long}': (['close'], ema_long, _ema_span, {'span': ema_long}),
+        f'RSI{rsi_period}': (['close'], rsi_period, _rsi_ewm, {'period': rsi_period}),
+        f'ATR{atr_period}': (['true_range'], atr_period, _atr_ewm, {'period': atr_period}),
+    }
+    for name, (inputs, warmup, fn, kwargs) in nodes.items():
+        if name not in INDICATORS:
+            register_indicator(name, inputs, warmup=warmup, **kwargs)(fn)
+    return (*nodes, 'VWAP')
+
+
+# The default parameters' nodes exist from import
+_indicator_columns(StrategyParams.ema_short, StrategyParams.ema_long, StrategyParams.rsi_period, StrategyParams.atr_period)
+
+
+def compute_indicators(df: pd.DataFrame, params: StrategyParams) -> pd.DataFrame:
+    """Compute EMA, RSI, ATR, and intraday VWAP for provided candles.
+
+    Expects df sorted by timestamp ascending and 'ts' as UTC tz-aware.
+    Returns a copy of df with new columns: EMA9, EMA21, RSI14, ATR14, VWAP
+    """
+    columns = _indicator_columns(params.ema_short, params.ema_long, params.rsi_period, params.atr_period)
+    df = df.copy()
+    df['close'] = df['close'].astype(float)
+    return ensure_indicators(df, columns)
 
 # -------------------------
 # Signal & Execution logic
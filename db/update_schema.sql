@@ -1,2 +1,30 @@
 ALTER TABLE public.strategy_runs DROP CONSTRAINT strategy_runs_mode_check;
 ALTER TABLE public.strategy_runs ADD CONSTRAINT strategy_runs_mode_check CHECK (mode IN ('1m','5m','15m','1h','1d'));
+
+-- Latest candle ts and row count per active symbol for one timeframe
+-- (one round trip instead of per-symbol queries in the scanner/fetchers)
+create or replace function public.candle_freshness(p_timeframe text)
+returns table (symbol_id uuid, latest_ts timestamptz, row_count bigint)
+language sql stable as $$
+  select c.symbol_id, max(c.ts) as latest_ts, count(*) as row_count
+  from public.candles c
+  join public.symbols s on s.id = c.symbol_id
+  where c.timeframe = p_timeframe and s.is_active
+  group by c.symbol_id;
+$$;
+
+-- Mean of the latest p_lookback sentiment scores per symbol
+-- (bulk prefetch for scoring instead of per-symbol lookups)
+create or replace function public.recent_sentiment(p_lookback int default 3)
+returns table (ticker text, exchange text, score double precision)
+language sql stable as $$
+  select s.ticker, s.exchange, avg(r.score)::double precision as score
+  from (
+    select symbol_id, score,
+           row_number() over (partition by symbol_id order by ts desc) as rn
+    from public.sentiment
+  ) r
+  join public.symbols s on s.id = r.symbol_id
+  where r.rn <= p_lookback
+  group by s.ticker, s.exchange;
+$$;
@@ -6,6 +6,7 @@ import sys
 sys.path.append('apps/api')
 
 from supabase_client import get_client
+from sentiment_cache import get_sentiment_provider
 import pandas as pd
 from strategies.indicators import add_core_indicators
 from strategies.engine import trend_follow, signal_quality_filter
@@ -136,7 +137,7 @@ def debug_stock_signals(ticker):
 
             if quality_pass:
                 # Test confidence scoring
-                confidence, rationale = score_signal(df, signal.action, signal.confidence, {'ticker': ticker, 'exchange': 'NSE'})
+                confidence, rationale = score_signal(df, signal.action, signal.confidence, {'ticker': ticker, 'exchange': 'NSE'}, sentiment=get_sentiment_provider(sb))
                 print(f"✅ Confidence score: {confidence:.3f}")
                 if confidence >= 0.6:
                     print(f"✅ Signal would be ACCEPTED!")
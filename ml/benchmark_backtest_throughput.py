@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: backtest throughput (bars/sec) with and without reuse of recorded indicators
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps', 'api'))
+from backtest import backtest_strategy, load_candles, load_symbols
+import strategies.indicators as indicators
+
+
+def synthetic_candles(n: int, seed: int) -> pd.DataFrame:
+    """Random-walk 15m candles for offline runs"""
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    return pd.DataFrame({
+        "ts": pd.date_range("2025-01-06 03:45", periods=n, freq="15min", tz="UTC"),
+        "open": close * (1 + rng.normal(0, 0.002, n)),
+        "high": close * (1 + rng.uniform(0, 0.01, n)),
+        "low": close * (1 - rng.uniform(0, 0.01, n)),
+        "close": close,
+        "volume": rng.integers(1_000, 100_000, n).astype(float),
+    })
+
+
+def run(frames, strategies) -> float:
+    """Seconds to backtest every strategy on every frame"""
+    t0 = time.perf_counter()
+    for df in frames:
+        for strat in strategies:
+            backtest_strategy(df, strat)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest bars/sec before and after indicator reuse')
+    parser.add_argument('--tf', '--timeframe', default='15m', help='Timeframe to load')
+    parser.add_argument('--max-symbols', type=int, default=10, help='Symbols to load from Supabase')
+    parser.add_argument('--strategies', default='hull_suite,macd_trend,mean_reversion', help='Comma-separated strategies')
+    parser.add_argument('--synthetic', type=int, default=0, help='Use N synthetic bars per symbol instead of Supabase')
+    args = parser.parse_args()
+
+    strategies = [s.strip() for s in args.strategies.split(',') if s.strip()]
+    if args.synthetic:
+        frames = [synthetic_candles(args.synthetic, seed) for seed in range(args.max_symbols)]
+    else:
+        frames = [load_candles(s['id'], args.tf, days=720) for s in load_symbols(limit=args.max_symbols)]
+        frames = [df for df in frames if len(df) >= 60]
+    bars = sum(len(df) for df in frames) * len(strategies)
+    print(f"🚀 Benchmarking {len(frames)} symbols x {len(strategies)} strategies ({bars} bars)")
+
+    results = {}
+    for label, reuse in (("before", False), ("after", True)):
+        # before: every indicator request recomputes (the old duplicate passes)
+        indicators.REUSE_RECORDED = reuse
+        try:
+            results[label] = run(frames, strategies)
+        finally:
+            indicators.REUSE_RECORDED = True
+
+    print(f"\n📊 BACKTEST THROUGHPUT")
+    for label, seconds in results.items():
+        print(f"  {label.capitalize():<7} {seconds:.2f}s  {bars / seconds:,.0f} bars/sec")
+    if results["after"] > 0:
+        print(f"  Speed-up: {results['before'] / results['after']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
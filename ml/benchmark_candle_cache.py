@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold Supabase candle loads vs the warm local candle cache for the whole universe
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps', 'api'))
+from backtest import supabase_client, load_symbols
+from candle_store import CandleStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare cold-DB vs warm-local candle load times')
+    parser.add_argument('--tf', '--timeframe', default='15m', help='Timeframe to load')
+    parser.add_argument('--days', type=int, default=60, help='Days of history per symbol')
+    parser.add_argument('--max-symbols', type=int, default=500, help='Maximum symbols to load')
+    args = parser.parse_args()
+
+    sb = supabase_client()
+    symbols = load_symbols(limit=args.max_symbols)
+    start = (time.time() - args.days * 86400) * 1e9
+    root = tempfile.mkdtemp(prefix="candle_bench_")
+    store = CandleStore(root)
+    print(f"🚀 Benchmarking {len(symbols)} symbols, {args.tf}, {args.days} days (cache: {root})")
+
+    try:
+        timings = {}
+        rows = 0
+        # Cold: every bar comes from Supabase (and is written to the cache)
+        t0 = time.perf_counter()
+        for s in symbols:
+            rows += len(store.load(sb, s["id"], args.tf, start=int(start)))
+        timings["cold_db"] = time.perf_counter() - t0
+        cold_requests = store.stats["db_requests"]
+
+        # Warm: cached history plus one tail request per symbol for new bars
+        t0 = time.perf_counter()
+        for s in symbols:
+            store.load(sb, s["id"], args.tf, start=int(start))
+        timings["warm_read_through"] = time.perf_counter() - t0
+        warm_requests = store.stats["db_requests"] - cold_requests
+
+        # Local only: memory-mapped partitions, no network (what backtests see offline)
+        t0 = time.perf_counter()
+        for s in symbols:
+            store.read(s["id"], args.tf, start=int(start))
+        timings["warm_local_only"] = time.perf_counter() - t0
+
+        print(f"\n📊 CANDLE LOAD BENCHMARK ({rows} rows)")
+        print(f"  Cold DB:            {timings['cold_db']:.2f}s ({cold_requests} requests)")
+        print(f"  Warm read-through:  {timings['warm_read_through']:.2f}s ({warm_requests} requests)")
+        print(f"  Warm local only:    {timings['warm_local_only']:.2f}s (0 requests)")
+        if timings["warm_local_only"] > 0:
+            print(f"  Speed-up (local vs cold): {timings['cold_db'] / timings['warm_local_only']:.1f}x")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
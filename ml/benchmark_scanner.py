@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Benchmark: offline scan_once throughput on a synthetic or recorded universe (in-memory Supabase, stub Yahoo)
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from functools import wraps
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class LatencyProbe:
+    """Per-symbol latency: start of its candle fetch to the end of its evaluation.
+
+    Symbols that are not evaluated in this process (skipped, panel mode or
+    evaluated in worker processes) end when their fetch does.
+    """
+
+    def __init__(self, scanner):
+        self.scanner = scanner
+        self.pid = os.getpid()
+        self.start, self.end = {}, {}
+        self._lock = threading.Lock()
+        self._originals = (scanner._fetch_symbol, scanner._evaluate_symbol)
+
+    def install(self) -> None:
+        fetch, evaluate = self._originals
+
+        @wraps(fetch)
+        def timed_fetch(s, *args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fetch(s, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self.start[s["id"]] = t0
+                    self.end[s["id"]] = time.perf_counter()
+
+        @wraps(evaluate)
+        def timed_evaluate(sid, *args, **kwargs):
+            try:
+                return evaluate(sid, *args, **kwargs)
+            finally:
+                if os.getpid() == self.pid:
+                    with self._lock:
+                        self.end[sid] = time.perf_counter()
+
+        self.scanner._fetch_symbol, self.scanner._evaluate_symbol = timed_fetch, timed_evaluate
+
+    def restore(self) -> None:
+        self.scanner._fetch_symbol, self.scanner._evaluate_symbol = self._originals
+
+    def take(self) -> list:
+        """Latencies (seconds) recorded since the last take"""
+        with self._lock:
+            out = [self.end[k] - t0 for k, t0 in self.start.items()]
+            self.start.clear(); self.end.clear()
+        return out
+
+
+def peak_rss_mb() -> dict:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+def seed_database(sb, market, tf: str, new_bars: int) -> int:
+    """Store each symbol's history minus its last `new_bars` bars, so the first scan fetches a delta"""
+    from apps.api.candle_resample import BASE_TIMEFRAME, DERIVED_TIMEFRAMES, resample_enabled
+    rows = 0
+    for s in market.symbols:
+        bars = market.candles(s["ticker"], tf)
+        cutoff = int(bars["ts"].iloc[-new_bars].value) if 0 < new_bars < len(bars) else None
+        tf_rows = market.candle_rows(s, tf, end_ns=cutoff)
+        sb.seed("candles", tf_rows)
+        rows += len(tf_rows)
+        if tf in DERIVED_TIMEFRAMES and resample_enabled():
+            # Recent 5m bars the derived-timeframe refresh aggregates from
+            since = (cutoff or int(bars["ts"].iloc[-1].value)) - 5 * 86_400 * 10**9
+            base_rows = market.candle_rows(s, BASE_TIMEFRAME, start_ns=since, end_ns=cutoff)
+            sb.seed("candles", base_rows)
+            rows += len(base_rows)
+    return rows
+
+
+def archived_symbols(archive) -> list:
+    """symbols rows for every symbol in a recorded Yahoo archive"""
+    return [
+        {"id": str(uuid.uuid5(uuid.NAMESPACE_URL, sym)), "ticker": sym.rsplit(".", 1)[0],
+         "exchange": "BSE" if sym.endswith(".BO") else "NSE", "is_active": True}
+        for sym in archive.symbols()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline scanner benchmark: symbols/sec, latency, RSS and stage timings')
+    parser.add_argument('--symbols', type=int, default=100, help='Synthetic symbols in the universe')
+    parser.add_argument('--tf', '--timeframe', default='15m', help='Timeframe to scan')
+    parser.add_argument('--days', type=int, default=60, help='Days of synthetic history')
+    parser.add_argument('--runs', type=int, default=3, help='Consecutive scans (later runs see warm caches)')
+    parser.add_argument('--mode', choices=('serial', 'pipelined', 'panel'), default='serial', help='Scan mode')
+    parser.add_argument('--io-workers', type=int, default=None, help='I/O threads (pipelined/panel)')
+    parser.add_argument('--cpu-workers', type=int, default=0, help='Evaluation processes (pipelined)')
+    parser.add_argument('--strategies', default=None, help='Comma-separated strategies (default: the live set)')
+    parser.add_argument('--force', action='store_true', help='Evaluate every symbol on every run')
+    parser.add_argument('--cold', action='store_true', help='Start with no stored candles (full refreshes)')
+    parser.add_argument('--new-bars', type=int, default=4, help='Latest bars left out of the seeded database')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed of the synthetic market')
+    parser.add_argument('--now', default='2025-03-07T06:00:00+00:00',
+                        help='UTC time the scans run at (default: Friday 11:30 IST, inside the session, so 15m deltas are fetched)')
+    parser.add_argument('--yahoo-latency-ms', type=float, default=0.0, help='Simulated Yahoo round trip')
+    parser.add_argument('--yahoo-rate', type=float, default=0.0, help='Yahoo requests/sec limit (0 = unthrottled)')
+    parser.add_argument('--db-latency-ms', type=float, default=0.0, help='Simulated Supabase round trip')
+    parser.add_argument('--replay', default=None,
+                        help='Serve Yahoo from an archive recorded with YAHOO_TRANSPORT=record instead of synthetic candles')
+    parser.add_argument('--candle-cache', action='store_true', help='Enable the local candle cache (off by default, as in production)')
+    parser.add_argument('--verbose', action='store_true', help='Show the scanner output')
+    parser.add_argument('--json', default=None, help='Also write the report to this file')
+    args = parser.parse_args()
+
+    # The candle cache is read at first use, so it is pointed at a scratch directory before the imports
+    cache_dir = tempfile.mkdtemp(prefix="scanner_bench_")
+    os.environ["CANDLE_CACHE"] = "1" if args.candle_cache else "0"
+    os.environ["CANDLE_CACHE_DIR"] = cache_dir
+
+    from apps.api import clock, execution, risk_engine, scan_shards, scanner, yahoo_http  # noqa: F401 (patched below)
+    from apps.api.fake_supabase import FakeSupabase, install_fake_client
+    from apps.api.synthetic_market import StubYahooSession, SyntheticMarket
+    from apps.api.yahoo_replay import ReplaySession, YahooArchive
+
+    # Market hours decide what the scanner fetches, so every run sees the same clock
+    clock.pin(datetime.fromisoformat(args.now.replace('Z', '+00:00')))
+    now = clock.utc_now()
+    sb = FakeSupabase(latency_ms=args.db_latency_ms)
+    client = yahoo_http.YahooHttpClient(rate_per_sec=args.yahoo_rate, max_retries=0)
+    if args.replay:
+        # Recorded responses only: every symbol starts without stored candles
+        archive = YahooArchive(args.replay)
+        symbols = archived_symbols(archive)[:args.symbols]
+        sb.seed("symbols", symbols)
+        universe = len(symbols)
+        client.session = ReplaySession(archive)
+        print(f"🚀 Benchmarking {args.mode} scans of {len(symbols)} archived symbols, {args.tf} (replaying {archive.root})")
+    else:
+        market = SyntheticMarket(args.symbols, days=args.days, seed=args.seed, end_ns=clock.now_ns())
+        sb.seed("symbols", market.symbols)
+        universe = args.symbols
+        t0 = time.perf_counter()
+        seeded = 0 if args.cold else seed_database(sb, market, args.tf, args.new_bars)
+        client.session = StubYahooSession(market, latency_ms=args.yahoo_latency_ms)
+        print(f"🚀 Benchmarking {args.mode} scans of {args.symbols} synthetic symbols, {args.tf} at {now:%Y-%m-%d %H:%M} UTC "
+              f"({seeded} candles seeded in {time.perf_counter() - t0:.1f}s)")
+    old_http = yahoo_http._CLIENT
+    yahoo_http._CLIENT = client
+    restore = install_fake_client(sb)
+    probe = LatencyProbe(scanner)
+    probe.install()
+    strategies = [s.strip() for s in args.strategies.split(',') if s.strip()] if args.strategies else None
+
+    report = {"args": vars(args), "runs": []}
+    try:
+        for run in range(1, args.runs + 1):
+            db_before, yahoo_before = dict(sb.requests), client.stats()["requests"]
+            out = sys.stdout if args.verbose else open(os.devnull, "w")
+            t0 = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(out):
+                    result = scanner.scan_once(
+                        args.tf, force=args.force, max_symbols=args.symbols,
+                        pipelined=args.mode == "pipelined", panel=args.mode == "panel",
+                        io_workers=args.io_workers, cpu_workers=args.cpu_workers, strategies=strategies,
+                    )
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            wall = time.perf_counter() - t0
+            latency_ms = np.array(probe.take()) * 1000
+            db = {k: v - db_before.get(k, 0) for k, v in sb.requests.items() if v - db_before.get(k, 0)}
+            report["runs"].append({
+                "run": run,
+                "wall_s": round(wall, 3),
+                "symbols_per_sec": round(result["symbols_scanned"] / wall, 2) if wall > 0 else None,
+                "p50_ms": round(float(np.percentile(latency_ms, 50)), 2) if latency_ms.size else None,
+                "p99_ms": round(float(np.percentile(latency_ms, 99)), 2) if latency_ms.size else None,
+                "evaluated": result["evaluated"],
+                "skipped": result["skipped"],
+                "signals": result["signals"],
+                "timings": result["timings"],
+                "db_requests": db,
+                "yahoo_requests": client.stats()["requests"] - yahoo_before,
+            })
+    finally:
+        probe.restore()
+        restore()
+        yahoo_http._CLIENT = old_http
+        clock.pin(None)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    report["peak_rss_mb"] = {k: round(v, 1) for k, v in peak_rss_mb().items()}
+
+    print(f"\n📊 SCANNER BENCHMARK ({args.mode}, {universe} symbols, {args.tf})")
+    for r in report["runs"]:
+        print(f"  Run {r['run']}: {r['wall_s']:.2f}s  {r['symbols_per_sec']} symbols/sec  "
+              f"p50 {r['p50_ms']}ms  p99 {r['p99_ms']}ms  "
+              f"evaluated {r['evaluated']}, skipped {r['skipped']}, signals {r['signals']}")
+        print(f"    Stages: {r['timings']}")
+        print(f"    Requests: yahoo {r['yahoo_requests']}, db {sum(r['db_requests'].values())} {r['db_requests']}")
+    print(f"  Peak RSS: {report['peak_rss_mb']['self']} MB (workers {report['peak_rss_mb']['children']} MB)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,11 @@ import random
 from dataclasses import dataclass
 from typing import Dict, List
 
-from supabase import create_client
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps', 'api'))
+from supabase_client import get_pooled_client
 
 
 def supabase_client():
@@ -14,7 +17,7 @@ def supabase_client():
     key = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_ANON_KEY")
     if not url or not key:
         raise RuntimeError("Missing SUPABASE env")
-    return create_client(url, key)
+    return get_pooled_client(url, key)
 
 
 def fetch_recent_signals(limit: int = 500):
@@ -336,33 +336,20 @@ def analyze_hull_suite_characteristics(res):
 def calculate_hull_characteristics(df):
         """Calculate quantitative characteristics that determine Hull Suite suitability"""
         from backtest import add_indicators
+        from strategies.hull_screen import hull_characteristics
         df = add_indicators(df)
     
         # Skip if insufficient data
         if len(df) < 100 or 'hma55' not in df.columns or 'adx14' not in df.columns:
             return {}
     
-        # 1. Average ADX (trend strength) - Hull works better in trending markets
-        avg_adx = df['adx14'].mean()
-    
-        # 2. Trend Consistency - How often ADX indicates trending conditions
-        trend_consistency = (df['adx14'] > 25).mean()  # % of time in trending regime
-    
-        # 3. Volatility Regime - Hull performs better in certain volatility ranges
-        volatility_regime = df['bb_width'].mean()  # Average Bollinger Band width
-    
-        # 4. HMA Slope Frequency - How often HMA changes direction (Hull signal frequency)
-        hma_slopes = []
-        for i in range(2, len(df)):
-            slope = df['hma55'].iloc[i] - df['hma55'].iloc[i-2]
-            hma_slopes.append(slope)
-    
-        if hma_slopes:
-            # Frequency of meaningful slope changes
-            slope_changes = sum(1 for i in range(1, len(hma_slopes)) if (hma_slopes[i] * hma_slopes[i-1]) < 0)
-            hma_slope_freq = slope_changes / len(hma_slopes) if hma_slopes else 0
-        else:
-            hma_slope_freq = 0
+        # 1-4. Average ADX (trend strength), trend consistency (% of time ADX > 25),
+        # volatility regime (average BB width) and HMA slope-flip frequency, vectorized
+        chars = hull_characteristics(df)
+        avg_adx = chars['avg_adx']
+        trend_consistency = chars['trend_consistency']
+        volatility_regime = chars['volatility_regime']
+        hma_slope_freq = chars['hma_slope_freq']
     
         # 5. Volume-Trend Correlation - Trending stocks often have volume confirmation
         volume_trend_corr = 0
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Parity checks: vectorized strategy_signals vs the per-bar reference loop
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(__file__))
+from backtest import strategy_signals
+
+
+def _candles(n: int = 700, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.006, n)))
+    return pd.DataFrame({
+        "ts": pd.date_range("2025-01-06 03:45", periods=n, freq="15min", tz="UTC"),
+        "open": close * (1 + rng.normal(0, 0.002, n)),
+        "high": close * (1 + rng.uniform(0, 0.01, n)),
+        "low": close * (1 - rng.uniform(0, 0.01, n)),
+        "close": close,
+        "volume": rng.integers(1_000, 100_000, n).astype(float),
+    })
+
+
+def test_vectorized_signals_match_loop():
+    df = _candles()
+    for name in ("hull_suite", "mean_reversion", "macd_trend"):
+        for min_conf in (0.5, 0.75):
+            loop = strategy_signals(df, name, min_confidence=min_conf, vectorized=False)
+            fast = strategy_signals(df, name, min_confidence=min_conf, vectorized=True)
+            assert loop.fillna("").tolist() == fast.fillna("").tolist(), (name, min_conf)
+
+
+if __name__ == "__main__":
+    test_vectorized_signals_match_loop()
+    print("✅ Vectorized strategy_signals match the per-bar loop")
@@ -1,8 +1,11 @@
 import os
-import time
 from datetime import datetime, timezone
 from supabase import create_client
 from apps.api.yahoo_client import fetch_yahoo_candles
+from apps.api.yahoo_http import get_yahoo_http
+from apps.api.candle_freshness import load_candle_freshness
+from apps.api.candle_resample import BASE_TIMEFRAME, DERIVED_TIMEFRAMES, plan_derived, resample_enabled, update_derived
+import pandas as pd
 
 # Set up environment variables
 os.environ['SUPABASE_URL'] = 'https://lfwgposvyckptsrjkkyx.supabase.co'
@@ -37,24 +40,25 @@ def get_symbol_id(ticker: str, exchange: str) -> str:
     }).execute().data[0]
     return new_symbol['id']
 
-def get_existing_data_info(symbol_id: str, timeframe: str) -> dict:
-    """Get information about existing data for a symbol/timeframe"""
+def get_existing_data_info(symbol_id: str, timeframe: str, freshness: dict | None = None) -> dict:
+    """Get information about existing data for a symbol/timeframe (from the freshness map when given)"""
+    if freshness is not None:
+        info = freshness.get(symbol_id)
+        if not info:
+            return {'exists': False, 'latest_date': None, 'days_count': 0}
+        return {'exists': True, 'latest_date': info['latest_date'], 'days_count': info['count']}
     try:
-        # Get the most recent candle
-        latest_candle = sb.table('candles').select('ts').eq('symbol_id', symbol_id).eq('timeframe', timeframe).order('ts', desc=True).limit(1).execute().data
+        # Get the most recent candle and the total count in one request
+        resp = sb.table('candles').select('ts', count='exact').eq('symbol_id', symbol_id).eq('timeframe', timeframe).order('ts', desc=True).limit(1).execute()
+        latest_candle = resp.data
 
         if not latest_candle:
             return {'exists': False, 'latest_date': None, 'days_count': 0}
 
-        latest_date = latest_candle[0]['ts']
-
-        # Get total count of candles using a simple select and len()
-        all_candles = sb.table('candles').select('ts').eq('symbol_id', symbol_id).eq('timeframe', timeframe).execute().data
-
         return {
             'exists': True,
-            'latest_date': latest_date,
-            'days_count': len(all_candles) if all_candles else 0
+            'latest_date': latest_candle[0]['ts'],
+            'days_count': resp.count or 0
         }
     except Exception as e:
         print(f"❌ Error checking existing data: {e}")
@@ -109,17 +113,22 @@ def calculate_delta_days(target_days: int, existing_info: dict, timeframe: str)
 
     return 0
 
-def fetch_and_store(ticker: str, exchange: str, timeframe: str, target_days: int):
-    """Fetch and store data for one symbol/timeframe with delta logic"""
+def fetch_and_store(ticker: str, exchange: str, timeframe: str, target_days: int, freshness: dict | None = None,
+                    symbol_id: str | None = None, derive: list | None = None, min_days: int = 0):
+    """Fetch and store data for one symbol/timeframe with delta logic.
+
+    derive lists higher timeframes to re-aggregate from the stored 5m bars;
+    min_days widens the fetch to cover their gaps.
+    """
     try:
         # Get symbol ID
-        symbol_id = get_symbol_id(ticker, exchange)
+        symbol_id = symbol_id or get_symbol_id(ticker, exchange)
 
         # Check existing data
-        existing_info = get_existing_data_info(symbol_id, timeframe)
+        existing_info = get_existing_data_info(symbol_id, timeframe, freshness)
 
         # Calculate how many days we actually need to fetch
-        delta_days = calculate_delta_days(target_days, existing_info, timeframe)
+        delta_days = max(calculate_delta_days(target_days, existing_info, timeframe), min_days)
 
         if delta_days == 0:
             print(f"\n📊 {ticker} {timeframe}: No new data needed")
@@ -166,6 +175,9 @@ def fetch_and_store(ticker: str, exchange: str, timeframe: str, target_days: int
             # Store in database
             sb.table('candles').upsert(valid_candles, on_conflict='symbol_id,timeframe,ts').execute()
             print(f"💾 Stored {len(valid_candles)} candles")
+            if derive:
+                written = update_derived(sb, symbol_id, pd.DataFrame(valid_candles), derive)
+                return len(valid_candles) + sum(written.values())
             return len(valid_candles)
         else:
             print("⚠️ No valid candles to store")
@@ -200,23 +212,40 @@ def main():
         '1d': 365     # 1 year of daily data
     }
 
+    # One freshness lookup per timeframe instead of two queries per symbol/timeframe
+    freshness = {tf: load_candle_freshness(sb, tf) for tf in target_timeframes}
+
     for ticker, exchange in STOCKS:
         print(f"\n{'='*50}")
         print(f"📈 {ticker} ({exchange})")
         print(f"{'='*50}")
 
+        symbol_id = get_symbol_id(ticker, exchange)
+        # Higher timeframes with recent history are aggregated from the 5m bars instead of fetched;
+        # the 5m fetch is widened to cover the largest gap among them
+        derived, base_days = [], 0
+        if resample_enabled():
+            stale = {}
+            for tf in DERIVED_TIMEFRAMES:
+                info = get_existing_data_info(symbol_id, tf, freshness[tf]) if tf in target_timeframes else None
+                if info and info['exists']:
+                    stale[tf] = info['latest_date'] if calculate_delta_days(target_timeframes[tf], info, tf) > 0 else None
+            derived, base_days = plan_derived(stale)
         for timeframe, target_days in target_timeframes.items():
-            stored = fetch_and_store(ticker, exchange, timeframe, target_days)
+            if timeframe in derived:
+                continue
+            # Yahoo pacing is handled by the shared client's rate limiter
+            base = timeframe == BASE_TIMEFRAME
+            stored = fetch_and_store(ticker, exchange, timeframe, target_days, freshness[timeframe], symbol_id,
+                                     derived if base else None, base_days if base else 0)
             total_stored += stored
             total_processed += 1
 
-            if stored > 0:
-                time.sleep(1)  # Be nice to Yahoo API
-
     print(f"\n{'='*60}")
     print("🎉 DELTA DATA FETCH COMPLETE!")
     print(f"📊 Total candles stored: {total_stored}")
     print(f"📊 Total symbol/timeframe combinations processed: {total_processed}")
+    print(f"🌐 Yahoo HTTP: {get_yahoo_http().stats()}")
 
     # Show what's in the database
     print("\n📋 DATABASE SUMMARY:")
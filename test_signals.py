@@ -6,6 +6,7 @@ import sys
 sys.path.append('apps/api')
 
 from supabase_client import get_client
+from sentiment_cache import get_sentiment_provider
 import pandas as pd
 from signal_generator import score_signal, _feature_contributions
 from strategies.indicators import add_core_indicators
@@ -68,7 +69,7 @@ def test_signals_for_stock(ticker):
 
         try:
             # Test BUY signal
-            confidence, rationale = score_signal(test_df, 'BUY', 0.5, {'ticker': ticker, 'exchange': 'NSE'})
+            confidence, rationale = score_signal(test_df, 'BUY', 0.5, {'ticker': ticker, 'exchange': 'NSE'}, sentiment=get_sentiment_provider(sb))
 
             if confidence > 0.5:  # Lower threshold for testing
                 timestamp = test_df.iloc[-1]['ts']